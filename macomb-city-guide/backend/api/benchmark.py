@@ -0,0 +1,169 @@
+# api/benchmark.py
+import json
+import os
+import time
+from itertools import islice
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from rest_framework.test import APIClient
+from core import views as core_views
+from core.cache import CATALOG_CACHE_ALIAS, catalog_cache
+from core.loader import CatalogLoader
+from core.models import Attraction, Restaurant, Event, Property, TransportOption, Favorite, Review
+from core.synthetic import CatalogGenerator
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_budgets.json')
+
+# URLconf used while benchmarking: the live API plus the core.views endpoints
+# that exist but are not mounted (core/urls.py itself does not import)
+urlpatterns = [
+    path('api/', include('api.urls')),
+    path('core/search/', core_views.search_all),
+    path('core/cities/<str:city_name>/overview/', core_views.city_overview),
+]
+
+# (name, URL template, needs an authenticated user), templates are filled from Fixtures
+SCENARIOS = [
+    ('attractions-list', '/api/attractions/', False),
+    ('attractions-list-cursor', '/api/attractions/?paginate=cursor', False),
+    ('attractions-detail', '/api/attractions/{attraction}/', False),
+    ('attractions-nearby', '/api/attractions/{attraction}/nearby/', False),
+    ('restaurants-list', '/api/restaurants/', False),
+    ('restaurants-detail', '/api/restaurants/{restaurant}/', False),
+    ('restaurants-nearby', '/api/nearby-restaurants/{restaurant}/', False),
+    ('events-list', '/api/events/', False),
+    ('events-detail', '/api/events/{event}/', False),
+    ('properties-list', '/api/properties/?for_sale=true&min_price=150000', False),
+    ('properties-detail', '/api/properties/{property}/', False),
+    ('properties-nearby', '/api/properties/{property}/nearby/', False),
+    ('transportation-list', '/api/transportation/', False),
+    ('transportation-detail', '/api/transportation/{transport}/', False),
+    ('categories-list', '/api/categories/', False),
+    ('cuisines-list', '/api/cuisines/', False),
+    ('event-types-list', '/api/event-types/', False),
+    ('property-types-list', '/api/property-types/', False),
+    ('transport-types-list', '/api/transport-types/', False),
+    ('reviews-list', '/api/reviews/?content_type={attraction_type}&object_id={attraction}', False),
+    ('search', '/api/search/?q=park', False),
+    ('core-search', '/core/search/?q=park', False),
+    ('homepage', '/api/homepage/?city=Macomb', False),
+    ('city-overview', '/core/cities/Macomb/overview/', False),
+    ('dashboard', '/api/dashboard/stats/', False),
+    ('dashboard-by-city', '/api/dashboard/stats/?by_city=true', False),
+    ('favorites', '/api/favorites/', True),
+]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(int(round(fraction * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def benchmark_host():
+    # The test client must send a Host the settings accept
+    hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*']
+    return hosts[0] if hosts else 'localhost'
+
+
+class Fixtures:
+    """Catalog rows grown size by size, plus one user with favorites and reviews"""
+
+    def __init__(self, seed=0):
+        self.generator = CatalogGenerator(seed=seed)
+        self.loader = CatalogLoader()
+        self.loaded = 0
+        self.user = User.objects.create_user('benchmark-user', password='benchmark')
+
+    def grow(self, size):
+        # The generator is deterministic, so skipping what is loaded continues the same sequence
+        self.loader.load(islice(self.generator.records(size), self.loaded, None))
+        self.loaded = max(self.loaded, size)
+
+        self.values = {
+            'attraction': Attraction.objects.order_by('id').values_list('id', flat=True).first(),
+            'restaurant': Restaurant.objects.order_by('id').values_list('id', flat=True).first(),
+            'event': Event.objects.order_by('id').values_list('id', flat=True).first(),
+            'property': Property.objects.order_by('id').values_list('id', flat=True).first(),
+            'transport': TransportOption.objects.order_by('id').values_list('id', flat=True).first(),
+            'attraction_type': ContentType.objects.get_for_model(Attraction).id,
+        }
+        self.add_user_activity()
+
+    def add_user_activity(self, count=10):
+        """Favorites across the catalog and reviews of the first attraction"""
+        if Favorite.objects.filter(user=self.user).exists():
+            return
+        for model in (Attraction, Restaurant, Event, Property):
+            content_type = ContentType.objects.get_for_model(model)
+            for object_id in model.objects.order_by('id').values_list('id', flat=True)[:count]:
+                Favorite.objects.create(user=self.user, content_type=content_type, object_id=object_id)
+        for rating in range(1, 6):
+            Review.objects.create(
+                user=self.user, content_type_id=self.values['attraction_type'],
+                object_id=self.values['attraction'], rating=rating, comment='Benchmark review'
+            )
+
+    def url(self, template):
+        return template.format(**self.values)
+
+
+def benchmark_caches():
+    """CACHES with the catalog alias on a private in-memory cache
+
+    measure() clears the catalog cache between requests, which must never hit
+    a shared file or Redis cache and its hit/miss counters.
+    """
+    return {
+        **settings.CACHES,
+        CATALOG_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'catalog-benchmark',
+        },
+    }
+
+
+def measure(client, url, repeat, warm_cache=False):
+    """p50/p95 latency, query count and response size of GET url, run under benchmark_caches()"""
+    timings, queries, size, status = [], 0, 0, None
+    for _ in range(repeat):
+        if not warm_cache:
+            catalog_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = client.get(url)
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = max(queries, len(context.captured_queries))
+        size = len(content)
+        status = response.status_code
+    return {
+        'status': status,
+        'p50_ms': round(percentile(timings, 0.5), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'queries': queries,
+        'bytes': size,
+    }
+
+
+def check_budgets(results, budgets):
+    """Budget violations as strings, a metric over budget at any size is one violation"""
+    violations = []
+    for size, scenarios in results.items():
+        for name, metrics in scenarios.items():
+            if metrics['status'] != 200:
+                violations.append(f"{name} @ {size}: status {metrics['status']}")
+            for metric, limit in budgets.get(name, {}).items():
+                if metrics[metric] > limit:
+                    violations.append(f"{name} @ {size}: {metric} {metrics[metric]} > budget {limit}")
+    return violations
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
@@ -0,0 +1,77 @@
+# api/cache.py
+import hashlib
+import json
+from django.conf import settings
+from rest_framework.response import Response
+from core.cache import catalog_cache, model_versions, record_lookup
+
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 600)
+
+# Every viewset class using CachedResponseMixin, for the stats endpoint
+cached_viewsets = []
+
+
+class CachedResponseMixin:
+    """Cache list and retrieve responses of a read-only viewset
+
+    Responses are cached as serialized data, keyed on the action, URL kwargs and
+    normalized query params, plus the current version of every model in
+    cache_models. Saving or deleting one of those models bumps its version, so
+    only endpoints that depend on it miss on the next request.
+    """
+    cache_models = None  # Defaults to the queryset model
+    cache_timeout = CATALOG_CACHE_TIMEOUT
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cached_viewsets.append(cls)
+
+    @classmethod
+    def cache_endpoint(cls):
+        """Name used in cache keys and stats, the router's default basename"""
+        return cls.queryset.model._meta.object_name.lower()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_models(self):
+        return self.cache_models or [self.get_queryset().model]
+
+    def get_cache_key(self, request):
+        # Order and blank values in the query string don't change the result
+        params = sorted(
+            (name, sorted(values))
+            for name, values in request.query_params.lists()
+            if any(value != '' for value in values)
+        )
+        parts = [
+            self.action,
+            sorted(self.kwargs.items()),
+            params,
+            # Image fields serialize as absolute URLs
+            request.build_absolute_uri('/'),
+            model_versions(self.get_cache_models()),
+        ]
+        digest = hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+        return f"catalog:response:{self.cache_endpoint()}:{digest}"
+
+    def cached_response(self, view, request, *args, **kwargs):
+        cache = catalog_cache()
+        key = self.get_cache_key(request)
+
+        data = cache.get(key)
+        if data is not None:
+            record_lookup(self.cache_endpoint(), hit=True)
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record_lookup(self.cache_endpoint(), hit=False)
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=self.cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,112 @@
+# api/management/commands/benchmark_api.py
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from api.benchmark import (
+    BUDGETS_PATH, SCENARIOS, Fixtures, benchmark_caches, benchmark_host, check_budgets, load_budgets, measure
+)
+from core.cache import catalog_cache
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every API route at several catalog sizes against the checked-in budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000],
+            help='Catalog sizes (rows across the five catalog models) to benchmark at'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Timed requests per route and size'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the generated catalog'
+        )
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            help='Scenario names to run (default: all)'
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Keep the response cache between requests instead of measuring cold requests'
+        )
+        parser.add_argument(
+            '--budgets',
+            default=BUDGETS_PATH,
+            help='Budget file to compare against'
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark-report.json',
+            help="JSON report path, '-' for stdout"
+        )
+        parser.add_argument(
+            '--report-only',
+            action='store_true',
+            help='Write the report without failing on budget violations'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = [scenario for scenario in SCENARIOS if not options['only'] or scenario[0] in options['only']]
+        results = {}
+
+        # Everything created here is rolled back once the benchmark finishes. The
+        # request profile middleware is off so its logging doesn't skew timings,
+        # and responses are cached in a private cache that is cleared freely
+        overrides = override_settings(
+            ROOT_URLCONF='api.benchmark', REQUEST_PROFILE_SAMPLE_RATE=0, CACHES=benchmark_caches()
+        )
+        with overrides, transaction.atomic():
+            client = APIClient(HTTP_HOST=benchmark_host())
+            fixtures = Fixtures(seed=options['seed'])
+
+            for size in sorted(options['sizes']):
+                fixtures.grow(size)
+                results[size] = {}
+                self.stdout.write(f'{size} rows')
+
+                for name, template, authenticated in scenarios:
+                    client.force_authenticate(fixtures.user if authenticated else None)
+                    metrics = measure(client, fixtures.url(template), options['repeat'], options['warm_cache'])
+                    results[size][name] = metrics
+                    self.stdout.write(
+                        f"  {name:<26} p50 {metrics['p50_ms']:8.2f} ms  p95 {metrics['p95_ms']:8.2f} ms  "
+                        f"{metrics['queries']:3} queries  {metrics['bytes']:8} bytes"
+                    )
+
+            transaction.set_rollback(True)
+            catalog_cache().clear()
+
+        violations = check_budgets(results, load_budgets(options['budgets']))
+        report = {
+            'sizes': sorted(options['sizes']),
+            'repeat': options['repeat'],
+            'warm_cache': options['warm_cache'],
+            'results': {str(size): scenarios for size, scenarios in results.items()},
+            'violations': violations,
+        }
+        encoded = json.dumps(report, indent=2, sort_keys=True)
+        if options['output'] == '-':
+            self.stdout.write(encoded)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(encoded + '\n')
+
+        for violation in violations:
+            self.stderr.write(violation)
+        if violations and not options['report_only']:
+            raise CommandError(f'{len(violations)} budget violations')
+        self.stdout.write(self.style.SUCCESS('All routes within budget' if not violations else 'Report written'))
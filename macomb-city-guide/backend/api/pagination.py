@@ -0,0 +1,175 @@
+# api/pagination.py
+import base64
+import binascii
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CatalogPagination(PageNumberPagination):
+    """Page number pagination with two opt-in modes for large catalog listings
+
+    ?paginate=cursor switches to keyset pagination. The opaque cursor holds the
+    ordering key values of the row at the page edge, so every page is a single
+    range query on the ordering index with no COUNT(*) or OFFSET, and page N
+    costs the same as page 1. ?count=false keeps page numbers but skips COUNT(*).
+    Without either parameter the response is the usual count/next/previous/results.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'paginate'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.mode = self.get_mode(request)
+        if self.mode == 'cursor':
+            self.display_page_controls = False
+            return self.paginate_keyset(queryset, request)
+        if self.mode == 'nocount':
+            self.display_page_controls = False
+            return self.paginate_without_count(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.mode == 'cursor':
+            return Response({
+                'next': self.next_link,
+                'previous': self.previous_link,
+                'results': data,
+            })
+        if self.mode == 'nocount':
+            # count stays in the payload so clients reading it don't break
+            return Response({
+                'count': None,
+                'next': self.next_link,
+                'previous': self.previous_link,
+                'results': data,
+            })
+        return super().get_paginated_response(data)
+
+    def get_mode(self, request):
+        params = request.query_params
+        if params.get(self.mode_query_param) == 'cursor' or self.cursor_query_param in params:
+            return 'cursor'
+        if params.get(self.count_query_param, '').lower() in ('false', '0', 'no'):
+            return 'nocount'
+        return 'page'
+
+    # Keyset mode
+
+    def get_keys(self, queryset):
+        """(field, descending) for each ordering key, ending with the primary key as tie-breaker"""
+        model = queryset.model
+        ordering = list(queryset.query.order_by) or list(model._meta.ordering)
+
+        keys = []
+        for name in ordering:
+            if not isinstance(name, str) or name == '?':
+                raise ValidationError('Cursor pagination needs an ordering on plain fields')
+            field_name = name.lstrip('-')
+            try:
+                field = model._meta.pk if field_name == 'pk' else model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                raise ValidationError(f'Cursor pagination does not support ordering by {field_name}')
+            # NULLs don't compare, so a nullable key would skip rows
+            if field.null or field.is_relation:
+                raise ValidationError(f'Cursor pagination does not support ordering by {field_name}')
+            keys.append((field, name.startswith('-')))
+
+        if not any(field.primary_key for field, _ in keys):
+            keys.append((model._meta.pk, False))
+        return keys
+
+    def encode_cursor(self, keys, obj, reverse):
+        # value_to_string/to_python round-trip dates, decimals and floats exactly
+        payload = {'k': [field.value_to_string(obj) for field, _ in keys], 'r': int(reverse)}
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, token.decode('ascii').rstrip('='))
+
+    def decode_cursor(self, keys, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            values = payload['k']
+            if len(values) != len(keys):
+                raise ValueError
+            return [field.to_python(value) for (field, _), value in zip(keys, values)], bool(payload['r'])
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def keyset_filter(self, keys, values, reverse):
+        """Rows strictly after values in the (possibly reversed) key order
+
+        Built as k1 >= v1 AND (k1 > v1 OR (k1 = v1 AND (k2 > v2 OR ...))) so the
+        leading bound gives the database an index range to start from.
+        """
+        condition = None
+        for (field, descending), value in reversed(list(zip(keys, values))):
+            lookup = 'lt' if descending != reverse else 'gt'
+            after = Q(**{f'{field.attname}__{lookup}': value})
+            condition = after if condition is None else after | (Q(**{field.attname: value}) & condition)
+
+        (field, descending), value = keys[0], values[0]
+        bound = 'lte' if descending != reverse else 'gte'
+        return Q(**{f'{field.attname}__{bound}': value}) & condition
+
+    def paginate_keyset(self, queryset, request):
+        page_size = self.get_page_size(request)
+        keys = self.get_keys(queryset)
+
+        token = request.query_params.get(self.cursor_query_param)
+        values, reverse = self.decode_cursor(keys, token) if token else (None, False)
+
+        ordering = [('-' if descending != reverse else '') + field.attname for field, descending in keys]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(keys, values, reverse))
+
+        # One extra row tells whether there is another page in this direction
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_link = self.previous_link = None
+        if rows:
+            if has_more or reverse:
+                self.next_link = self.encode_cursor(keys, rows[-1], reverse=False)
+            if token and (has_more or not reverse):
+                self.previous_link = self.encode_cursor(keys, rows[0], reverse=True)
+        return rows
+
+    # No-count mode
+
+    def paginate_without_count(self, queryset, request):
+        page_size = self.get_page_size(request)
+        page_number = request.query_params.get(self.page_query_param, 1)
+        try:
+            number = int(page_number)
+            if number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message='Invalid page'))
+
+        offset = (number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and number > 1:
+            raise NotFound(self.invalid_page_message.format(page_number=number, message='That page contains no results'))
+
+        url = request.build_absolute_uri()
+        self.next_link = replace_query_param(url, self.page_query_param, number + 1) if len(rows) > page_size else None
+        if number == 1:
+            self.previous_link = None
+        elif number == 2:
+            self.previous_link = remove_query_param(url, self.page_query_param)
+        else:
+            self.previous_link = replace_query_param(url, self.page_query_param, number - 1)
+        return rows[:page_size]
@@ -0,0 +1,105 @@
+# api/prefetch.py
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def _relation_path(model, source):
+    """Split a dotted source into (select_related path, prefetch path) on model
+
+    Forward foreign keys and one-to-ones can be joined, anything to-many has to be
+    prefetched and ends the joinable part. Returns the model the path ends on.
+    """
+    select_parts = []
+    prefetch_parts = []
+    current = model
+
+    for attr in source.split('.'):
+        try:
+            field = current._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+
+        if (field.many_to_one or field.one_to_one) and not prefetch_parts:
+            select_parts.append(attr)
+        else:
+            prefetch_parts = select_parts + prefetch_parts + [attr]
+            select_parts = []
+        current = field.related_model
+
+    if prefetch_parts:
+        return None, '__'.join(prefetch_parts), current
+    return ('__'.join(select_parts) or None), None, current
+
+
+@lru_cache(maxsize=None)
+def plan_for_serializer(serializer_class, model):
+    """Return (select_related paths, prefetch_related paths) needed to render serializer_class"""
+    select = set()
+    prefetch = set()
+
+    for field in serializer_class().fields.values():
+        if field.write_only or field.source == '*':
+            continue
+
+        # Primary keys of forward relations are read from the *_id column, no query needed
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            continue
+        if isinstance(field, serializers.ManyRelatedField) and isinstance(
+            field.child_relation, serializers.PrimaryKeyRelatedField
+        ):
+            select_path, prefetch_path, _ = _relation_path(model, field.source)
+            if prefetch_path or select_path:
+                prefetch.add(prefetch_path or select_path)
+            continue
+
+        is_relation = isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField))
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        is_nested = isinstance(nested, serializers.BaseSerializer)
+
+        # Plain attributes only need a join when the source walks through a relation
+        source = field.source if is_relation or is_nested else field.source.rpartition('.')[0]
+        if not source:
+            continue
+
+        select_path, prefetch_path, related_model = _relation_path(model, source)
+
+        if is_nested and hasattr(nested, 'Meta') and getattr(nested.Meta, 'model', None) is related_model:
+            child_select, child_prefetch = plan_for_serializer(type(nested), related_model)
+            base = prefetch_path or select_path
+            if prefetch_path:
+                prefetch.update(f"{base}__{path}" for path in child_select | child_prefetch)
+            elif select_path:
+                select.update(f"{base}__{path}" for path in child_select)
+                prefetch.update(f"{base}__{path}" for path in child_prefetch)
+
+        if prefetch_path:
+            prefetch.add(prefetch_path)
+        elif select_path:
+            select.add(select_path)
+
+    return frozenset(select), frozenset(prefetch)
+
+
+def optimize_queryset(queryset, serializer_class):
+    """Return queryset with the joins and prefetches serializer_class needs"""
+    select, prefetch = plan_for_serializer(serializer_class, queryset.model)
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*sorted(prefetch))
+    return queryset
+
+
+class QueryPlanMixin:
+    """Apply select_related/prefetch_related derived from the viewset's serializer
+
+    Dotted sources such as source='category.name', related fields and nested
+    serializers are inspected once per serializer class, so list pages run a
+    constant number of queries however many rows they hold.
+    """
+
+    def get_queryset(self):
+        return optimize_queryset(super().get_queryset(), self.get_serializer_class())
@@ -2,6 +2,16 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from core.models import *
+from core.generic import load_generic_objects
+from core.ratings import rating_summary
+
+class GenericRelationListSerializer(serializers.ListSerializer):
+    """Resolves content_type/object_id targets for the whole page before serializing rows"""
+    
+    def to_representation(self, data):
+        iterable = data.all() if hasattr(data, 'all') else data
+        load_objects = getattr(self.child.Meta, 'generic_load_objects', True)
+        return super().to_representation(load_generic_objects(iterable, load_objects=load_objects))
 
 class CitySerializer(serializers.ModelSerializer):
     class Meta:
@@ -18,13 +28,17 @@ class AttractionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Attraction
-        fields = '__all__'
+        exclude = ['content_fingerprint']
 
 class AttractionDetailSerializer(AttractionSerializer):
     city_name = serializers.ReadOnlyField(source='city.name')
+    user_ratings = serializers.SerializerMethodField()
     
     class Meta(AttractionSerializer.Meta):
         pass
+    
+    def get_user_ratings(self, obj):
+        return rating_summary(obj)
 
 class CuisineSerializer(serializers.ModelSerializer):
     class Meta:
@@ -37,13 +51,17 @@ class RestaurantSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Restaurant
-        fields = '__all__'
+        exclude = ['content_fingerprint']
 
 class RestaurantDetailSerializer(RestaurantSerializer):
     city_name = serializers.ReadOnlyField(source='city.name')
+    user_ratings = serializers.SerializerMethodField()
     
     class Meta(RestaurantSerializer.Meta):
         pass
+    
+    def get_user_ratings(self, obj):
+        return rating_summary(obj)
 
 class EventTypeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -57,7 +75,7 @@ class EventSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ['content_fingerprint']
         
     def get_formatted_date(self, obj):
         return obj.date.strftime('%B %d, %Y')
@@ -112,7 +130,7 @@ class TransportOptionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = TransportOption
-        fields = '__all__'
+        exclude = ['content_fingerprint']
 
 class TransportOptionDetailSerializer(TransportOptionSerializer):
     city_name = serializers.ReadOnlyField(source='city.name')
@@ -153,6 +171,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'user_name', 'content_type', 'content_type_str', 
                   'object_id', 'rating', 'comment', 'created_at']
         read_only_fields = ['user', 'created_at']
+        list_serializer_class = GenericRelationListSerializer
+        generic_load_objects = False  # Only the content type is serialized
     
     def get_user_name(self, obj):
         return obj.user.get_full_name() or obj.user.username
@@ -168,6 +188,8 @@ class FavoriteSerializer(serializers.ModelSerializer):
         model = Favorite
         fields = ['id', 'user', 'content_type', 'content_type_str', 'object_id', 'item_details']
         read_only_fields = ['user']
+        # Items of a list are loaded with one query per content type
+        list_serializer_class = GenericRelationListSerializer
     
     def get_content_type_str(self, obj):
         return obj.content_type.model
@@ -175,7 +197,9 @@ class FavoriteSerializer(serializers.ModelSerializer):
     def get_item_details(self, obj):
         # Return basic details of the favorited item
         model_class = obj.content_type.model_class()
-        item = model_class.objects.get(id=obj.object_id)
+        item = obj.content_object
+        if item is None:
+            return None
         
         # Determine what fields to return based on the model
         if model_class == Attraction:
@@ -210,4 +234,25 @@ class ContactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contact
         fields = ['id', 'user', 'name', 'email', 'subject', 'message', 'created_at']
-        read_only_fields = ['user', 'created_at']
\ No newline at end of file
+        read_only_fields = ['user', 'created_at']
+
+class ScrapeRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScrapeRun
+        fields = [
+            'id', 'scraper', 'status', 'started_at', 'finished_at', 'duration',
+            'pages_fetched', 'errors', 'items_parsed', 'items_saved', 'error'
+        ]
+
+class ScrapeJobSerializer(serializers.ModelSerializer):
+    requested_by = serializers.StringRelatedField()
+    runs = ScrapeRunSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = ScrapeJob
+        fields = [
+            'id', 'scraper_type', 'status', 'requested_by', 'created_at', 'started_at', 'finished_at',
+            'heartbeat_at', 'current_scraper', 'pages_fetched', 'records_saved', 'errors', 'error',
+            'cancel_requested', 'runs'
+        ]
+        read_only_fields = [field for field in fields if field != 'scraper_type']
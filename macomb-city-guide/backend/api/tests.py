@@ -1,3 +1,447 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.benchmark import SCENARIOS, load_budgets
+from core.cache import catalog_cache, lookup_stats
+from core.scraping import jobs
+from core.scraping.transport_scraper import TransportScraper
+from core.views import city_overview
+from core.models import (
+    City, Category, Attraction, Cuisine, Restaurant, EventType, Event,
+    PropertyType, Property, TransportType, TransportOption, ScrapeJob, ScrapeRun
+)
+
+
+class CatalogQueryCountTests(TestCase):
+    """List and detail endpoints run a constant number of queries per page"""
+
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+        self.count = 0
+
+    def seed(self, rows):
+        # Every row gets its own related objects so a missing join shows up as extra queries
+        for _ in range(rows):
+            self.count += 1
+            i = self.count
+            city = City.objects.create(name=f'City {i}')
+            Attraction.objects.create(
+                name=f'Attraction {i}', description='d', address='a',
+                category=Category.objects.create(name=f'Category {i}'), city=city,
+            )
+            Restaurant.objects.create(
+                name=f'Restaurant {i}', description='d', address='a',
+                cuisine=Cuisine.objects.create(name=f'Cuisine {i}'), city=city,
+            )
+            Event.objects.create(
+                name=f'Event {i}', description='d', venue='v', address='a',
+                event_type=EventType.objects.create(name=f'Type {i}'),
+                date=date(2030, 1, 1), time=time(18, 0), city=city,
+            )
+            Property.objects.create(
+                title=f'Property {i}', slug=f'property-{i}', description='d', address='a', price=1000,
+                property_type=PropertyType.objects.create(name=f'Type {i}'), city=city,
+            )
+            TransportOption.objects.create(
+                name=f'Transport {i}', description='d',
+                transport_type=TransportType.objects.create(name=f'Type {i}'), city=city,
+            )
+
+    def count_queries(self, url):
+        catalog_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        urls = ['/api/attractions/', '/api/restaurants/', '/api/events/', '/api/properties/', '/api/transportation/']
+
+        self.seed(2)
+        small = {url: self.count_queries(url) for url in urls}
+        self.seed(7)
+        full = {url: self.count_queries(url) for url in urls}
+
+        self.assertEqual(small, full)
+
+    def test_detail_query_count(self):
+        self.seed(1)
+        # One query for the object and its joined relations, plus the
+        # rating aggregate lookup for user_ratings where it is shown
+        expected = {
+            '/api/attractions/': 2,
+            '/api/restaurants/': 2,
+            '/api/events/': 1,
+            '/api/transportation/': 1,
+        }
+        for url, queries in expected.items():
+            object_id = self.client.get(url).json()['results'][0]['id']
+            self.assertEqual(self.count_queries(f'{url}{object_id}/'), queries, url)
+
+
+class CatalogResponseCacheTests(TestCase):
+    """Cached list and detail responses expire per model on save and delete"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Macomb')
+        cls.category = Category.objects.create(name='Parks')
+        cls.attraction = Attraction.objects.create(
+            name='Stony Creek', description='d', address='a', category=cls.category, city=cls.city
+        )
+        Restaurant.objects.create(
+            name='Diner', description='d', address='a', cuisine=Cuisine.objects.create(name='American'),
+            city=cls.city,
+        )
+
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response
+
+    def test_hits_are_served_without_queries(self):
+        first = self.get('/api/attractions/?ordering=-rating&search=')
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        # Parameter order and blank parameters don't change the key
+        with self.assertNumQueries(0):
+            second = self.get('/api/attractions/?ordering=-rating')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.json(), first.json())
+
+        self.assertEqual(self.get('/api/attractions/?ordering=name')['X-Cache'], 'MISS')
+        self.assertEqual(lookup_stats(['attraction'])['attraction'], {'hits': 1, 'misses': 2, 'hit_rate': 0.3333})
+
+    def test_saves_expire_endpoints_of_the_model(self):
+        detail = f'/api/attractions/{self.attraction.pk}/'
+        for url in ('/api/attractions/', detail, '/api/restaurants/'):
+            self.get(url)
+
+        self.attraction.name = 'Stony Creek Metropark'
+        self.attraction.save()
+
+        response = self.get(detail)
+        self.assertEqual((response['X-Cache'], response.json()['name']), ('MISS', 'Stony Creek Metropark'))
+        self.assertEqual(self.get('/api/attractions/')['X-Cache'], 'MISS')
+        self.assertEqual(self.get('/api/restaurants/')['X-Cache'], 'HIT')
+
+        # Attraction responses embed the category name
+        self.category.name = 'Outdoors'
+        self.category.save()
+        response = self.get('/api/attractions/')
+        self.assertEqual((response['X-Cache'], response.json()['results'][0]['category_name']), ('MISS', 'Outdoors'))
+        self.assertEqual(self.get('/api/restaurants/')['X-Cache'], 'HIT')
+
+    def test_deletes_expire_endpoints_of_the_model(self):
+        detail = f'/api/attractions/{self.attraction.pk}/'
+        self.get(detail)
+        self.assertEqual(self.get('/api/attractions/').json()['count'], 1)
+
+        self.attraction.delete()
+        self.assertEqual(self.client.get(detail).status_code, 404)
+        response = self.get('/api/attractions/')
+        self.assertEqual((response['X-Cache'], response.json()['count']), ('MISS', 0))
+
+
+class CatalogPaginationTests(TestCase):
+    """Cursor and no-count modes of CatalogPagination"""
+
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name='Macomb')
+        event_type = EventType.objects.create(name='Music')
+        # Several events share a date and time so the id tie-breaker matters
+        for i in range(20):
+            Event.objects.create(
+                name=f'Event {i}', description='d', venue='v', address='a', event_type=event_type,
+                date=date(2030, 1, 1 + i // 6), time=time(18 + i % 2, 0), city=city,
+            )
+
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+
+    def expected_ids(self):
+        return list(Event.objects.order_by('date', 'time', 'id').values_list('id', flat=True))
+
+    def walk(self, url, link):
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids.extend(row['id'] for row in data['results'])
+            url = data[link]
+        return ids, data
+
+    def test_cursor_walks_every_row_once(self):
+        ids, last_page = self.walk('/api/events/?paginate=cursor', 'next')
+        self.assertEqual(ids, self.expected_ids())
+        self.assertNotIn('count', last_page)
+
+        # Walking back from the last page returns the same rows in page order
+        pages = []
+        url = last_page['previous']
+        while url:
+            data = self.client.get(url).json()
+            pages.insert(0, [row['id'] for row in data['results']])
+            url = data['previous']
+        self.assertEqual(sum(pages, []), self.expected_ids()[:-len(last_page['results'])])
+        self.assertTrue(all(len(page) == 9 for page in pages))
+
+    def test_cursor_follows_ordering_param(self):
+        ids, _ = self.walk('/api/events/?paginate=cursor&ordering=-date', 'next')
+        expected = list(Event.objects.order_by('-date', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_cursor_pages_skip_count_and_offset(self):
+        first = self.client.get('/api/events/?paginate=cursor').json()
+        catalog_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(first['next'])
+        self.assertEqual(response.status_code, 200)
+        sql = [query['sql'] for query in context.captured_queries]
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('COUNT(', sql[0])
+        self.assertNotIn('OFFSET', sql[0])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/events/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_no_count_mode(self):
+        with CaptureQueriesContext(connection) as context:
+            data = self.client.get('/api/events/?count=false').json()
+        self.assertFalse(any('COUNT(' in query['sql'] for query in context.captured_queries))
+        self.assertIsNone(data['count'])
+        self.assertEqual(len(data['results']), 9)
+
+        ids, _ = self.walk('/api/events/?count=false', 'next')
+        self.assertEqual(ids, self.expected_ids())
+
+
+class DashboardStatsTests(TestCase):
+    """Dashboard and city overview counts come from single aggregated queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.macomb = City.objects.create(name='Macomb')
+        cls.other = City.objects.create(name='Quincy')
+        category = Category.objects.create(name='Parks')
+        event_type = EventType.objects.create(name='Music')
+        for i in range(3):
+            Attraction.objects.create(name=f'Park {i}', description='d', address='a', category=category, city=cls.macomb)
+        Attraction.objects.create(name='River', description='d', address='a', category=category, city=cls.other)
+        Event.objects.create(
+            name='Past', description='d', venue='v', address='a', event_type=event_type,
+            date=date(2000, 1, 1), time=time(18, 0), city=cls.macomb,
+        )
+        Event.objects.create(
+            name='Future', description='d', venue='v', address='a', event_type=event_type,
+            date=date(2099, 1, 1), time=time(18, 0), city=cls.macomb,
+        )
+
+    def test_dashboard_counts(self):
+        client = APIClient()
+        # One query for every count, one per recent list
+        with self.assertNumQueries(4):
+            data = client.get('/api/dashboard/stats/').json()
+        self.assertEqual(data['counts'], {
+            'attractions': 4, 'restaurants': 0, 'events': 2,
+            'properties': 0, 'transportation': 0, 'users': 0,
+        })
+        self.assertNotIn('cities', data)
+
+    def test_dashboard_city_breakdown(self):
+        data = APIClient().get('/api/dashboard/stats/?by_city=true').json()
+        cities = {city['name']: city['counts'] for city in data['cities']}
+        self.assertEqual(cities['Macomb']['attractions'], 3)
+        self.assertEqual(cities['Macomb']['events'], 2)
+        self.assertEqual(cities['Macomb']['upcoming_events'], 1)
+        self.assertEqual(cities['Quincy'], {
+            'attractions': 1, 'restaurants': 0, 'events': 0, 'upcoming_events': 0,
+            'properties': 0, 'transportation': 0,
+        })
+
+    def test_city_overview(self):
+        request = APIRequestFactory().get('/cities/Macomb/overview/')
+        with self.assertNumQueries(1):
+            response = city_overview(request, city_name='Macomb')
+        self.assertEqual(response.data['stats'], {
+            'attractions': 3, 'restaurants': 0, 'upcoming_events': 1, 'properties': 0,
+        })
+
+
+class CatalogExportTests(TestCase):
+    """Streaming NDJSON/CSV exports of the catalog viewsets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name='Macomb')
+        property_type = PropertyType.objects.create(name='House')
+        for i in range(5):
+            Property.objects.create(
+                title=f'Property {i}', slug=f'property-{i}', description='d', address='a',
+                price=1000 + i, property_type=property_type, city=city, for_sale=i % 2 == 0,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_export(self):
+        response = self.client.get('/api/properties/export/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['title'] for row in rows], [f'Property {i}' for i in range(5)])
+        self.assertEqual(rows[0]['property_type_name'], 'House')
+
+    def test_csv_export_applies_filters(self):
+        response = self.client.get('/api/properties/export/?format=csv&for_sale=true')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual([row['title'] for row in rows], ['Property 0', 'Property 2', 'Property 4'])
+
+    def test_updated_since(self):
+        Property.objects.filter(slug='property-3').update(updated_at=timezone.now() + timedelta(days=1))
+        since = (timezone.now() + timedelta(hours=1)).isoformat()
+        response = self.client.get('/api/properties/export/', {'updated_since': since})
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Property 3'])
+
+        self.assertEqual(self.client.get('/api/properties/export/?updated_since=yesterday').status_code, 400)
+
+    def test_query_count_is_constant(self):
+        # Joins come from the serializer plan, so the whole export is one query
+        with CaptureQueriesContext(connection) as context:
+            self.read(self.client.get('/api/properties/export/'))
+        self.assertEqual(len(context.captured_queries), 1)
+
+
+class BenchmarkHarnessTests(TestCase):
+    """benchmark_api runs every scenario and reports against the budgets"""
+
+    def test_budgets_cover_every_scenario(self):
+        self.assertEqual(set(load_budgets()), {name for name, _, _ in SCENARIOS})
+
+    def test_small_run_report(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        output = os.path.join(directory, 'report.json')
+
+        call_command(
+            'benchmark_api', sizes=[60], repeat=1, output=output, report_only=True, stdout=io.StringIO(),
+            stderr=io.StringIO()
+        )
+        with open(output, encoding='utf-8') as handle:
+            report = json.load(handle)
+
+        results = report['results']['60']
+        self.assertEqual(set(results), {name for name, _, _ in SCENARIOS})
+        for name, metrics in results.items():
+            self.assertEqual(metrics['status'], 200, name)
+            self.assertGreater(metrics['bytes'], 0, name)
+        # Latency depends on the machine, query counts must not regress
+        self.assertEqual([violation for violation in report['violations'] if 'queries' in violation], [])
+
+    def test_shared_catalog_cache_is_left_alone(self):
+        catalog_cache().clear()
+        catalog_cache().set('sentinel', 'kept', timeout=None)
+        call_command(
+            'benchmark_api', sizes=[20], repeat=1, only=['attractions-list', 'homepage'], output='-',
+            report_only=True, stdout=io.StringIO(), stderr=io.StringIO()
+        )
+        self.assertEqual(catalog_cache().get('sentinel'), 'kept')
+        self.assertEqual(lookup_stats(['attraction'])['attraction']['misses'], 0)
+
+
+class ScrapeJobApiTests(TestCase):
+    """Scrapes are queued as jobs, polled for progress and cancelled"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+
+    def routes(self, count):
+        def source():
+            for index in range(count):
+                yield {'name': f'Route {index}', 'description': 'd', 'transport_type': 'Bus'}
+        return {'bus': source}
+
+    def test_post_queues_without_running(self):
+        with mock.patch.object(jobs, 'get_job_executor') as executor, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/scrape/', {'type': 'transportation'}, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'queued')
+        job = ScrapeJob.objects.get()
+        self.assertTrue(response['Location'].endswith(f'/api/scrape/jobs/{job.pk}/'))
+        executor.return_value.submit.assert_called_once_with(jobs._run_in_thread, job.pk)
+
+        self.assertEqual(self.client.post('/api/scrape/', {'type': 'everything'}, format='json').status_code, 400)
+        self.client.force_authenticate(User.objects.create_user('visitor'))
+        self.assertEqual(self.client.post('/api/scrape/', {'type': 'all'}, format='json').status_code, 403)
+
+    def test_job_progress_is_polled(self):
+        job = ScrapeJob.objects.create(scraper_type='transportation')
+        with mock.patch.object(TransportScraper, 'record_sources', lambda scraper: self.routes(3)):
+            jobs.run_job(job.pk)
+
+        data = self.client.get(f'/api/scrape/jobs/{job.pk}/').json()
+        self.assertEqual((data['status'], data['records_saved'], data['current_scraper']), ('succeeded', 3, ''))
+        self.assertEqual([(run['scraper'], run['items_saved']) for run in data['runs']], [('transportation', 3)])
+        self.assertEqual(TransportOption.objects.count(), 3)
+
+    def test_failed_run_setup_fails_the_job(self):
+        job = ScrapeJob.objects.create(scraper_type='transportation')
+        with mock.patch.object(ScrapeRun.objects, 'create', side_effect=DatabaseError('disk full')), \
+                self.assertLogs('scraper', 'ERROR'):
+            jobs.run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', 'disk full'))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_cancel_queued_and_running_jobs(self):
+        queued = ScrapeJob.objects.create(scraper_type='events')
+        response = self.client.post(f'/api/scrape/jobs/{queued.pk}/cancel/')
+        self.assertEqual(response.json()['status'], 'cancelled')
+        jobs.run_job(queued.pk)  # Cancelled before it started, nothing runs
+        self.assertFalse(queued.runs.exists())
+        self.assertEqual(self.client.post(f'/api/scrape/jobs/{queued.pk}/cancel/').status_code, 409)
+
+        running = ScrapeJob.objects.create(scraper_type='transportation')
+        save = TransportScraper.save_to_database
+
+        def save_then_cancel(scraper, batch):
+            # Cancelled from the API while the first batch is written
+            self.client.post(f'/api/scrape/jobs/{running.pk}/cancel/')
+            return save(scraper, batch)
+
+        with mock.patch.object(TransportScraper, 'record_sources', lambda scraper: self.routes(250)), \
+                mock.patch.object(TransportScraper, 'save_to_database', save_then_cancel):
+            jobs.run_job(running.pk)
 
-# Create your tests here.
+        running.refresh_from_db()
+        self.assertEqual((running.status, running.records_saved), ('cancelled', 100))
+        self.assertEqual(TransportOption.objects.count(), 100)
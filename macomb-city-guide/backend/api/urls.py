@@ -2,6 +2,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import *
+from core import views as core_views
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
@@ -20,6 +21,7 @@ router.register(r'users', UserViewSet)
 router.register(r'favorites', FavoriteViewSet, basename='favorite')
 router.register(r'reviews', ReviewViewSet, basename='review')
 router.register(r'contact', ContactViewSet, basename='contact')
+router.register(r'scrape/jobs', ScrapeJobViewSet, basename='scrape-job')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -27,6 +29,13 @@ urlpatterns = [
     path('auth/', include('rest_framework.urls')),
     path('scrape/', ScraperView.as_view(), name='scrape'),
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('homepage/', core_views.homepage_data, name='homepage-data'),
+    
+    # Spatial lookups
+    path('attractions/<int:pk>/nearby/', core_views.nearby_attractions, name='nearby-attractions'),
+    path('nearby-restaurants/<int:restaurant_id>/', core_views.nearby_restaurants, name='nearby-restaurants'),
+    path('properties/<int:pk>/nearby/', core_views.nearby_properties, name='nearby-properties'),
     
     # JWT Authentication
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -1,3 +1,4 @@
+import math
 from django.shortcuts import render
 from rest_framework import viewsets, filters
 from django_filters.rest_framework import DjangoFilterBackend
@@ -8,44 +9,78 @@ from django.contrib.auth.models import User
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from itertools import chain
 from django.db.models import Q
-from django.core.management import call_command
+from rest_framework.reverse import reverse
 from django.utils import timezone 
+from core.search import search as search_catalog
+from core.cache import lookup_stats
+from core.scraping.jobs import cancel_job, enqueue_job
+from core.stats import city_counts, total_counts
+from .cache import CachedResponseMixin, cached_viewsets
+from .prefetch import QueryPlanMixin
+from .pagination import CatalogPagination
+from .export import ExportMixin
 
-class AttractionViewSet(viewsets.ReadOnlyModelViewSet):
+def filter_min_rating(queryset, request):
+    # Filter on the materialized combined rating, no aggregation over reviews needed
+    min_rating = request.query_params.get('min_rating')
+    if min_rating:
+        try:
+            min_rating = float(min_rating)
+        except ValueError:
+            min_rating = math.nan
+        if not math.isfinite(min_rating):
+            raise ValidationError({'min_rating': 'Use a number, e.g. 4 or 4.5.'})
+        queryset = queryset.filter(combined_rating__gte=min_rating)
+    return queryset
+
+class AttractionViewSet(CachedResponseMixin, ExportMixin, QueryPlanMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Attraction.objects.all().order_by('id')  # Proper ordering
     serializer_class = AttractionSerializer
     detail_serializer_class = AttractionDetailSerializer
+    cache_models = [Attraction, Category, City, RatingAggregate]  # Invalidate when any of these change
+    pagination_class = CatalogPagination  # ?paginate=cursor or ?count=false for large listings
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'featured']
     search_fields = ['name', 'description']
-    ordering_fields = ['name', 'rating']
+    ordering_fields = ['name', 'rating', 'combined_rating']
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return self.detail_serializer_class
         return super().get_serializer_class()
+    
+    def get_queryset(self):
+        return filter_min_rating(super().get_queryset(), self.request)
 
-class RestaurantViewSet(viewsets.ReadOnlyModelViewSet):
+class RestaurantViewSet(CachedResponseMixin, ExportMixin, QueryPlanMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Restaurant.objects.all().order_by('id')  # Proper ordering
     serializer_class = RestaurantSerializer
     detail_serializer_class = RestaurantDetailSerializer
+    cache_models = [Restaurant, Cuisine, City, RatingAggregate]  # Invalidate when any of these change
+    pagination_class = CatalogPagination  # ?paginate=cursor or ?count=false for large listings
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['cuisine', 'price_level', 'featured']
     search_fields = ['name', 'description']
-    ordering_fields = ['name', 'rating', 'price_level']
+    ordering_fields = ['name', 'rating', 'price_level', 'combined_rating']
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return self.detail_serializer_class
         return super().get_serializer_class()
+    
+    def get_queryset(self):
+        return filter_min_rating(super().get_queryset(), self.request)
 
-class EventViewSet(viewsets.ReadOnlyModelViewSet):
+class EventViewSet(CachedResponseMixin, ExportMixin, QueryPlanMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Event.objects.all().order_by('date', 'time')
     serializer_class = EventSerializer
     detail_serializer_class = EventDetailSerializer
+    cache_models = [Event, EventType, City]  # Invalidate when any of these change
+    pagination_class = CatalogPagination  # ?paginate=cursor or ?count=false for large listings
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['event_type', 'featured', 'date']
     search_fields = ['name', 'description', 'venue']
@@ -56,10 +91,12 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
             return self.detail_serializer_class
         return super().get_serializer_class()
 
-class PropertyViewSet(viewsets.ReadOnlyModelViewSet):
+class PropertyViewSet(CachedResponseMixin, ExportMixin, QueryPlanMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Property.objects.all()
     serializer_class = PropertySerializer
     detail_serializer_class = PropertyDetailSerializer
+    cache_models = [Property, PropertyType, PropertyImage]  # Invalidate when any of these change
+    pagination_class = CatalogPagination  # ?paginate=cursor or ?count=false for large listings
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['property_type', 'bedrooms', 'bathrooms', 'for_sale']
     search_fields = ['title', 'description', 'address']
@@ -83,10 +120,12 @@ class PropertyViewSet(viewsets.ReadOnlyModelViewSet):
             
         return queryset
 
-class TransportOptionViewSet(viewsets.ReadOnlyModelViewSet):
+class TransportOptionViewSet(CachedResponseMixin, ExportMixin, QueryPlanMixin, viewsets.ReadOnlyModelViewSet):
     queryset = TransportOption.objects.all()
     serializer_class = TransportOptionSerializer
     detail_serializer_class = TransportOptionDetailSerializer
+    cache_models = [TransportOption, TransportType, City]  # Invalidate when any of these change
+    pagination_class = CatalogPagination  # ?paginate=cursor or ?count=false for large listings
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['transport_type']
     search_fields = ['name', 'description', 'routes']
@@ -96,23 +135,23 @@ class TransportOptionViewSet(viewsets.ReadOnlyModelViewSet):
             return self.detail_serializer_class
         return super().get_serializer_class()
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
-class CuisineViewSet(viewsets.ReadOnlyModelViewSet):
+class CuisineViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Cuisine.objects.all()
     serializer_class = CuisineSerializer
 
-class EventTypeViewSet(viewsets.ReadOnlyModelViewSet):
+class EventTypeViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = EventType.objects.all()
     serializer_class = EventTypeSerializer
 
-class PropertyTypeViewSet(viewsets.ReadOnlyModelViewSet):
+class PropertyTypeViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PropertyType.objects.all()
     serializer_class = PropertyTypeSerializer
 
-class TransportTypeViewSet(viewsets.ReadOnlyModelViewSet):
+class TransportTypeViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = TransportType.objects.all()
     serializer_class = TransportTypeSerializer
 
@@ -173,7 +212,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
     filterset_fields = ['content_type', 'object_id']
     
     def get_queryset(self):
-        return Review.objects.all().order_by('-created_at')
+        return Review.objects.select_related('user').order_by('-created_at')
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -203,28 +242,14 @@ class GlobalSearchView(APIView):
             return Response({"error": "Search query must be at least 2 characters"}, 
                             status=status.HTTP_400_BAD_REQUEST)
         
-        # Search across multiple models
-        attractions = Attraction.objects.filter(
-            Q(name__icontains=query) | Q(description__icontains=query)
-        )[:10]
-        
-        restaurants = Restaurant.objects.filter(
-            Q(name__icontains=query) | Q(description__icontains=query)
-        )[:10]
-        
-        events = Event.objects.filter(
-            Q(name__icontains=query) | Q(description__icontains=query)
-        ).order_by('date')[:10]
-        
-        # Fix the syntax error in this query
-        properties = Property.objects.filter(
-            Q(title__icontains=query) | Q(description__icontains=query) | 
-            Q(address__icontains=query)
-        )[:10]
-        
-        transport = TransportOption.objects.filter(
-            Q(name__icontains=query) | Q(description__icontains=query)
-        )[:10]
+        # One ranked query against the full-text index covers all five models.
+        # Words match by prefix rather than substring, see core/search.py
+        results = search_catalog(query, limit=10)
+        attractions = results[Attraction]
+        restaurants = results[Restaurant]
+        events = results[Event]
+        properties = results[Property]
+        transport = results[TransportOption]
         
         # Serialize the results
         attraction_data = AttractionSerializer(attractions, many=True).data
@@ -245,42 +270,52 @@ class ScraperView(APIView):
     permission_classes = [IsAdminUser]
     
     def post(self, request):
-        scraper_type = request.data.get('type', 'all')
-        valid_types = ['attractions', 'restaurants', 'events', 'properties', 'transportation', 'all']
-        
-        if scraper_type not in valid_types:
+        # The scrape runs for hours, so it is queued as a job and polled at its URL
+        serializer = ScrapeJobSerializer(data={'scraper_type': request.data.get('type', 'all')})
+        if not serializer.is_valid():
+            valid_types = [choice for choice, _ in ScrapeJob.TYPE_CHOICES]
             return Response({"error": f"Invalid scraper type. Choose from: {', '.join(valid_types)}"},
                            status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            # Run the scraper in background for production
-            # For demo purposes, we'll run it synchronously
-            call_command('scrapenow', type=scraper_type)
-            return Response({"status": "success", "message": f"Started scraping for {scraper_type}"})
-        except Exception as e:
-            return Response({"status": "error", "message": str(e)},
-                           status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        job = serializer.save(requested_by=request.user)
+        enqueue_job(job)
+        url = reverse('scrape-job-detail', args=[job.pk], request=request)
+        return Response(ScrapeJobSerializer(job).data, status=status.HTTP_202_ACCEPTED, headers={'Location': url})
+
+class ScrapeJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Scrape jobs queued through POST /api/scrape/, polled for progress and cancelled here"""
+    queryset = ScrapeJob.objects.select_related('requested_by').prefetch_related('runs')
+    serializer_class = ScrapeJobSerializer
+    permission_classes = [IsAdminUser]
+    filterset_fields = ['status', 'scraper_type']
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        job = self.get_object()
+        if job.finished:
+            return Response({"error": f"Job already {job.status}"}, status=status.HTTP_409_CONFLICT)
+        job = cancel_job(job)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
 
 class DashboardStatsView(APIView):
     permission_classes = [AllowAny]  # Allow public access
     
     def get(self, request):
         try:
-            # Count various data points
-            attraction_count = Attraction.objects.count()
-            restaurant_count = Restaurant.objects.count()
-            event_count = Event.objects.count()
-            property_count = Property.objects.count()
-            transport_count = TransportOption.objects.count()
-            user_count = User.objects.count()
+            # All counts in one query
+            counts = total_counts()
             
             # Get recent items
-            recent_attractions = AttractionSerializer(Attraction.objects.order_by('-id')[:5], many=True).data
-            recent_restaurants = RestaurantSerializer(Restaurant.objects.order_by('-id')[:5], many=True).data
+            recent_attractions = AttractionSerializer(
+                Attraction.objects.select_related('category').order_by('-id')[:5], many=True
+            ).data
+            recent_restaurants = RestaurantSerializer(
+                Restaurant.objects.select_related('cuisine').order_by('-id')[:5], many=True
+            ).data
             
             # Handle date filter safely
             recent_events = EventSerializer(
-                Event.objects.filter(date__gte=timezone.now().date()).order_by('date')[:5], 
+                Event.objects.filter(date__gte=timezone.now().date()).select_related('event_type').order_by('date')[:5], 
                 many=True
             ).data
             
@@ -290,14 +325,14 @@ class DashboardStatsView(APIView):
             else:
                 recent_contacts = []
             
-            return Response({
+            data = {
                 'counts': {
-                    'attractions': attraction_count,
-                    'restaurants': restaurant_count,
-                    'events': event_count,
-                    'properties': property_count,
-                    'transportation': transport_count,
-                    'users': user_count,
+                    'attractions': counts['attractions'],
+                    'restaurants': counts['restaurants'],
+                    'events': counts['events'],
+                    'properties': counts['properties'],
+                    'transportation': counts['transportation'],
+                    'users': counts['users'],
                 },
                 'recent': {
                     'attractions': recent_attractions,
@@ -305,9 +340,26 @@ class DashboardStatsView(APIView):
                     'events': recent_events,
                     'contacts': recent_contacts,
                 }
-            })
+            }
+            
+            # ?by_city=true adds per-city counts for every city, also one query
+            if request.query_params.get('by_city', '').lower() in ('true', '1'):
+                data['cities'] = [
+                    {'id': city.id, 'name': city.name, 'counts': city_stats}
+                    for city, city_stats in city_counts()
+                ]
+            
+            return Response(data)
         except Exception as e:
             return Response(
                 {"error": f"Error fetching dashboard data: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        # Hit/miss counters for the cached catalog endpoints
+        endpoints = sorted({viewset.cache_endpoint() for viewset in cached_viewsets})
+        return Response(lookup_stats(endpoints))
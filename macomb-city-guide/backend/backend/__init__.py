@@ -0,0 +1,8 @@
+# Load the Celery app with Django so shared tasks bind to it; the site and
+# management commands run without Celery installed
+try:
+    from .celery import app as celery_app
+except ImportError:
+    celery_app = None
+
+__all__ = ('celery_app',)
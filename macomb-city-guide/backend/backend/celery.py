@@ -2,21 +2,21 @@ import os
 from celery import Celery
 from celery.schedules import crontab
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 app = Celery('macomb')
 app.config_from_object('django.conf:settings', namespace='CELERY')
+# The scrape tasks live in core/tasks.py: run_all_scrapers fans out to
+# scrape_source tasks on per-host queues, joined by finish_scrape. Start one
+# worker per queue with its concurrency from CELERY_SCRAPER_QUEUES, see
+# manage.py scrape_worker; host queues run a single process so the per-process
+# rate limiter covers every request to the host
 app.autodiscover_tasks()
 
-@app.task(bind=True, name="run_all_scrapers")
-def run_all_scrapers(self):
-    from django.core.management import call_command
-    call_command('run_scrapers', type='all')
-
 app.conf.beat_schedule = {
     'run-scrapers-daily': {
         'task': 'run_all_scrapers',
         'schedule': crontab(hour=2, minute=0),  # Run at 2:00 AM every day
         'args': (),
     },
-}
\ No newline at end of file
+}
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.instrumentation.RequestProfileMiddleware",  # Server-Timing and SQL profile, first so it times everything
     "corsheaders.middleware.CorsMiddleware",  # CORS middleware (add before CommonMiddleware)
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -159,3 +161,132 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Scraper settings
+SCRAPER_MAX_WORKERS = 8  # Thread pool size for concurrent page fetches
+SCRAPER_HOST_DELAYS = {
+    # Per-host politeness delay in seconds, e.g. 'www.zillow.com': 10
+}
+
+# On-disk HTTP cache for scraped pages (core/scraping/http_cache.py)
+SCRAPER_CACHE_ENABLED = True
+SCRAPER_CACHE_DIR = BASE_DIR / 'scraper_cache'
+SCRAPER_CACHE_TTL = 6 * 60 * 60  # Seconds a page is served without revalidating
+SCRAPER_CACHE_MAX_AGE = 14 * 24 * 60 * 60  # Evict entries unused for this long
+SCRAPER_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Evict least recently used entries above this size
+SCRAPER_OFFLINE = False  # Replay cached pages only, see run_scrapers --offline
+
+# Streaming scrape pipeline (core/scraping/pipeline.py)
+SCRAPER_PIPELINE_BUFFER = 200  # Parsed records held ahead of the persist stage
+SCRAPER_PERSIST_BATCH_SIZE = 100  # Records written per save_to_database call
+SCRAPER_PAGE_BATCH_SIZE = 2  # Listing pages per record source, the unit of Celery fan-out
+
+# Geocoding (core/geocoding.py): answers are cached per normalized address, the
+# gazetteer CSV (address, latitude, longitude) is consulted before Nominatim and,
+# with the cache, is all offline runs use. None ships with the repo;
+# geocode_catalog --export-gazetteer writes one from the cache to point this at
+GEOCODER_GAZETTEER = os.environ.get('GEOCODER_GAZETTEER') or None
+GEOCODER_NEGATIVE_TTL_DAYS = 30  # Addresses Nominatim could not place are retried after this
+
+# Scraped image downloads (core/scraping/images.py)
+SCRAPER_IMAGE_WORKERS = 4  # Concurrent image downloads per scraper
+SCRAPER_MAX_IMAGE_BYTES = 20 * 1024 * 1024  # Larger images are skipped
+
+# Headless browsers for JavaScript rendered pages (core/scraping/browser.py)
+SCRAPER_BROWSER_POOL_SIZE = 2  # Warm browsers shared by all scrapers in the process
+SCRAPER_BROWSER_MAX_USES = 25  # Pages a browser renders before it is replaced
+SCRAPER_BROWSER_READY_TIMEOUT = 20  # Seconds to wait for a page's selector and network idle
+
+# Scraper run telemetry (core/scraping/telemetry.py), every run is stored as a
+# ScrapeRun and the latest run per scraper is exported for a node_exporter
+# textfile collector when SCRAPER_METRICS_FILE is set, e.g. to
+# /var/lib/node_exporter/textfile_collector/scraper.prom
+SCRAPER_METRICS_FILE = os.environ.get('SCRAPER_METRICS_FILE') or None
+SCRAPER_REGRESSION_RATIO = 1.25  # run_scrapers warns when a run is this much slower than the last
+
+# Celery (backend/celery.py, core/tasks.py). Scrapes fan out to one task per
+# source and page batch on per-host queues; chords need a result backend
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://127.0.0.1:6379/2')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://127.0.0.1:6379/3')
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1  # Scrape tasks run for minutes, a worker takes one at a time
+CELERY_TASK_ROUTES = {
+    'run_all_scrapers': {'queue': 'scrape_finish'},
+    'finish_scrape': {'queue': 'scrape_finish'},
+    'run_scrape_job': {'queue': 'scrape_jobs'},
+}
+# Worker concurrency per queue, applied by manage.py scrape_worker. The per-host
+# rate limiter (core/scraping/fetcher.py) lives in one process, so each host
+# queue gets exactly one worker process and one worker overall; pages are still
+# fetched concurrently inside it by the FetchEngine threads, spaced per host.
+# More processes on a host queue would each keep their own spacing and multiply
+# the request rate, so scrape_worker refuses it
+CELERY_SCRAPER_QUEUES = {
+    'scrape_tripadvisor': 1,
+    'scrape_yelp': 1,
+    'scrape_events': 1,
+    'scrape_zillow': 1,  # Headless browser pages, one at a time
+    'scrape_transit': 1,
+    'scrape_finish': 1,
+    'scrape_jobs': 1,  # Scrapes started through the API, see SCRAPE_JOB_BACKEND
+}
+
+# Scrape jobs started through POST /api/scrape/ (core/scraping/jobs.py): 'thread'
+# runs them on a pool inside the web process, 'celery' on the scrape_jobs queue
+SCRAPE_JOB_BACKEND = os.environ.get('SCRAPE_JOB_BACKEND', 'thread')
+SCRAPE_JOB_WORKERS = 1  # Jobs run at once with the thread backend, later ones wait their turn
+SCRAPE_JOB_STALE_AFTER = 30 * 60  # Seconds without progress before a running job counts as lost
+
+# Response cache for the read-only catalog endpoints (api/cache.py). Pick the
+# backend with CATALOG_CACHE_BACKEND: locmem is per process, so scraper runs in
+# another process only reach the API and the homepage snapshots after
+# CATALOG_CACHE_TIMEOUT; file and redis are shared, so Celery workers can rebuild
+# the snapshots for the web processes. redis works with any Redis compatible
+# server (KeyDB, Valkey, ...)
+CATALOG_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CATALOG_CACHE_LOCATION', str(BASE_DIR / 'catalog_cache')),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CATALOG_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': CATALOG_CACHE_BACKENDS[os.environ.get('CATALOG_CACHE_BACKEND', 'locmem')],
+}
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_TIMEOUT = 600  # Seconds, also bounds staleness for writes the signals miss
+
+# Per-request SQL and timing profile (core/instrumentation.py). Off unless a
+# share of requests is sampled explicitly, e.g. REQUEST_PROFILE_SAMPLE_RATE=1 in
+# development or 0.05 in production; each profiled request logs a JSON line
+REQUEST_PROFILE_SAMPLE_RATE = float(os.environ.get('REQUEST_PROFILE_SAMPLE_RATE', 0))
+REQUEST_PROFILE_SLOW_QUERIES = 3  # Slowest statements included in each log line
+REQUEST_PROFILE_DUPLICATE_THRESHOLD = 3  # Same normalized statement this often is flagged as N+1
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'request_profile': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_PROFILE_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
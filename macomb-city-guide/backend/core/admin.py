@@ -71,3 +71,14 @@ class TransportOptionAdmin(admin.ModelAdmin):
     list_filter = ('transport_type', 'city')
     search_fields = ('name', 'description')
     prepopulated_fields = {'slug': ('name',)}
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'scraper_type', 'status', 'created_at', 'pages_fetched', 'records_saved', 'errors')
+    list_filter = ('scraper_type', 'status')
+
+@admin.register(ScrapeRun)
+class ScrapeRunAdmin(admin.ModelAdmin):
+    list_display = ('scraper', 'status', 'started_at', 'duration', 'pages_fetched', 'errors', 'items_saved')
+    list_filter = ('scraper', 'status')
+    readonly_fields = ('metrics',)
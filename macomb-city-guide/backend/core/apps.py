@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # Register model signal handlers
+        from . import signals  # noqa: F401
+
+        # Serializer time for the request profile middleware
+        from .instrumentation import instrument_serializers
+        instrument_serializers()
@@ -0,0 +1,82 @@
+# core/cache.py
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from core.models import (
+    City, Category, Attraction, Cuisine, Restaurant, EventType, Event,
+    PropertyType, Property, PropertyImage, TransportType, TransportOption
+)
+
+CATALOG_CACHE_ALIAS = getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')
+
+# Models whose changes invalidate cached catalog responses
+CATALOG_MODELS = [
+    City, Category, Attraction, Cuisine, Restaurant, EventType, Event,
+    PropertyType, Property, PropertyImage, TransportType, TransportOption,
+]
+
+
+def catalog_cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def catalog_cache_is_shared():
+    """False for a per-process backend, whose entries and versions other processes never see"""
+    return not isinstance(catalog_cache(), LocMemCache)
+
+
+def version_key(model):
+    return f"catalog:version:{model._meta.label_lower}"
+
+
+def model_versions(models):
+    """Current version of each model, cached responses embed these in their keys"""
+    cache = catalog_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(*models):
+    """Invalidate every cached response that depends on one of models
+
+    Versions are timestamps rather than counters, so an evicted version key
+    can never come back with a value an old cached response was stored under.
+    """
+    catalog_cache().set_many({version_key(model): time.time_ns() for model in models}, timeout=None)
+
+
+def record_lookup(endpoint, hit):
+    """Count a cache hit or miss for endpoint, shared by every process using the backend"""
+    cache = catalog_cache()
+    key = f"catalog:stats:{endpoint}:{'hits' if hit else 'misses'}"
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def lookup_stats(endpoints):
+    """Return {endpoint: {'hits': n, 'misses': n, 'hit_rate': ratio}}"""
+    cache = catalog_cache()
+    keys = [f"catalog:stats:{endpoint}:{kind}" for endpoint in endpoints for kind in ('hits', 'misses')]
+    counts = cache.get_many(keys)
+
+    stats = {}
+    for endpoint in endpoints:
+        hits = counts.get(f"catalog:stats:{endpoint}:hits", 0)
+        misses = counts.get(f"catalog:stats:{endpoint}:misses", 0)
+        stats[endpoint] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+    return stats
@@ -0,0 +1,69 @@
+# core/generic.py
+from collections import defaultdict
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from core.models import Attraction, Restaurant, Event, Property, TransportOption
+
+# Relations read when a generic target is summarized (e.g. FavoriteSerializer.item_details)
+GENERIC_SELECT_RELATED = {
+    Attraction: ['category'],
+    Restaurant: ['cuisine'],
+    Event: ['event_type'],
+    Property: ['property_type'],
+    TransportOption: ['transport_type'],
+}
+
+
+def _generic_field(model, ct_field, fk_field):
+    for field in model._meta.private_fields:
+        if isinstance(field, GenericForeignKey) and field.ct_field == ct_field and field.fk_field == fk_field:
+            return field
+    return None
+
+
+def load_generic_objects(items, ct_field='content_type', fk_field='object_id', load_objects=True,
+                         select_related=None, attname='content_object'):
+    """Resolve content_type/object_id pairs for a batch of rows with one query per target model
+
+    Works for any model using the pattern (Favorite, SavedItem, Review). Content
+    types come from the ContentType cache, and each target model is fetched with
+    a single in_bulk query. Targets are attached to the GenericForeignKey cache
+    when the model has one, otherwise to the attname attribute. Missing targets
+    resolve to None. Returns the items as a list.
+    """
+    items = list(items)
+    if not items:
+        return items
+
+    select_related = GENERIC_SELECT_RELATED if select_related is None else select_related
+    ct_attname = items[0]._meta.get_field(ct_field).attname
+    generic_field = _generic_field(type(items[0]), ct_field, fk_field)
+
+    ids_by_type = defaultdict(set)
+    for item in items:
+        content_type_id = getattr(item, ct_attname)
+        # Cached lookup, so content_type access no longer costs a query per row
+        setattr(item, ct_field, ContentType.objects.get_for_id(content_type_id))
+        ids_by_type[content_type_id].add(getattr(item, fk_field))
+
+    if not load_objects:
+        return items
+
+    objects = {}
+    for content_type_id, ids in ids_by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+        queryset = model._default_manager.all()
+        if select_related.get(model):
+            queryset = queryset.select_related(*select_related[model])
+        objects[content_type_id] = queryset.in_bulk(list(ids))
+
+    for item in items:
+        target = objects.get(getattr(item, ct_attname), {}).get(getattr(item, fk_field))
+        if generic_field is not None:
+            generic_field.set_cached_value(item, target)
+        else:
+            setattr(item, attname, target)
+
+    return items
@@ -0,0 +1,177 @@
+# core/geo.py
+import heapq
+import math
+import threading
+import time
+from django.conf import settings
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Seconds before a spatial index is rebuilt even without a local change signal,
+# so writes made by other processes are picked up
+SPATIAL_INDEX_TTL = getattr(settings, 'SPATIAL_INDEX_TTL', 300)
+
+
+def to_unit_vector(latitude, longitude):
+    """Convert latitude/longitude (degrees) to a point on the unit sphere"""
+    lat = math.radians(float(latitude))
+    lng = math.radians(float(longitude))
+    return (
+        math.cos(lat) * math.cos(lng),
+        math.cos(lat) * math.sin(lng),
+        math.sin(lat),
+    )
+
+
+def km_to_chord(distance_km):
+    """Straight-line distance through the unit sphere for a surface distance"""
+    angle = min(distance_km / EARTH_RADIUS_KM, math.pi)
+    return 2 * math.sin(angle / 2)
+
+
+def chord_to_km(chord):
+    return 2 * math.asin(min(chord / 2, 1.0)) * EARTH_RADIUS_KM
+
+
+class KDTree:
+    """Static 3-d tree over unit sphere points for nearest neighbour queries"""
+
+    def __init__(self, points):
+        # points: list of ((x, y, z), item)
+        self.size = len(points)
+        self.root = self._build(list(points), 0)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda point: point[0][axis])
+        middle = len(points) // 2
+        return (
+            points[middle][0],
+            points[middle][1],
+            axis,
+            self._build(points[:middle], depth + 1),
+            self._build(points[middle + 1:], depth + 1),
+        )
+
+    def nearest(self, target, k, max_distance=math.inf, exclude=None):
+        """Return up to k (distance, item) pairs within max_distance, closest first"""
+        if k <= 0:
+            return []
+
+        best = []  # max-heap of (-distance, counter, item)
+        max_sq = max_distance * max_distance
+        counter = 0
+        stack = [self.root]
+
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            point, item, axis, left, right = node
+
+            dist_sq = (
+                (point[0] - target[0]) ** 2 +
+                (point[1] - target[1]) ** 2 +
+                (point[2] - target[2]) ** 2
+            )
+            limit_sq = -best[0][0] if len(best) == k else max_sq
+            if dist_sq <= limit_sq and item != exclude:
+                counter += 1
+                if len(best) == k:
+                    heapq.heapreplace(best, (-dist_sq, counter, item))
+                else:
+                    heapq.heappush(best, (-dist_sq, counter, item))
+                limit_sq = -best[0][0] if len(best) == k else max_sq
+
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            # Only visit the far side if the splitting plane is within range
+            if delta * delta <= limit_sq:
+                stack.append(far)
+            stack.append(near)
+
+        return [(math.sqrt(-neg_sq), item) for neg_sq, _, item in sorted(best, reverse=True)]
+
+
+class SpatialIndex:
+    """In-process KD-tree over a model's latitude/longitude, rebuilt on change"""
+
+    def __init__(self, model, ttl=SPATIAL_INDEX_TTL):
+        self.model = model
+        self.ttl = ttl
+        self.tree = None
+        self.built_at = 0
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        self.tree = None
+
+    def _ensure_tree(self):
+        tree = self.tree
+        if tree is not None and time.monotonic() - self.built_at < self.ttl:
+            return tree
+
+        with self.lock:
+            if self.tree is not None and time.monotonic() - self.built_at < self.ttl:
+                return self.tree
+
+            rows = self.model.objects.filter(
+                latitude__isnull=False, longitude__isnull=False
+            ).values_list('pk', 'latitude', 'longitude')
+
+            # float() also handles the DecimalField coordinates on Property
+            points = [(to_unit_vector(lat, lng), pk) for pk, lat, lng in rows]
+            self.tree = KDTree(points)
+            self.built_at = time.monotonic()
+            return self.tree
+
+    def nearest(self, latitude, longitude, k=5, radius_km=None, exclude=None):
+        """Return up to k (pk, distance_km) pairs within radius_km, closest first"""
+        tree = self._ensure_tree()
+        max_distance = km_to_chord(radius_km) if radius_km is not None else math.inf
+        matches = tree.nearest(
+            to_unit_vector(latitude, longitude), k, max_distance=max_distance, exclude=exclude
+        )
+        return [(pk, chord_to_km(chord)) for chord, pk in matches]
+
+    def nearest_objects(self, latitude, longitude, k=5, radius_km=None, exclude=None, queryset=None):
+        """Return up to k model instances closest first, each with a distance_km attribute"""
+        matches = self.nearest(latitude, longitude, k=k, radius_km=radius_km, exclude=exclude)
+        if not matches:
+            return []
+
+        if queryset is None:
+            # Join the forward foreign keys so serializing the results doesn't query per row
+            queryset = self.model.objects.select_related(*(
+                field.name for field in self.model._meta.concrete_fields if field.many_to_one
+            ))
+        objects = queryset.in_bulk([pk for pk, _ in matches])
+
+        results = []
+        for pk, distance in matches:
+            obj = objects.get(pk)
+            if obj is not None:
+                obj.distance_km = round(distance, 3)
+                results.append(obj)
+        return results
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_spatial_index(model):
+    """Return the shared spatial index for a model with latitude/longitude fields"""
+    index = _indexes.get(model)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(model, SpatialIndex(model))
+    return index
+
+
+def invalidate_spatial_index(model):
+    index = _indexes.get(model)
+    if index is not None:
+        index.invalidate()
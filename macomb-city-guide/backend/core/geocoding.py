@@ -0,0 +1,248 @@
+# core/geocoding.py
+import csv
+import hashlib
+import logging
+import os
+import re
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from core.cache import bump_model_version
+from core.geo import invalidate_spatial_index
+from core.models import Attraction, Restaurant, Event, Property, GeocodedAddress
+
+logger = logging.getLogger('scraper')
+
+# Days before an address the geocoder could not place is asked about again
+NEGATIVE_TTL_DAYS = getattr(settings, 'GEOCODER_NEGATIVE_TTL_DAYS', 30)
+
+# Catalog models with an address and latitude/longitude columns
+GEOCODED_MODELS = [Attraction, Restaurant, Event, Property]
+
+# Spelled out and abbreviated forms share a cache entry
+ABBREVIATIONS = {
+    'street': 'st', 'road': 'rd', 'avenue': 'ave', 'drive': 'dr', 'boulevard': 'blvd',
+    'lane': 'ln', 'court': 'ct', 'highway': 'hwy', 'parkway': 'pkwy', 'place': 'pl',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w', 'township': 'twp',
+    'mount': 'mt', 'suite': 'ste', 'michigan': 'mi',
+}
+COUNTRY_SUFFIXES = (['united', 'states'], ['usa'], ['us'])
+
+
+def normalize_address(address):
+    """Lower case address without punctuation, with common words abbreviated"""
+    words = [ABBREVIATIONS.get(word, word) for word in re.sub(r'[^\w\s]', ' ', address.lower()).split()]
+    for suffix in COUNTRY_SUFFIXES:
+        if words[-len(suffix):] == suffix:
+            words = words[:-len(suffix)]
+    return ' '.join(words)
+
+
+def address_hash(normalized):
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def full_address(address, city_name=None):
+    """address with the city and state appended when it does not name the city"""
+    if not address:
+        return ''
+    if city_name and city_name.lower() not in address.lower():
+        return f"{address}, {city_name}, MI"
+    return address
+
+
+class GazetteerResolver:
+    """Addresses from a local CSV file with address, latitude and longitude columns"""
+    name = 'gazetteer'
+    network = False
+
+    def __init__(self, path):
+        self.path = path
+        self._index = None
+
+    def index(self):
+        if self._index is None:
+            index = {}
+            if self.path and os.path.exists(self.path):
+                with open(self.path, encoding='utf-8', newline='') as handle:
+                    for row in csv.DictReader(handle):
+                        index[normalize_address(row['address'])] = (float(row['latitude']), float(row['longitude']))
+            else:
+                logger.info(f"No gazetteer at {self.path}, offline geocoding finds nothing")
+            self._index = index
+        return self._index
+
+    def lookup(self, address, normalized):
+        return self.index().get(normalized)
+
+
+class NominatimResolver:
+    """OpenStreetMap Nominatim through geopy, spaced to its one request per second policy"""
+    name = 'nominatim'
+    network = True
+
+    def __init__(self, user_agent='macomb_city_guide', min_delay=1.0):
+        self.user_agent = user_agent
+        self.min_delay = min_delay
+        self._geocode = None
+        self.lock = threading.Lock()
+
+    def lookup(self, address, normalized):
+        with self.lock:
+            if self._geocode is None:
+                from geopy.extra.rate_limiter import RateLimiter
+                from geopy.geocoders import Nominatim
+
+                geolocator = Nominatim(user_agent=self.user_agent)
+                # Errors must raise, a swallowed error would be cached as a miss
+                self._geocode = RateLimiter(
+                    geolocator.geocode, min_delay_seconds=self.min_delay, max_retries=2, swallow_exceptions=False
+                )
+            location = self._geocode(address)
+        return (location.latitude, location.longitude) if location else None
+
+
+class Geocoder:
+    """Coordinates for addresses, read from GeocodedAddress before asking the resolvers
+
+    Resolvers are tried in order and answers are cached under the normalized
+    address, misses included so an address a network resolver could not place
+    is not asked about again for NEGATIVE_TTL_DAYS. Offline lookups skip
+    network resolvers and never cache a miss.
+    """
+
+    def __init__(self, resolvers, negative_ttl=timedelta(days=NEGATIVE_TTL_DAYS)):
+        self.resolvers = resolvers
+        self.negative_ttl = negative_ttl
+
+    def geocode(self, address, offline=False):
+        return self.geocode_many([address], offline=offline).get(address, (None, None))
+
+    def geocode_many(self, addresses, offline=False):
+        """{address: (latitude, longitude)}, (None, None) where unknown
+
+        Cached answers for the whole batch come from one query, and each
+        distinct normalized address reaches the resolvers at most once.
+        """
+        keys = {}
+        for address in addresses:
+            normalized = normalize_address(address or '')
+            if normalized:
+                keys[address] = (address_hash(normalized), normalized)
+
+        cached = {
+            entry.address_hash: entry
+            for entry in GeocodedAddress.objects.filter(address_hash__in={key for key, _ in keys.values()})
+        }
+        now = timezone.now()
+        answers = {}
+        resolved = []
+        for address, (key, normalized) in keys.items():
+            entry = cached.get(key)
+            if entry is not None and (entry.found or entry.checked_at > now - self.negative_ttl):
+                answers[key] = (entry.latitude, entry.longitude)
+                continue
+            if key in answers:
+                continue
+            coordinates, source = self.resolve(address, normalized, offline)
+            answers[key] = coordinates or (None, None)
+            if coordinates or source is not None:
+                latitude, longitude = answers[key]
+                resolved.append(GeocodedAddress(
+                    address_hash=key, address=normalized, latitude=latitude, longitude=longitude,
+                    source=source or '', checked_at=now
+                ))
+
+        if resolved:
+            GeocodedAddress.objects.bulk_create(
+                resolved, update_conflicts=True, unique_fields=['address_hash'],
+                update_fields=['latitude', 'longitude', 'source', 'checked_at']
+            )
+        return {address: answers.get(key, (None, None)) for address, (key, _) in keys.items()}
+
+    def resolve(self, address, normalized, offline):
+        """((latitude, longitude), resolver name), or (None, '') for a cacheable miss
+
+        (None, None) means no resolver gave a verdict, because lookups failed
+        or only offline resolvers were asked.
+        """
+        verdict = False
+        for resolver in self.resolvers:
+            if offline and resolver.network:
+                continue
+            try:
+                coordinates = resolver.lookup(address, normalized)
+            except Exception as e:
+                logger.warning(f"{resolver.name} failed to geocode {address}: {str(e)}")
+                continue
+            if coordinates:
+                return (round(coordinates[0], 6), round(coordinates[1], 6)), resolver.name
+            verdict = verdict or resolver.network
+        return None, ('' if verdict else None)
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder():
+    """Return the process wide geocoder, the gazetteer first and Nominatim after it"""
+    global _geocoder
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                _geocoder = Geocoder([
+                    GazetteerResolver(getattr(settings, 'GEOCODER_GAZETTEER', None)),
+                    NominatimResolver(),
+                ])
+    return _geocoder
+
+
+def backfill_coordinates(model, geocoder=None, offline=False, batch_size=500):
+    """Geocode model rows that have an address but no coordinates, returns (checked, filled)"""
+    geocoder = geocoder or get_geocoder()
+    queryset = model.objects.filter(
+        Q(latitude__isnull=True) | Q(longitude__isnull=True)
+    ).exclude(address='').select_related('city').only('pk', 'address', 'city__name').order_by('pk')
+
+    checked = filled = 0
+    last_pk = 0
+    while True:
+        # Keyset batches, filled rows drop out of the filter so offsets would skip rows
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        addresses = {obj.pk: full_address(obj.address, obj.city.name) for obj in batch}
+        coordinates = geocoder.geocode_many(addresses.values(), offline=offline)
+
+        now = timezone.now()
+        updated = []
+        for obj in batch:
+            latitude, longitude = coordinates.get(addresses[obj.pk], (None, None))
+            if latitude is not None:
+                obj.latitude, obj.longitude, obj.updated_at = latitude, longitude, now
+                updated.append(obj)
+        model.objects.bulk_update(updated, ['latitude', 'longitude', 'updated_at'])
+        checked += len(batch)
+        filled += len(updated)
+
+    if filled:
+        invalidate_spatial_index(model)
+        bump_model_version(model)
+    return checked, filled
+
+
+def export_gazetteer(path):
+    """Write every cached hit as gazetteer CSV, so later offline runs can place them"""
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['address', 'latitude', 'longitude'])
+        entries = GeocodedAddress.objects.filter(latitude__isnull=False, longitude__isnull=False).order_by('address')
+        for address, latitude, longitude in entries.values_list('address', 'latitude', 'longitude').iterator():
+            writer.writerow([address, latitude, longitude])
+            count += 1
+    return count
@@ -0,0 +1,87 @@
+# core/homepage.py
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from core.cache import catalog_cache, catalog_cache_is_shared, model_versions
+from core.models import City, Category, Attraction, Cuisine, Restaurant, EventType, Event
+from core.serializers import CitySerializer, AttractionSerializer, EventSerializer, RestaurantSerializer
+
+# Models read by the homepage payload, a change to any of them starts a new snapshot
+HOMEPAGE_MODELS = [City, Category, Attraction, Cuisine, Restaurant, EventType, Event]
+
+FEATURED_LIMIT = 5
+
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 600)
+
+
+class HomepageSnapshot:
+    """Rendered homepage JSON for one city and day, with its ETag"""
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+
+
+def homepage_payload(city, today):
+    """Featured attractions and restaurants and upcoming events of city, serialized"""
+    featured_attractions = Attraction.objects.filter(
+        city=city, featured=True
+    ).select_related('category')[:FEATURED_LIMIT]
+    upcoming_events = Event.objects.filter(
+        city=city,
+        date__gte=today
+    ).select_related('event_type').order_by('date', 'time')[:FEATURED_LIMIT]
+    featured_restaurants = Restaurant.objects.filter(
+        city=city, featured=True
+    ).select_related('cuisine')[:FEATURED_LIMIT]
+
+    return {
+        'city': CitySerializer(city).data,
+        'featured_attractions': AttractionSerializer(featured_attractions, many=True).data,
+        'upcoming_events': EventSerializer(upcoming_events, many=True).data,
+        'featured_restaurants': RestaurantSerializer(featured_restaurants, many=True).data,
+    }
+
+
+def snapshot_key(city_name, today):
+    # The date rolls "upcoming" over at midnight, the versions follow catalog edits
+    parts = [city_name, today.isoformat(), model_versions(HOMEPAGE_MODELS)]
+    digest = hashlib.sha1(json.dumps(parts).encode('utf-8')).hexdigest()
+    return f"homepage:snapshot:{digest}"
+
+
+def seconds_until_midnight(now=None):
+    now = timezone.localtime(now)
+    midnight = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), time.min))
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def build_snapshot(city_name, today=None):
+    """Render and store the homepage snapshot of city_name, raises Http404 for unknown cities"""
+    today = today or timezone.localdate()
+    city = get_object_or_404(City, name=city_name)
+
+    body = JSONRenderer().render(homepage_payload(city, today))
+    snapshot = HomepageSnapshot(body, f'"{hashlib.sha1(body).hexdigest()}"')
+
+    # Expire with the day, a newer catalog version gets a new key anyway. A per
+    # process cache never sees version bumps from scraper workers, so there the
+    # snapshot is as stale at most as the cached catalog responses
+    timeout = seconds_until_midnight()
+    if not catalog_cache_is_shared():
+        timeout = min(timeout, CATALOG_CACHE_TIMEOUT)
+    catalog_cache().set(snapshot_key(city_name, today), (snapshot.body, snapshot.etag), timeout=timeout)
+    return snapshot
+
+
+def get_snapshot(city_name):
+    """Stored snapshot of city_name, built on first use after a change or at a new day"""
+    today = timezone.localdate()
+    stored = catalog_cache().get(snapshot_key(city_name, today))
+    if stored is not None:
+        return HomepageSnapshot(*stored)
+    return build_snapshot(city_name, today)
@@ -0,0 +1,172 @@
+# core/instrumentation.py
+import contextvars
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('request_profile')
+
+# Profile of the request being handled, None outside sampled requests
+_current = contextvars.ContextVar('request_profile', default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)")
+
+
+def normalize_sql(sql):
+    """SQL with literals and IN lists folded, so one query repeated per row looks the same"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return ' '.join(sql.split())
+
+
+class RequestProfile:
+    """SQL statements and named timings collected while one request is handled"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []  # (sql, seconds)
+        self.sql_time = 0.0
+        self.timings = Counter()
+        self.active = set()
+
+    def record_query(self, sql, duration):
+        self.queries.append((sql, duration))
+        self.sql_time += duration
+
+    def slowest(self, count):
+        return sorted(self.queries, key=lambda query: query[1], reverse=True)[:count]
+
+    def duplicates(self, threshold):
+        """[(normalized sql, count)] run at least threshold times, the N+1 pattern"""
+        counts = Counter(normalize_sql(sql) for sql, _ in self.queries)
+        return [(sql, count) for sql, count in counts.most_common() if count >= threshold]
+
+
+def current_profile():
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block, minus its SQL time, to the current profile
+
+    Nested blocks of the same name are counted once, by the outermost block.
+    """
+    profile = _current.get()
+    if profile is None or name in profile.active:
+        yield
+        return
+
+    profile.active.add(name)
+    sql_before = profile.sql_time
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        profile.timings[name] += elapsed - (profile.sql_time - sql_before)
+        profile.active.discard(name)
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that times every statement into a RequestProfile"""
+
+    def __init__(self, profile):
+        self.profile = profile
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.profile.record_query(sql, time.perf_counter() - start)
+
+
+def instrument_serializers():
+    """Time the top-level .data of every DRF serializer as 'serialize'"""
+    from rest_framework import serializers
+
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        original = serializer_class.data.fget
+        if getattr(original, 'instrumented', False):
+            continue
+
+        def data(self, _original=original):
+            with timed('serialize'):
+                return _original(self)
+
+        data.instrumented = True
+        serializer_class.data = property(data)
+
+
+class RequestProfileMiddleware:
+    """Record SQL count and time, slowest statements, serializer time and size per request
+
+    A REQUEST_PROFILE_SAMPLE_RATE share of requests is profiled. Profiled
+    responses get a Server-Timing header and one JSON log line on the
+    request_profile logger, and repeated statements are logged as N+1
+    warnings. The body of streaming responses runs after the middleware
+    returns, so its queries are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_PROFILE_SAMPLE_RATE', 0)
+        self.slow_queries = getattr(settings, 'REQUEST_PROFILE_SLOW_QUERIES', 3)
+        self.duplicate_threshold = getattr(settings, 'REQUEST_PROFILE_DUPLICATE_THRESHOLD', 3)
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(QueryRecorder(profile)))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total = time.perf_counter() - profile.started
+        size = None if response.streaming else len(response.content)
+        duplicates = profile.duplicates(self.duplicate_threshold)
+
+        metrics = [
+            f'sql;dur={profile.sql_time * 1000:.2f};desc="{len(profile.queries)} queries"',
+            f"serialize;dur={profile.timings['serialize'] * 1000:.2f}",
+            f'total;dur={total * 1000:.2f}',
+        ]
+        if duplicates:
+            metrics.append(f'nplusone;desc="{len(duplicates)} repeated statements"')
+        response['Server-Timing'] = ', '.join(metrics)
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'sql_ms': round(profile.sql_time * 1000, 2),
+            'serialize_ms': round(profile.timings['serialize'] * 1000, 2),
+            'queries': len(profile.queries),
+            'bytes': size,
+            'slowest': [
+                {'sql': sql[:500], 'ms': round(duration * 1000, 2)} for sql, duration in profile.slowest(self.slow_queries)
+            ],
+            'duplicates': [{'sql': sql[:500], 'count': count} for sql, count in duplicates],
+        }
+        logger.info(json.dumps(record), extra={'profile': record})
+        for sql, count in duplicates:
+            logger.warning(f"Possible N+1 on {request.method} {request.path}: {count}x {sql[:200]}")
+
+        return response
@@ -0,0 +1,196 @@
+# core/loader.py
+import csv
+import json
+import sys
+from collections import defaultdict
+from core.models import (
+    City, Category, Attraction, Cuisine, Restaurant, EventType, Event,
+    PropertyType, Property, TransportType, TransportOption, Review
+)
+from core.ratings import RATED_MODELS, combined_rating, rebuild_aggregates
+from core.scraping.ingest import IngestSpec, bulk_ingest, resolve_lookups
+
+# Same natural keys as the scraper specs, so fixtures and scrapes upsert the same rows
+SLUG_FIELDS = {
+    Attraction: ('name',),
+    Restaurant: ('name',),
+    Event: ('name', 'date'),
+    Property: ('title',),
+    TransportOption: ('name',),
+}
+
+# Foreign keys given by name in fixtures
+LOOKUPS = {
+    Attraction: {'category': Category, 'city': City},
+    Restaurant: {'cuisine': Cuisine, 'city': City},
+    Event: {'event_type': EventType, 'city': City},
+    Property: {'property_type': PropertyType, 'city': City},
+    TransportOption: {'transport_type': TransportType, 'city': City},
+}
+
+# Columns maintained by the app rather than loaded
+DERIVED_FIELDS = {'id', 'slug', 'content_fingerprint', 'combined_rating', 'created_at', 'updated_at'}
+
+MODEL_NAMES = {
+    'attraction': Attraction, 'attractions': Attraction,
+    'restaurant': Restaurant, 'restaurants': Restaurant,
+    'event': Event, 'events': Event,
+    'property': Property, 'properties': Property,
+    'transportoption': TransportOption, 'transport': TransportOption, 'transportation': TransportOption,
+}
+
+
+def model_for(name):
+    model = MODEL_NAMES.get(str(name).lower().rsplit('.', 1)[-1])
+    if model is None:
+        raise ValueError(f"Unknown catalog model '{name}'")
+    return model
+
+
+def load_fields(model):
+    """Model fields a fixture row may set, file fields are left to the image pipeline"""
+    return [
+        field for field in model._meta.concrete_fields
+        if field.editable and field.name not in DERIVED_FIELDS and field.get_internal_type() not in ('FileField', 'ImageField')
+    ]
+
+
+def read_records(path, model=None):
+    """Yield fixture records from an NDJSON, JSON or CSV file ('-' reads NDJSON from stdin)
+
+    Every record carries a 'model' key, taken from the row or from model. JSON
+    files hold a list of records or {model name: [rows]}.
+    """
+    def tagged(record, default=model):
+        if default and not record.get('model'):
+            record['model'] = default
+        return record
+
+    if path == '-':
+        for line in sys.stdin:
+            if line.strip():
+                yield tagged(json.loads(line))
+        return
+
+    suffix = path.rsplit('.', 1)[-1].lower()
+    with open(path, encoding='utf-8', newline='') as handle:
+        if suffix in ('ndjson', 'jsonl'):
+            for line in handle:
+                if line.strip():
+                    yield tagged(json.loads(line))
+        elif suffix == 'csv':
+            for row in csv.DictReader(handle):
+                yield tagged(row)
+        elif suffix == 'json':
+            data = json.load(handle)
+            if isinstance(data, dict):
+                for name, rows in data.items():
+                    for row in rows:
+                        yield tagged(row, default=name)
+            else:
+                for row in data:
+                    yield tagged(row)
+        else:
+            raise ValueError(f"Unsupported fixture format '{suffix}', use ndjson, json or csv")
+
+
+class LookupCache:
+    """name -> instance maps for lookup models, read once and grown as new names appear"""
+
+    def __init__(self):
+        self.maps = {}
+
+    def resolve(self, model, names):
+        known = self.maps.get(model)
+        if known is None:
+            # Oldest row wins on duplicated names, like resolve_lookups
+            known = self.maps[model] = {obj.name: obj for obj in model.objects.order_by('-id')}
+        missing = {name for name in names if name and name not in known}
+        if missing:
+            known.update(resolve_lookups(model, missing))
+        return known
+
+
+class CatalogLoader:
+    """Batched upserts of fixture records through bulk_ingest
+
+    Records are buffered per model and written batch_size at a time, each batch
+    in its own transaction. Foreign keys are resolved from a LookupCache, so a
+    batch costs a fixed number of queries however many rows reference a city or
+    category.
+    """
+
+    def __init__(self, batch_size=5000, lookups=None):
+        self.batch_size = batch_size
+        self.lookups = lookups or LookupCache()
+        self.fields = {model: {field.name: field for field in load_fields(model)} for model in SLUG_FIELDS}
+        self.specs = {
+            model: IngestSpec(
+                model, slug_fields,
+                fields=list(self.fields[model]) + (['combined_rating'] if model in RATED_MODELS else [])
+            )
+            for model, slug_fields in SLUG_FIELDS.items()
+        }
+        self.buffers = defaultdict(list)
+        self.counts = defaultdict(lambda: {'created': 0, 'updated': 0, 'unchanged': 0})
+
+    def add(self, record):
+        record = dict(record)
+        model = model_for(record.pop('model', ''))
+        self.buffers[model].append(self.clean(model, record))
+        if len(self.buffers[model]) >= self.batch_size:
+            self.flush(model)
+
+    def load(self, records):
+        for record in records:
+            self.add(record)
+        return self.finish()
+
+    def clean(self, model, record):
+        """Typed values for every load field, missing columns take the model default"""
+        fields = self.fields[model]
+        unknown = set(record) - set(fields) - DERIVED_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown {model.__name__} fields: {', '.join(sorted(unknown))}")
+
+        row = {}
+        for name, field in fields.items():
+            value = record.get(name)
+            if name in LOOKUPS[model]:
+                if not value:
+                    raise ValueError(f"{model.__name__} row is missing {name}: {record}")
+                row[name] = str(value).strip()
+                continue
+            # CSV has no null, an empty cell means "not set" for non-text columns
+            if value is None or (value == '' and field.get_internal_type() not in ('CharField', 'TextField', 'URLField', 'SlugField')):
+                row[name] = field.get_default()
+            else:
+                row[name] = field.to_python(value)
+        if model in RATED_MODELS:
+            row['combined_rating'] = combined_rating(row['rating'], row['review_count'], 0, 0)
+        return row
+
+    def flush(self, model):
+        rows = self.buffers.pop(model, [])
+        if not rows:
+            return
+        for name, lookup_model in LOOKUPS[model].items():
+            known = self.lookups.resolve(lookup_model, {row[name] for row in rows})
+            for row in rows:
+                row[name] = known.get(row[name])
+
+        result = bulk_ingest(self.specs[model], rows, batch_size=min(self.batch_size, 1000))
+
+        counts = self.counts[model]
+        counts['created'] += result.created
+        counts['updated'] += result.updated
+        counts['unchanged'] += result.unchanged
+
+    def finish(self):
+        """Write the remaining buffers and return {model: counts}"""
+        for model in list(self.buffers):
+            self.flush(model)
+        # Loaded rows reset combined_rating to the fixture rating, fold user reviews back in
+        if any(model in RATED_MODELS for model in self.counts) and Review.objects.exists():
+            rebuild_aggregates()
+        return dict(self.counts)
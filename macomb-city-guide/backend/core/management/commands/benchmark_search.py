@@ -0,0 +1,80 @@
+# core/management/commands/benchmark_search.py
+import statistics
+import time
+from itertools import islice
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from core import search
+from core.loader import CatalogLoader
+from core.synthetic import CatalogGenerator
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the full-text search index against an icontains scan of the same query words'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[10000, 100000, 1000000],
+            help='Total catalog sizes (rows across all five models) to benchmark at'
+        )
+        parser.add_argument('--query', type=str, default='lakeside grill', help='Search query to run')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per path and size')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic catalog')
+
+    def handle(self, *args, **options):
+        generator = CatalogGenerator(seed=options['seed'])
+        loader = CatalogLoader()
+        query = options['query']
+
+        # Everything created here is rolled back once the benchmark finishes
+        with transaction.atomic():
+            loaded = 0
+
+            for size in sorted(options['sizes']):
+                # The generator is deterministic, so skipping what is loaded continues the
+                # same sequence; the loader's bulk ingest indexes the rows it writes
+                loader.load(islice(generator.records(size), loaded, None))
+                loaded = max(loaded, size)
+
+                icontains_ms = self.time_it(lambda: self.icontains_search(query), options['repeat'])
+                index_ms = self.time_it(lambda: search.search(query), options['repeat'])
+
+                self.stdout.write(
+                    f"{size:>9} rows  icontains: {icontains_ms:9.2f} ms  "
+                    f"index: {index_ms:9.2f} ms  speedup: {icontains_ms / max(index_ms, 0.001):6.1f}x"
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished, generated rows rolled back'))
+
+    def time_it(self, func, repeat):
+        """Return the median wall time of func in milliseconds"""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def icontains_search(self, query):
+        """The same tokenized predicate as the index, evaluated with icontains scans.
+
+        Every query word must appear in the title or one of the body fields,
+        mirroring search.search_ids, so both paths answer the same search.
+        """
+        tokens = search.tokenize(query)
+        results = []
+        for model, (title_field, body_fields) in search.SEARCH_FIELDS.items():
+            condition = Q()
+            for token in tokens:
+                token_condition = Q(**{f'{title_field}__icontains': token})
+                for field in body_fields:
+                    token_condition |= Q(**{f'{field}__icontains': token})
+                condition &= token_condition
+            results.append(list(model.objects.filter(condition)[:10]))
+        return results
@@ -0,0 +1,27 @@
+# core/management/commands/build_homepage.py
+import time
+from django.core.management.base import BaseCommand
+from core.homepage import build_snapshot
+from core.models import City
+
+
+class Command(BaseCommand):
+    help = 'Prebuild homepage snapshots, schedule shortly after midnight so the first visitor gets a warm copy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--city',
+            action='append',
+            help='City name to build, repeatable (default: every city)'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        names = options['city'] or list(City.objects.values_list('name', flat=True))
+
+        for name in names:
+            snapshot = build_snapshot(name)
+            self.stdout.write(f'{name}: {len(snapshot.body)} bytes, ETag {snapshot.etag}')
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Built {len(names)} homepage snapshots in {elapsed:.2f}s'))
@@ -0,0 +1,40 @@
+# core/management/commands/generate_catalog.py
+import json
+from django.core.management.base import BaseCommand
+from core.synthetic import CatalogGenerator
+
+
+class Command(BaseCommand):
+    help = 'Write synthetic Macomb County catalog rows as NDJSON for load_catalog and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=1000000,
+            help='Number of rows to generate'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed, the same seed always produces the same rows'
+        )
+        parser.add_argument(
+            '--output',
+            default='-',
+            help="Output file (default: stdout)"
+        )
+
+    def handle(self, *args, **options):
+        records = CatalogGenerator(seed=options['seed']).records(options['count'])
+
+        if options['output'] == '-':
+            for record in records:
+                self.stdout.write(json.dumps(record))
+            return
+
+        with open(options['output'], 'w', encoding='utf-8') as handle:
+            for record in records:
+                handle.write(json.dumps(record) + '\n')
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['count']} rows to {options['output']}"))
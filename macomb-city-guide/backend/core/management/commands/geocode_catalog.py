@@ -0,0 +1,66 @@
+# core/management/commands/geocode_catalog.py
+import os
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.geocoding import GEOCODED_MODELS, backfill_coordinates, export_gazetteer
+from core.loader import model_for
+
+
+class Command(BaseCommand):
+    help = 'Fill missing coordinates of catalog rows through the geocoding cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            help='Only geocode this model (attraction, restaurant, event, property), repeatable'
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Use the cache and the local gazetteer only, never the network geocoder'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows geocoded and updated per batch'
+        )
+        parser.add_argument(
+            '--export-gazetteer',
+            metavar='PATH',
+            help='Afterwards write every cached hit to PATH as a gazetteer CSV'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            models = [model_for(name) for name in options['model']] if options['model'] else GEOCODED_MODELS
+        except ValueError as e:
+            raise CommandError(str(e))
+        unsupported = [model.__name__ for model in models if model not in GEOCODED_MODELS]
+        if unsupported:
+            raise CommandError(f"{', '.join(unsupported)} rows have no coordinates")
+
+        offline = options['offline'] or getattr(settings, 'SCRAPER_OFFLINE', False)
+        gazetteer = getattr(settings, 'GEOCODER_GAZETTEER', None)
+        if not gazetteer:
+            self.stdout.write(self.style.WARNING(
+                'No gazetteer configured (GEOCODER_GAZETTEER), '
+                + ('only cached addresses can be placed offline' if offline else 'every cache miss goes to Nominatim')
+            ))
+        elif not os.path.exists(gazetteer):
+            self.stdout.write(self.style.WARNING(f'Gazetteer {gazetteer} does not exist, it is skipped'))
+
+        for model in models:
+            start = time.perf_counter()
+            checked, filled = backfill_coordinates(model, offline=offline, batch_size=options['batch_size'])
+            self.stdout.write(
+                f"{model.__name__}: {filled} of {checked} rows without coordinates geocoded "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+        if options['export_gazetteer']:
+            count = export_gazetteer(options['export_gazetteer'])
+            self.stdout.write(f"Wrote {count} addresses to {options['export_gazetteer']}")
+        self.stdout.write(self.style.SUCCESS('Geocoding finished'))
@@ -0,0 +1,25 @@
+# core/management/commands/rebuild_ratings.py
+import time
+from django.core.management.base import BaseCommand
+from core.ratings import rebuild_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Rebuild user rating aggregates from reviews and refresh combined ratings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows per bulk write'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        aggregates, refreshed = rebuild_aggregates(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {aggregates} rating aggregates and refreshed {refreshed} combined ratings in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,23 @@
+# core/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from core import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for all searchable catalog models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of objects indexed per insert batch'
+        )
+
+    def handle(self, *args, **options):
+        counts = search.rebuild_index(batch_size=options['batch_size'])
+
+        for model_name, count in counts.items():
+            self.stdout.write(f"Indexed {count} {model_name} objects")
+
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -1,55 +1,167 @@
 # core/management/commands/run_scrapers.py
+from concurrent.futures import ThreadPoolExecutor
 from django.core.management.base import BaseCommand
-from core.scraping import (
-    AttractionScraper, 
-    RestaurantScraper, 
-    EventScraper, 
-    PropertyScraper,
-    TransportScraper
-)
+from django.db import connection
+from core.scraping.attractions_scraper import AttractionScraper
+from core.scraping.restaurant_scraper import RestaurantScraper
+from core.scraping.event_scraper import EventScraper
+from core.scraping.property_scraper import PropertyScraper
+from core.scraping.transport_scraper import TransportScraper
+from core.scraping.browser import get_browser_pool
+from core.scraping.http_cache import get_http_cache
+from core.scraping.telemetry import REGRESSION_RATIO, record_run, write_prometheus
 
 class Command(BaseCommand):
     help = 'Run data scrapers'
-    
+
     def add_arguments(self, parser):
         parser.add_argument(
-            '--type', 
-            type=str, 
+            '--type',
+            type=str,
+            default='all',
             help='Type of scraper to run (attractions, restaurants, events, properties, transportation, all)'
         )
-        
+        parser.add_argument(
+            '--parallel',
+            action='store_true',
+            help='Run the selected scrapers concurrently; requests are still rate limited per host'
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Replay pages from the HTTP cache without touching the network'
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Bypass the HTTP cache and download every page again'
+        )
+        parser.add_argument(
+            '--metrics-file',
+            type=str,
+            help='Write the Prometheus text export here instead of SCRAPER_METRICS_FILE'
+        )
+
+    def make_scraper(self, scraper_class):
+        scraper = scraper_class()
+        scraper.offline = self.offline
+        scraper.use_cache = scraper.use_cache and not self.no_cache
+        return scraper
+
+    def scrape(self, scraper, name, **kwargs):
+        """scraper.run(**kwargs) recorded as a ScrapeRun, returns the saved count"""
+        with record_run(scraper, name) as run:
+            self.runs.append(run)
+            run.items_saved = scraper.run(**kwargs)
+        return run.items_saved
+
+    def run_attractions(self):
+        self.stdout.write('Running attraction scraper...')
+        attraction_scraper = self.make_scraper(AttractionScraper)
+        count = self.scrape(attraction_scraper, 'attractions')
+        self.stdout.write(self.style.SUCCESS(f'Successfully scraped {count} attractions'))
+
+    def run_restaurants(self):
+        self.stdout.write('Running restaurant scraper...')
+        restaurant_scraper = self.make_scraper(RestaurantScraper)
+        count = self.scrape(restaurant_scraper, 'restaurants')
+        self.stdout.write(self.style.SUCCESS(f'Successfully scraped {count} restaurants'))
+
+    def run_events(self):
+        self.stdout.write('Running event scraper...')
+        event_scraper = self.make_scraper(EventScraper)
+        count = self.scrape(event_scraper, 'events')
+        self.stdout.write(self.style.SUCCESS(f'Successfully scraped {count} events'))
+
+    def run_properties(self):
+        self.stdout.write('Running property scraper...')
+        property_scraper = self.make_scraper(PropertyScraper)
+        for_sale_count = self.scrape(property_scraper, 'properties_for_sale', for_sale=True)
+        for_rent_count = self.scrape(property_scraper, 'properties_for_rent', for_sale=False)
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully scraped {for_sale_count} properties for sale and {for_rent_count} for rent'
+        ))
+
+    def run_transportation(self):
+        self.stdout.write('Running transportation scraper...')
+        transport_scraper = self.make_scraper(TransportScraper)
+        count = self.scrape(transport_scraper, 'transportation')
+        self.stdout.write(self.style.SUCCESS(f'Successfully scraped {count} transportation options'))
+
+    def run_in_thread(self, runner):
+        try:
+            runner()
+        finally:
+            # Each worker thread opens its own database connection
+            connection.close()
+
     def handle(self, *args, **options):
-        scraper_type = options.get('type', 'all')
-        
-        if scraper_type in ['attractions', 'all']:
-            self.stdout.write('Running attraction scraper...')
-            attraction_scraper = AttractionScraper()
-            count = attraction_scraper.run()
-            self.stdout.write(self.style.SUCCESS(f'Successfully scraped {count} attractions'))
-        
-        if scraper_type in ['restaurants', 'all']:
-            self.stdout.write('Running restaurant scraper...')
-            restaurant_scraper = RestaurantScraper()
-            count = restaurant_scraper.run()
-            self.stdout.write(self.style.SUCCESS(f'Successfully scraped {count} restaurants'))
-        
-        if scraper_type in ['events', 'all']:
-            self.stdout.write('Running event scraper...')
-            event_scraper = EventScraper()
-            count = event_scraper.run()
-            self.stdout.write(self.style.SUCCESS(f'Successfully scraped {count} events'))
-        
-        if scraper_type in ['properties', 'all']:
-            self.stdout.write('Running property scraper...')
-            property_scraper = PropertyScraper()
-            for_sale_count = property_scraper.run(for_sale=True)
-            for_rent_count = property_scraper.run(for_sale=False)
-            self.stdout.write(self.style.SUCCESS(
-                f'Successfully scraped {for_sale_count} properties for sale and {for_rent_count} for rent'
-            ))
-        
-        if scraper_type in ['transportation', 'all']:
-            self.stdout.write('Running transportation scraper...')
-            transport_scraper = TransportScraper()
-            count = transport_scraper.run()
-            self.stdout.write(self.style.SUCCESS(f'Successfully scraped {count} transportation options'))
\ No newline at end of file
+        scraper_type = options.get('type') or 'all'
+        self.offline = options['offline']
+        self.no_cache = options['no_cache']
+        self.runs = []
+
+        runners = [
+            runner for name, runner in [
+                ('attractions', self.run_attractions),
+                ('restaurants', self.run_restaurants),
+                ('events', self.run_events),
+                ('properties', self.run_properties),
+                ('transportation', self.run_transportation),
+            ]
+            if scraper_type in [name, 'all']
+        ]
+
+        if not options['parallel']:
+            for runner in runners:
+                runner()
+        else:
+            # Different sources live on different hosts, so they can be fetched side by side
+            with ThreadPoolExecutor(max_workers=len(runners) or 1) as executor:
+                futures = [executor.submit(self.run_in_thread, runner) for runner in runners]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.stderr.write(f'Scraper failed: {str(e)}')
+
+        cache = get_http_cache()
+        stats = cache.stats()
+        self.stdout.write(
+            f"HTTP cache: {stats['hits']} fresh hits, {stats['revalidated']} revalidated, "
+            f"{stats['misses']} downloaded"
+        )
+        if not self.offline:
+            cache.evict()
+
+        browsers = get_browser_pool().snapshot()
+        if browsers.get('fetches'):
+            health = get_browser_pool().health()
+            self.stdout.write(
+                f"Browser pool: {browsers['fetches']} pages, {browsers['launched']} started, "
+                f"{browsers.get('recycled', 0)} recycled, {browsers.get('unhealthy', 0)} unhealthy, "
+                f"{browsers.get('not_ready', 0)} not ready; avg lease wait {browsers['avg_lease_wait']:.2f}s, "
+                f"load {browsers['avg_load']:.2f}s, ready wait {browsers['avg_ready_wait']:.2f}s; "
+                f"{health['live']} of {health['size']} browsers alive"
+            )
+
+        self.report_runs()
+        metrics_file = write_prometheus(options['metrics_file'])
+        if metrics_file:
+            self.stdout.write(f'Scraper metrics written to {metrics_file}')
+
+    def report_runs(self):
+        """One line per run, compared with the previous run of the same scraper"""
+        for run in self.runs:
+            line = (
+                f'{run.scraper}: {run.duration:.1f}s, {run.pages_fetched} requests, '
+                f'{run.bytes_downloaded / 1024:.0f} KB, {run.retries} retries, {run.errors} errors, '
+                f'{run.items_parsed} parsed, {run.items_saved} saved'
+            )
+            previous = run.previous()
+            if previous is None or not previous.duration:
+                self.stdout.write(line)
+                continue
+            change = run.duration / previous.duration
+            line += f' ({(change - 1) * 100:+.0f}% vs previous run)'
+            self.stdout.write(self.style.WARNING(line) if change >= REGRESSION_RATIO else line)
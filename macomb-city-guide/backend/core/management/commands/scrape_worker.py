@@ -0,0 +1,50 @@
+# core/management/commands/scrape_worker.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Start a Celery worker for one scrape queue with its concurrency from CELERY_SCRAPER_QUEUES'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queue',
+            help='Queue to consume (scrape_tripadvisor, scrape_yelp, scrape_events, scrape_zillow, '
+                 'scrape_transit, scrape_finish, scrape_jobs)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Override the configured number of worker processes'
+        )
+        parser.add_argument(
+            '--loglevel',
+            default='INFO',
+            help='Celery worker log level'
+        )
+
+    def handle(self, *args, **options):
+        from backend import celery_app
+        from core.scraping.targets import SCRAPE_TARGETS
+
+        queues = getattr(settings, 'CELERY_SCRAPER_QUEUES', {})
+        queue = options['queue']
+        if queue not in queues:
+            raise CommandError(f"Unknown queue {queue}, expected one of {', '.join(queues)}")
+
+        concurrency = options['concurrency'] or queues[queue]
+        # Requests are spaced per host inside one process only, a second process
+        # on a host queue would double the request rate to that host
+        host_queues = {target.queue for target in SCRAPE_TARGETS.values()}
+        if queue in host_queues and concurrency > 1:
+            raise CommandError(
+                f"{queue} sends requests to one host and its rate limit is per process, run it with concurrency 1"
+            )
+        if celery_app is None:
+            raise CommandError('Celery is not installed')
+
+        self.stdout.write(f'Starting worker for {queue} with concurrency {concurrency}')
+        celery_app.worker_main([
+            'worker', '--queues', queue, '--concurrency', str(concurrency),
+            '--hostname', f'{queue}@%h', '--loglevel', options['loglevel'],
+        ])
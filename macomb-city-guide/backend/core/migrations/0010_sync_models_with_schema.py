@@ -0,0 +1,328 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:21
+#
+# Brings the migration state in line with core/models.py. Several fields and
+# models (Property.slug, Favorite, Contact, MenuItem, PropertyImage) were
+# added to the models without a migration, so fresh databases were missing them.
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def populate_property_slugs(apps, schema_editor):
+    """Give existing properties a unique slug before the unique constraint is added"""
+    Property = apps.get_model('core', 'Property')
+    taken = set()
+    for prop in Property.objects.order_by('id'):
+        # Same slug as Property.save(), with the id appended when it is empty or already taken
+        slug = slugify(prop.title)[:255]
+        if not slug or slug in taken:
+            slug = f"{slug[:240]}-{prop.pk}" if slug else f"property-{prop.pk}"
+        taken.add(slug)
+        Property.objects.filter(pk=prop.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0009_fix_transport_option_schema'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='city',
+            options={'verbose_name_plural': 'Cities'},
+        ),
+        migrations.AlterModelOptions(
+            name='propertytype',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='review',
+            options={'ordering': ['-created_at']},
+        ),
+        migrations.RenameField(
+            model_name='review',
+            old_name='content',
+            new_name='comment',
+        ),
+        migrations.RemoveField(
+            model_name='review',
+            name='updated_at',
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='detail_url',
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='featured',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='features',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='for_rent',
+            field=models.BooleanField(default=False),
+        ),
+        # Added without the unique constraint, backfilled, then made unique so
+        # databases that already hold several properties can migrate
+        migrations.AddField(
+            model_name='property',
+            name='slug',
+            field=models.SlugField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_property_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='property',
+            name='slug',
+            field=models.SlugField(max_length=255, unique=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='year_built',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='attraction',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='attractions/'),
+        ),
+        migrations.AlterField(
+            model_name='attraction',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='attraction',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='attraction',
+            name='opening_hours',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='attraction',
+            name='slug',
+            field=models.SlugField(blank=True, default='', max_length=255, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='attraction',
+            name='website',
+            field=models.URLField(blank=True, default=''),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='city',
+            name='climate',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='city',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='city',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='cities/'),
+        ),
+        migrations.AlterField(
+            model_name='city',
+            name='population',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='events/'),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='slug',
+            field=models.SlugField(blank=True, default='', max_length=250, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='venue',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='website',
+            field=models.URLField(blank=True, default=''),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='bathrooms',
+            field=models.DecimalField(blank=True, decimal_places=1, max_digits=3, null=True),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='bedrooms',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='city',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.city'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='properties/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='price',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='property_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.propertytype'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='size',
+            field=models.PositiveIntegerField(blank=True, help_text='Size in square feet', null=True),
+        ),
+        migrations.AlterField(
+            model_name='restaurant',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='restaurants/'),
+        ),
+        migrations.AlterField(
+            model_name='restaurant',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='restaurant',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='restaurant',
+            name='opening_hours',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='restaurant',
+            name='price_level',
+            field=models.IntegerField(default=2),
+        ),
+        migrations.AlterField(
+            model_name='restaurant',
+            name='slug',
+            field=models.SlugField(blank=True, default='', max_length=250, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='restaurant',
+            name='website',
+            field=models.URLField(blank=True, default=''),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='rating',
+            field=models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AlterField(
+            model_name='transportoption',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='transport/'),
+        ),
+        migrations.AlterField(
+            model_name='transportoption',
+            name='routes',
+            field=models.CharField(blank=True, default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='transportoption',
+            name='schedule',
+            field=models.TextField(blank=True, default=''),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='transportoption',
+            name='transport_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='options', to='core.transporttype'),
+        ),
+        migrations.AlterField(
+            model_name='transportoption',
+            name='website',
+            field=models.URLField(blank=True, default=''),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='Contact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MenuItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='menu_items', to='core.restaurant')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PropertyImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('image', models.ImageField(upload_to='properties/additional/')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='additional_images', to='core.property')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Favorite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='favorites', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'unique_together': {('user', 'content_type', 'object_id')},
+            },
+        ),
+    ]
+
@@ -0,0 +1,111 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Same fields as core.search.SEARCH_FIELDS: model name -> (title field, body fields)
+SEARCH_FIELDS = {
+    'Attraction': ('name', ['description', 'address']),
+    'Restaurant': ('name', ['description', 'address']),
+    'Event': ('name', ['description', 'venue', 'address']),
+    'Property': ('title', ['description', 'address']),
+    'TransportOption': ('name', ['description', 'routes', 'address']),
+}
+
+
+def create_fulltext_index(apps, schema_editor):
+    """Create the backend specific full-text index over core_searchdocument"""
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        # External-content FTS5 table kept in sync with triggers
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5("
+            "title, body, content='core_searchdocument', content_rowid='id', "
+            "tokenize='porter unicode61', prefix='2 3 4')"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER core_searchdocument_ai AFTER INSERT ON core_searchdocument BEGIN "
+            "INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); "
+            "END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER core_searchdocument_ad AFTER DELETE ON core_searchdocument BEGIN "
+            "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); "
+            "END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER core_searchdocument_au AFTER UPDATE ON core_searchdocument BEGIN "
+            "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); "
+            "INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); "
+            "END"
+        )
+    elif vendor == 'postgresql':
+        # Expression GIN index, must match the expression used in core.search
+        schema_editor.execute(
+            "CREATE INDEX core_searchdocument_tsv ON core_searchdocument "
+            "USING GIN (to_tsvector('english', title || ' ' || body))"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        for trigger in ('core_searchdocument_ai', 'core_searchdocument_ad', 'core_searchdocument_au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS core_searchdocument_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS core_searchdocument_tsv")
+
+
+def populate_search_index(apps, schema_editor):
+    """Index the rows that exist already, the triggers fill the full-text table from the inserts"""
+    alias = schema_editor.connection.alias
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+
+    for model_name, (title_field, body_fields) in SEARCH_FIELDS.items():
+        model = apps.get_model('core', model_name)
+        content_type, _ = ContentType.objects.using(alias).get_or_create(
+            app_label='core', model=model_name.lower()
+        )
+        documents = [
+            SearchDocument(
+                content_type=content_type,
+                object_id=obj.pk,
+                title=(getattr(obj, title_field) or '')[:255],
+                body=' '.join(str(getattr(obj, field) or '') for field in body_fields),
+            )
+            for obj in model.objects.using(alias).iterator(chunk_size=1000)
+        ]
+        SearchDocument.objects.using(alias).bulk_create(documents, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0010_sync_models_with_schema'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(populate_search_index, migrations.RunPython.noop),
+    ]
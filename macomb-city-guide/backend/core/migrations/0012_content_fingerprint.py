@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_searchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attraction',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='transportoption',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
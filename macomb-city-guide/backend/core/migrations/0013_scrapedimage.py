@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_content_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapedImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=64, unique=True)),
+                ('url', models.TextField()),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('file', models.CharField(max_length=255)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_combined_rating(apps, schema_editor):
+    """Start from the scraped rating, run rebuild_ratings to fold in existing reviews"""
+    for model_name in ('Attraction', 'Restaurant'):
+        apps.get_model('core', model_name).objects.update(combined_rating=models.F('rating'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0013_scrapedimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attraction',
+            name='combined_rating',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='combined_rating',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.CreateModel(
+            name='RatingAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('count_1', models.IntegerField(default=0)),
+                ('count_2', models.IntegerField(default=0)),
+                ('count_3', models.IntegerField(default=0)),
+                ('count_4', models.IntegerField(default=0)),
+                ('count_5', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(seed_combined_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0014_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(fields=['city', 'featured'], name='attraction_city_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(condition=models.Q(('featured', True)), fields=['id'], name='attraction_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(fields=['-rating'], name='attraction_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['city', 'date', 'time'], name='event_city_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'time'], name='event_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('featured', True)), fields=['date', 'time'], name='event_featured_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['content_type', 'object_id'], name='favorite_target_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price', 'for_sale'], name='property_price_sale_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['bedrooms', 'for_sale'], name='property_beds_sale_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['city', 'featured'], name='property_city_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['city', 'featured'], name='restaurant_city_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(condition=models.Q(('featured', True)), fields=['id'], name='restaurant_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['price_level', 'id'], name='restaurant_price_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['-rating'], name='restaurant_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['content_type', 'object_id', '-created_at'], name='review_target_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='saveditem',
+            index=models.Index(fields=['content_type', 'object_id'], name='saveditem_target_idx'),
+        ),
+    ]
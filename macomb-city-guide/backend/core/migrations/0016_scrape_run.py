@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scraper', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.FloatField(blank=True, null=True)),
+                ('pages_fetched', models.PositiveIntegerField(default=0)),
+                ('bytes_downloaded', models.BigIntegerField(default=0)),
+                ('retries', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('items_parsed', models.PositiveIntegerField(default=0)),
+                ('items_saved', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('metrics', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['scraper', '-started_at'], name='scraperun_scraper_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:10
+
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def event_slug(name, date):
+    # Same key as EVENT_SPEC.slug_for and Event.save
+    return slugify(f'{name} {date}')[:250]
+
+
+def rewrite_event_slugs(apps, schema_editor):
+    """Move events stored with a name-only slug onto the name and date slug scrapes match on"""
+    Event = apps.get_model('core', 'Event')
+    events = Event.objects.using(schema_editor.connection.alias)
+    taken = set(events.values_list('slug', flat=True))
+
+    changed = []
+    for event in events.only('pk', 'name', 'date', 'slug').iterator(chunk_size=1000):
+        slug = event_slug(event.name, event.date)
+        # Hand-edited slugs are kept, and so is a row whose new slug belongs to another event
+        if event.slug != slugify(event.name) or slug in taken:
+            continue
+        taken.discard(event.slug)
+        taken.add(slug)
+        event.slug = slug
+        changed.append(event)
+    events.bulk_update(changed, ['slug'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_scrape_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(rewrite_event_slugs, migrations.RunPython.noop),
+    ]
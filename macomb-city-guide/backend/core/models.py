@@ -56,6 +56,18 @@ class Attraction(BaseModel):
     longitude = models.FloatField(null=True, blank=True)
     rating = models.FloatField(default=0.0)
     review_count = models.IntegerField(default=0)
+    combined_rating = models.FloatField(default=0.0, db_index=True)  # Scraped rating blended with user reviews
+    content_fingerprint = models.CharField(max_length=64, blank=True, editable=False)  # Hash of the last scraped payload
+
+    class Meta:
+        indexes = [
+            # Homepage featured block and same-city fallbacks
+            models.Index(fields=['city', 'featured'], name='attraction_city_featured_idx'),
+            # List filtered by featured, ordered by id. Partial, because Django
+            # filters booleans as a bare column that a leading boolean key can't seek
+            models.Index(fields=['id'], condition=models.Q(featured=True), name='attraction_featured_idx'),
+            models.Index(fields=['-rating'], name='attraction_rating_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -92,6 +104,16 @@ class Restaurant(BaseModel):
     longitude = models.FloatField(null=True, blank=True)
     rating = models.FloatField(default=0.0)
     review_count = models.IntegerField(default=0)
+    combined_rating = models.FloatField(default=0.0, db_index=True)  # Scraped rating blended with user reviews
+    content_fingerprint = models.CharField(max_length=64, blank=True, editable=False)  # Hash of the last scraped payload
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['city', 'featured'], name='restaurant_city_featured_idx'),
+            models.Index(fields=['id'], condition=models.Q(featured=True), name='restaurant_featured_idx'),
+            models.Index(fields=['price_level', 'id'], name='restaurant_price_level_idx'),
+            models.Index(fields=['-rating'], name='restaurant_rating_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -136,10 +158,23 @@ class Event(BaseModel):
     featured = models.BooleanField(default=False)
     image = models.ImageField(upload_to='events/', blank=True, null=True)
     city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="events")
+    latitude = models.FloatField(null=True, blank=True)  # Venue location, see core/geocoding.py
+    longitude = models.FloatField(null=True, blank=True)
+    content_fingerprint = models.CharField(max_length=64, blank=True, editable=False)  # Hash of the last scraped payload
+    
+    class Meta:
+        indexes = [
+            # Upcoming events per city, already in date/time order
+            models.Index(fields=['city', 'date', 'time'], name='event_city_date_time_idx'),
+            # Default list ordering and date filters
+            models.Index(fields=['date', 'time'], name='event_date_time_idx'),
+            models.Index(fields=['date', 'time'], condition=models.Q(featured=True), name='event_featured_date_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            # Name and date, the key scraped events are matched on
+            self.slug = slugify(f"{self.name} {self.date}")[:250]
         super().save(*args, **kwargs)
         
     def __str__(self):
@@ -173,6 +208,7 @@ class Property(models.Model):
     featured = models.BooleanField(default=False)  # Add this field
     image = models.ImageField(upload_to='properties/', null=True, blank=True)
     detail_url = models.URLField(max_length=500, null=True, blank=True)
+    content_fingerprint = models.CharField(max_length=64, blank=True, editable=False)  # Hash of the last scraped payload
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -186,6 +222,12 @@ class Property(models.Model):
     
     class Meta:
         verbose_name_plural = "Properties"
+        indexes = [
+            # Price range and bedroom filters, for_sale is checked from the index
+            models.Index(fields=['price', 'for_sale'], name='property_price_sale_idx'),
+            models.Index(fields=['bedrooms', 'for_sale'], name='property_beds_sale_idx'),
+            models.Index(fields=['city', 'featured'], name='property_city_featured_idx'),
+        ]
 
 # Property additional images
 class PropertyImage(BaseModel):
@@ -215,6 +257,7 @@ class TransportOption(BaseModel):
     image = models.ImageField(upload_to='transport/', blank=True, null=True)
     city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="transport_options")
     featured = models.BooleanField(default=False)
+    content_fingerprint = models.CharField(max_length=64, blank=True, editable=False)  # Hash of the last scraped payload
     
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -236,6 +279,10 @@ class Review(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Reviews of one object, newest first, and rating aggregation
+            models.Index(fields=['content_type', 'object_id', '-created_at'], name='review_target_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s review for {self.content_type} #{self.object_id}"
@@ -263,6 +310,9 @@ class SavedItem(models.Model):
     
     class Meta:
         unique_together = ('user', 'content_type', 'object_id')
+        indexes = [
+            models.Index(fields=['content_type', 'object_id'], name='saveditem_target_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username}'s saved item"
@@ -277,6 +327,9 @@ class Favorite(models.Model):
     class Meta:
         unique_together = ('user', 'content_type', 'object_id')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['content_type', 'object_id'], name='favorite_target_idx'),
+        ]
 
 class Contact(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
@@ -288,3 +341,151 @@ class Contact(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+
+# Full-text search index entry, one row per searchable catalog object
+class SearchDocument(models.Model):
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('content_type', 'object_id')
+    
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id}: {self.title}"
+
+# Downloaded scraper image, maps a source URL to the stored file by content hash
+class ScrapedImage(models.Model):
+    url_hash = models.CharField(max_length=64, unique=True)  # sha256 of url, urls can exceed index limits
+    url = models.TextField()
+    content_hash = models.CharField(max_length=64, db_index=True)
+    file = models.CharField(max_length=255)  # Storage name of the saved image
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.url
+
+# Geocoder answer for a normalized address, a row without coordinates caches a miss
+class GeocodedAddress(models.Model):
+    address_hash = models.CharField(max_length=64, unique=True)  # sha256 of address
+    address = models.TextField()  # Normalized, see core.geocoding.normalize_address
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    source = models.CharField(max_length=20, blank=True)  # Resolver that answered
+    checked_at = models.DateTimeField()
+    
+    @property
+    def found(self):
+        return self.latitude is not None and self.longitude is not None
+    
+    def __str__(self):
+        return self.address
+
+# Running totals of user reviews per reviewed object, maintained by core/ratings.py
+class RatingAggregate(models.Model):
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    count_1 = models.IntegerField(default=0)
+    count_2 = models.IntegerField(default=0)
+    count_3 = models.IntegerField(default=0)
+    count_4 = models.IntegerField(default=0)
+    count_5 = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('content_type', 'object_id')
+    
+    @property
+    def average(self):
+        return self.rating_sum / self.rating_count if self.rating_count else None
+    
+    @property
+    def histogram(self):
+        return {star: getattr(self, f'count_{star}') for star in range(1, 6)}
+    
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id}: {self.rating_count} reviews"
+
+# A scrape requested through the API, run by a background worker (core/scraping/jobs.py)
+class ScrapeJob(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'), (RUNNING, 'Running'), (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'), (CANCELLED, 'Cancelled'),
+    ]
+    FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+    # Targets of each type are listed in core/scraping/targets.py
+    TYPE_CHOICES = [
+        ('attractions', 'Attractions'), ('restaurants', 'Restaurants'), ('events', 'Events'),
+        ('properties', 'Properties'), ('transportation', 'Transportation'), ('all', 'All'),
+    ]
+    
+    scraper_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='all')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='scrape_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # Last progress update of the worker
+    current_scraper = models.CharField(max_length=50, blank=True)
+    pages_fetched = models.PositiveIntegerField(default=0)
+    records_saved = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    cancel_requested = models.BooleanField(default=False)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    @property
+    def finished(self):
+        return self.status in self.FINISHED
+    
+    def __str__(self):
+        return f"{self.scraper_type} scrape {self.pk} ({self.status})"
+
+# One scraper run with its per-host telemetry, written by core/scraping/telemetry.py
+class ScrapeRun(models.Model):
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(RUNNING, 'Running'), (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed')]
+    
+    scraper = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=RUNNING)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.FloatField(null=True, blank=True)  # Seconds
+    pages_fetched = models.PositiveIntegerField(default=0)
+    bytes_downloaded = models.BigIntegerField(default=0)
+    retries = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    items_parsed = models.PositiveIntegerField(default=0)
+    items_saved = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    metrics = models.JSONField(default=dict)  # ScrapeMetrics.snapshot()
+    job = models.ForeignKey(ScrapeJob, on_delete=models.SET_NULL, null=True, blank=True, related_name='runs')
+    
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['scraper', '-started_at'], name='scraperun_scraper_idx'),
+        ]
+    
+    def previous(self):
+        """The finished run of the same scraper before this one"""
+        return ScrapeRun.objects.filter(
+            scraper=self.scraper, started_at__lt=self.started_at, finished_at__isnull=False
+        ).exclude(pk=self.pk).first()
+    
+    def __str__(self):
+        return f"{self.scraper} {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
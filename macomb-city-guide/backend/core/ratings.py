@@ -0,0 +1,130 @@
+# core/ratings.py
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from core.cache import bump_model_version
+from core.models import Attraction, Restaurant, RatingAggregate, Review
+
+# Models with scraped rating/review_count columns and a materialized combined_rating
+RATED_MODELS = [Attraction, Restaurant]
+
+STARS = range(1, 6)
+
+
+def combined_rating(rating, review_count, user_sum, user_count):
+    """Weighted mean of the scraped rating and user reviews
+
+    A scraped rating without a review count still counts as one vote.
+    """
+    scraped_weight = review_count or (1 if rating else 0)
+    total = scraped_weight + user_count
+    if not total:
+        return 0.0
+    return round((rating * scraped_weight + user_sum) / total, 3)
+
+
+def apply_review(content_type_id, object_id, rating, sign=1):
+    """Add (sign=1) or remove (sign=-1) one review from the aggregate in O(1)"""
+    changes = {
+        'rating_sum': F('rating_sum') + sign * rating,
+        'rating_count': F('rating_count') + sign,
+    }
+    if rating in STARS:
+        changes[f'count_{rating}'] = F(f'count_{rating}') + sign
+
+    with transaction.atomic():
+        lookup = RatingAggregate.objects.filter(content_type_id=content_type_id, object_id=object_id)
+        if not lookup.update(**changes) and sign > 0:
+            try:
+                with transaction.atomic():
+                    RatingAggregate.objects.create(
+                        content_type_id=content_type_id,
+                        object_id=object_id,
+                        rating_sum=rating,
+                        rating_count=1,
+                        **({f'count_{rating}': 1} if rating in STARS else {})
+                    )
+            except IntegrityError:
+                # Another request created the row first
+                lookup.update(**changes)
+
+    bump_model_version(RatingAggregate)
+    refresh_combined_rating(content_type_id, object_id)
+
+
+def refresh_combined_rating(content_type_id, object_id):
+    """Recompute combined_rating for one rated object from its columns and aggregate"""
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model not in RATED_MODELS:
+        return
+
+    aggregate = RatingAggregate.objects.filter(
+        content_type_id=content_type_id, object_id=object_id
+    ).values('rating_sum', 'rating_count').first() or {'rating_sum': 0, 'rating_count': 0}
+
+    row = model.objects.filter(pk=object_id).values('rating', 'review_count').first()
+    if row is None:
+        return
+
+    model.objects.filter(pk=object_id).update(combined_rating=combined_rating(
+        row['rating'], row['review_count'], aggregate['rating_sum'], aggregate['rating_count']
+    ))
+    # The aggregate is unchanged here, so only this model's responses expire
+    bump_model_version(model)
+
+
+def rating_summary(obj):
+    """User review summary for obj: count, average and star histogram"""
+    aggregate = RatingAggregate.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+    ).first()
+    if aggregate is None:
+        return {'count': 0, 'average': None, 'histogram': {star: 0 for star in STARS}}
+    return {
+        'count': aggregate.rating_count,
+        'average': round(aggregate.average, 2) if aggregate.average is not None else None,
+        'histogram': aggregate.histogram,
+    }
+
+
+def rebuild_aggregates(batch_size=1000):
+    """Recompute every aggregate from the review table and refresh combined ratings
+
+    One GROUP BY over reviews replaces the whole aggregate table, then each rated
+    model is updated in batches. Returns (aggregates written, objects refreshed).
+    """
+    rows = Review.objects.values('content_type_id', 'object_id').annotate(
+        rating_sum=Sum('rating'),
+        rating_count=Count('id'),
+        **{f'count_{star}': Count('id', filter=Q(rating=star)) for star in STARS}
+    ).order_by()
+
+    aggregates = [RatingAggregate(**row) for row in rows]
+
+    refreshed = 0
+    with transaction.atomic():
+        RatingAggregate.objects.all().delete()
+        RatingAggregate.objects.bulk_create(aggregates, batch_size=batch_size)
+
+        by_object = {
+            (aggregate.content_type_id, aggregate.object_id): aggregate for aggregate in aggregates
+        }
+        for model in RATED_MODELS:
+            content_type_id = ContentType.objects.get_for_model(model).id
+            objects = list(model.objects.only('id', 'rating', 'review_count', 'combined_rating'))
+            changed = []
+            for obj in objects:
+                aggregate = by_object.get((content_type_id, obj.id))
+                value = combined_rating(
+                    obj.rating, obj.review_count,
+                    aggregate.rating_sum if aggregate else 0,
+                    aggregate.rating_count if aggregate else 0,
+                )
+                if value != obj.combined_rating:
+                    obj.combined_rating = value
+                    changed.append(obj)
+            model.objects.bulk_update(changed, ['combined_rating'], batch_size=batch_size)
+            refreshed += len(changed)
+
+    bump_model_version(RatingAggregate, *RATED_MODELS)
+    return len(aggregates), refreshed
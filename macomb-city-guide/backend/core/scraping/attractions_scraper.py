@@ -1,14 +1,26 @@
 # core/scraping/attractions_scraper.py
-from django.core.files.base import ContentFile
 from .base import BaseScraper
-import requests
 from core.models import Attraction, Category, City
+from .ingest import IngestSpec, bulk_ingest
+from .images import ImagePipeline
+from .pipeline import PAGE_BATCH_SIZE, batched
+from functools import partial
 from urllib.parse import urlparse
 import re
-from geopy.geocoders import Nominatim
+import time
+
+ATTRACTION_SPEC = IngestSpec(
+    Attraction,
+    slug_fields=('name',),
+    fields=['name', 'address', 'description', 'category', 'opening_hours', 'website', 'city'],
+    lookups={'category': Category},
+    # Coordinates are geocoded once when the attraction is first stored
+    create_only={'latitude': None, 'longitude': None},
+)
 
 class AttractionScraper(BaseScraper):
     """Scraper for attractions data"""
+    ingest_spec = ATTRACTION_SPEC
     
     def __init__(self, city_name="Macomb"):
         super().__init__(city_name)
@@ -17,22 +29,22 @@ class AttractionScraper(BaseScraper):
             "https://www.michigan.org/city/macomb",
             # Add more sources
         ]
-        self.geolocator = Nominatim(user_agent="macomb_city_guide")
         
-    def scrape_tripadvisor(self, url, max_pages=3):
-        """Scrape attraction data from TripAdvisor"""
-        attractions = []
+    def tripadvisor_page_urls(self, url, max_pages=3):
+        """URLs of the first max_pages TripAdvisor listing pages"""
+        return [url] + [url.replace(".html", f"-oa{page * 30}.html") for page in range(1, max_pages)]
+    
+    def scrape_tripadvisor(self, page_urls):
+        """Yield attractions from TripAdvisor listing pages, a page's details at a time"""
+        seen = set()
         
-        for page in range(0, max_pages):
-            if page > 0:
-                page_url = url.replace(".html", f"-oa{page * 30}.html")
-            else:
-                page_url = url
-                
-            soup = self.fetch_page(page_url)
+        # Listing pages are fetched as one concurrent batch
+        for page_url, soup in self.fetch_pages(page_urls):
             if not soup:
                 continue
                 
+            parse_start = time.perf_counter()
+            detail_names = {}
             attraction_elements = soup.select("div._T.Ci._S")
             
             for element in attraction_elements:
@@ -48,23 +60,31 @@ class AttractionScraper(BaseScraper):
                         continue
                         
                     detail_url = "https://www.tripadvisor.com" + link_elem['href']
-                    
-                    # Get detailed info from attraction page
-                    attraction_data = self.scrape_attraction_detail(detail_url)
-                    if attraction_data:
-                        attraction_data.update({
-                            'name': name,
-                        })
-                        attractions.append(attraction_data)
-                        self.log_progress(f"Scraped attraction", name)
+                    # Listing pages overlap, each attraction is fetched once
+                    if detail_url not in seen:
+                        seen.add(detail_url)
+                        detail_names[detail_url] = name
                 except Exception as e:
                     self.log_progress(f"Error scraping attraction: {str(e)}")
-        
-        return attractions
+            self.metrics.record_parse(page_url, time.perf_counter() - parse_start, len(detail_names))
+            
+            # Get detailed info from the page's attractions, yielded as they complete
+            for detail_url, detail_soup in self.fetch_pages(detail_names):
+                name = detail_names[detail_url]
+                attraction_data = self.parse_page(detail_url, self.parse_attraction_detail, detail_soup)
+                if attraction_data:
+                    attraction_data.update({
+                        'name': name,
+                    })
+                    self.log_progress(f"Scraped attraction", name)
+                    yield attraction_data
         
     def scrape_attraction_detail(self, url):
         """Scrape detailed attraction info from its page"""
-        soup = self.fetch_page(url)
+        return self.parse_attraction_detail(self.fetch_page(url))
+    
+    def parse_attraction_detail(self, soup):
+        """Parse detailed attraction info from a fetched detail page"""
         if not soup:
             return None
             
@@ -116,88 +136,61 @@ class AttractionScraper(BaseScraper):
             self.log_progress(f"Error scraping attraction detail: {str(e)}")
             return None
     
-    def get_coordinates(self, address):
-        """Get latitude and longitude from address"""
-        if not address:
-            return None, None
-            
-        try:
-            location = self.geolocator.geocode(address)
-            if location:
-                return location.latitude, location.longitude
-        except Exception as e:
-            self.log_progress(f"Error getting coordinates for {address}: {str(e)}")
-        
-        return None, None
-    
     def save_to_database(self, attraction_data):
         """Save scraped attraction data to database"""
         # Use the base class method instead of direct get_or_create
         city = self.get_city(self.city_name)
         
-        # Rest remains the same
+        # Geocoding is slow and rate limited, so only look up attractions not stored yet
+        coordinates = self.geocode_new(ATTRACTION_SPEC, attraction_data)
+        
+        rows = []
         for data in attraction_data:
-            try:
-                # Get or create category
-                category, _ = Category.objects.get_or_create(name=data['category'])
-                
-                # Get coordinates
-                latitude, longitude = self.get_coordinates(f"{data['address']}, {self.city_name}, MI")
-                
-                # Check if attraction already exists
-                attraction, created = Attraction.objects.get_or_create(
-                    name=data['name'], 
-                    address=data['address'],
-                    defaults={
-                        'description': data['description'],
-                        'category': category,
-                        'opening_hours': data['opening_hours'],
-                        'website': data['website'],
-                        'latitude': latitude,
-                        'longitude': longitude,
-                        'city': city
-                    }
-                )
-                
-                # Update image if it's a new attraction or doesn't have an image
-                if created or not attraction.image:
-                    self.download_and_save_image(attraction, data['image_url'])
-                    
-                self.log_progress(f"{'Created' if created else 'Updated'} attraction", attraction.name)
-            except Exception as e:
-                self.log_progress(f"Error saving attraction {data['name']}: {str(e)}")
-    
-    def download_and_save_image(self, attraction, image_url):
-        """Download and save attraction image"""
-        if not image_url:
-            return
-            
+            row = {
+                'name': data['name'],
+                'address': data['address'],
+                'description': data['description'],
+                'category': data['category'],
+                'opening_hours': data['opening_hours'],
+                'website': data['website'],
+            }
+            row['latitude'], row['longitude'] = coordinates.get(ATTRACTION_SPEC.slug_for(data), (None, None))
+            rows.append(row)
+        
         try:
-            response = requests.get(image_url, stream=True, timeout=30)
-            if response.status_code == 200:
-                # Generate filename from URL
-                filename = urlparse(image_url).path.split('/')[-1]
-                if not filename or '.' not in filename:
-                    filename = f"attraction_{attraction.id}.jpg"
-                    
-                attraction.image.save(filename, ContentFile(response.content), save=True)
-                self.log_progress(f"Saved image for attraction", attraction.name)
+            with self.metrics.db_write(len(rows)):
+                result = bulk_ingest(ATTRACTION_SPEC, rows, extra={'city': city})
         except Exception as e:
-            self.log_progress(f"Error downloading image: {str(e)}")
+            self.log_progress(f"Error saving attractions: {str(e)}")
+            return 0
+        
+        # Queue images for new attractions or ones still missing an image
+        images = ImagePipeline(self)
+        for data in attraction_data:
+            attraction = result.objects.get(ATTRACTION_SPEC.slug_for(data))
+            if attraction and (result.was_created(attraction) or not attraction.image):
+                images.add(attraction, data.get('image_url'))
+        images.run()
+        
+        self.log_progress(f"Saved attractions: {result}")
+        return result.total
+    
+    def record_sources(self):
+        """TripAdvisor listing pages in batches, add more sources here if needed"""
+        page_urls = self.tripadvisor_page_urls(self.sources[0])
+        return {
+            f'tripadvisor_{number}': partial(self.scrape_tripadvisor, batch)
+            for number, batch in enumerate(batched(page_urls, PAGE_BATCH_SIZE), 1)
+        }
     
     def run(self):
         """Run the attraction scraper"""
         self.log_progress("Starting attraction scraper")
         
-        all_attraction_data = []
-        
-        # Scrape from TripAdvisor
-        tripadvisor_data = self.scrape_tripadvisor(self.sources[0])
-        all_attraction_data.extend(tripadvisor_data)
-        
-        # Add more sources if needed
+        # Attractions are saved in batches while later pages are still being scraped
+        pipeline = self.pipeline()
+        saved_count = pipeline.run(*self.record_sources().values())
         
-        # Save to database
-        self.save_to_database(all_attraction_data)
+        self.log_progress(f"Completed attraction scraper, scraped {sum(pipeline.parsed.values())} attractions")
         
-        self.log_progress(f"Completed attraction scraper, scraped {len(all_attraction_data)} attractions")
\ No newline at end of file
+        return saved_count
@@ -1,4 +1,5 @@
 # core/scraping/base.py
+import abc
 import requests
 import json
 import time
@@ -10,32 +11,51 @@ from datetime import datetime
 from fake_useragent import UserAgent
 import socks
 import socket
+import threading
+from django.conf import settings
+from core.geocoding import full_address, get_geocoder
 from core.models import City 
+from .browser import get_browser_pool
+from .fetcher import FetchEngine, host_limiter
+from .http_cache import get_http_cache
+from .pipeline import ScrapePipeline
+from .telemetry import ScrapeMetrics
 
 logger = logging.getLogger('scraper')
 
-class BaseScraper:
+class BaseScraper(abc.ABC):
     """Base class for all scrapers with common functionality"""
     
+    # IngestSpec of the rows the scraper stores, its slug fields are required
+    ingest_spec = None
+    
     def __init__(self, city_name="Macomb"):
         self.city_name = city_name
         
         # Use rotating user agents to avoid detection
         user_agent_generator = UserAgent()
         
-        # Configure session with standard headers
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Standard headers for every session; sessions are per thread so
+        # concurrent fetches never share connection state
+        self.default_headers = {
             'User-Agent': user_agent_generator.random,
             'Accept-Language': 'en-US,en;q=0.9',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Referer': 'https://www.google.com/',
             'Connection': 'keep-alive',
-        })
+        }
+        self._local = threading.local()
+        
+        # Rate limiting is per host and shared across scrapers
+        self.rate_limit = 5  # Minimum seconds between requests to the same host
+        self.rate_limiter = host_limiter
+        self.max_workers = getattr(settings, 'SCRAPER_MAX_WORKERS', 4)  # Concurrent fetches for fetch_pages
         
-        # Rate limiting and request timing
-        self.rate_limit = 5  # Minimum seconds between requests
-        self.last_request = 0
+        # Pages are cached on disk and revalidated with ETag/Last-Modified;
+        # offline mode replays cached pages and never touches the network
+        self.http_cache = get_http_cache()
+        self.use_cache = getattr(settings, 'SCRAPER_CACHE_ENABLED', True)
+        self.offline = getattr(settings, 'SCRAPER_OFFLINE', False)
         
         # Proxy settings (optional, use if you need to rotate IPs)
         self.use_proxy = False
@@ -43,6 +63,19 @@ class BaseScraper:
             # Add your proxies here if needed
             # {"host": "proxy.example.com", "port": 8080, "username": "user", "password": "pass"},
         ]
+        
+        # Fetch, parse and write measurements, replaced per run by telemetry.record_run
+        self.metrics = ScrapeMetrics()
+    
+    @property
+    def session(self):
+        """Return the requests session for the current thread"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.default_headers)
+            self._local.session = session
+        return session
     
     def configure_proxy(self):
         """Configure a proxy for the current session"""
@@ -71,15 +104,33 @@ class BaseScraper:
         logger.info(f"Using proxy: {proxy['host']}:{proxy['port']}")
         return True
     
-    def fetch_page(self, url, retries=3, javascript_required=False):
-        """Fetch a webpage and return BeautifulSoup object with rate limiting and retry logic"""
-        # Rate limiting
-        current_time = time.time()
-        sleep_time = max(0, self.rate_limit - (current_time - self.last_request))
-        if sleep_time > 0:
-            time.sleep(sleep_time + random.random())  # Add some randomness
-            
-        self.last_request = time.time()
+    def fetch_page(self, url, retries=3, javascript_required=False, wait_for=None):
+        """Fetch a webpage and return BeautifulSoup object with caching, rate limiting and retry logic
+        
+        wait_for is a CSS selector a JavaScript rendered page must contain
+        before its source is read.
+        """
+        cache = self.http_cache if self.use_cache or self.offline else None
+        entry = cache.get(url) if cache else None
+        
+        if self.offline:
+            if entry is None:
+                logger.warning(f"Offline mode, no cached copy of {url}")
+                return None
+            cache.count('hits')
+            self.metrics.add(url, cache_hits=1)
+            return self.make_soup(entry.body, url)
+        
+        # Fresh pages are served without a request, so they skip the rate limiter too
+        if entry is not None and cache.is_fresh(entry):
+            cache.count('hits')
+            self.metrics.add(url, cache_hits=1)
+            logger.info(f"Serving cached URL: {url}")
+            return self.make_soup(entry.body, url)
+        
+        # Rate limiting per host, requests to other hosts are not delayed
+        waited = self.rate_limiter.wait(url, delay=self.rate_limit)
+        self.metrics.add(url, rate_limit_wait=max(waited, 0))
         
         # Configure proxy if needed
         if self.use_proxy:
@@ -87,26 +138,56 @@ class BaseScraper:
             
         # Fetch with retry logic
         for attempt in range(retries):
+            if attempt:
+                self.metrics.add(url, retries=1)
+            start = time.perf_counter()
+            response = None
             try:
                 logger.info(f"Fetching URL: {url}")
                 
                 if javascript_required:
                     # If JS is required, use a headless browser solution
-                    html = self._fetch_with_javascript(url)
-                    return BeautifulSoup(html, 'html.parser')
+                    html = self._fetch_with_javascript(url, wait_for=wait_for)
+                    self.metrics.observe_fetch(url, time.perf_counter() - start, len(html.encode()), error=not html)
+                    if html and cache:
+                        cache.count('misses')
+                        cache.store(url, html)
+                    return self.make_soup(html, url)
                 else:
+                    headers = {
+                        'User-Agent': UserAgent().random  # Rotate user agent per request
+                    }
+                    # Revalidate a stale cached copy instead of downloading it again
+                    if entry is not None:
+                        headers.update(entry.conditional_headers())
+                    
                     # Standard request
-                    response = self.session.get(
-                        url, 
-                        timeout=30,
-                        headers={
-                            'User-Agent': UserAgent().random  # Rotate user agent per request
-                        }
+                    response = self.session.get(url, timeout=30, headers=headers)
+                    self.metrics.observe_fetch(
+                        url, time.perf_counter() - start, len(response.content), error=response.status_code >= 400
                     )
+                    
+                    if response.status_code == 304 and entry is not None:
+                        cache.count('revalidated')
+                        self.metrics.add(url, revalidated=1)
+                        cache.touch(entry)
+                        return self.make_soup(entry.body, url)
+                    
                     response.raise_for_status()
-                    return BeautifulSoup(response.text, 'html.parser')
+                    if cache:
+                        cache.count('misses')
+                        cache.store(
+                            url,
+                            response.text,
+                            etag=response.headers.get('ETag'),
+                            last_modified=response.headers.get('Last-Modified'),
+                        )
+                    return self.make_soup(response.text, url)
                     
             except Exception as e:
+                # Connection errors and timeouts never got a response to measure
+                if response is None and not javascript_required:
+                    self.metrics.observe_fetch(url, time.perf_counter() - start, error=True)
                 logger.error(f"Error fetching {url} (attempt {attempt+1}/{retries}): {str(e)}")
                 if attempt < retries - 1:
                     wait_time = 2 ** attempt  # Exponential backoff
@@ -121,29 +202,46 @@ class BaseScraper:
                     # Switch proxy if possible
                     if self.use_proxy:
                         self.configure_proxy()
+                elif entry is not None:
+                    # A stale page beats no page when the site is down
+                    logger.warning(f"Serving stale cached copy of {url}")
+                    self.metrics.add(url, stale=1)
+                    return self.make_soup(entry.body, url)
                 else:
                     return None
     
-    def _fetch_with_javascript(self, url):
-        """Use a headless browser to fetch content from JavaScript-heavy sites"""
+    def make_soup(self, html, url):
+        """Parse markup into BeautifulSoup, timed as parse time of the page's host"""
+        start = time.perf_counter()
+        soup = BeautifulSoup(html, 'html.parser')
+        self.metrics.record_parse(url, time.perf_counter() - start)
+        return soup
+    
+    def parse_page(self, url, parser, *args):
+        """Run parser(*args) on a fetched page, recording its time and the items it yields
+        
+        A list result counts its items, any other truthy result counts as one.
+        """
+        start = time.perf_counter()
+        result = parser(*args)
+        items = len(result) if isinstance(result, list) else int(bool(result))
+        self.metrics.record_parse(url, time.perf_counter() - start, items)
+        return result
+    
+    def fetch_pages(self, urls, javascript_required=False, max_workers=None):
+        """Fetch a batch of URLs concurrently, yielding (url, soup) as each one completes"""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return
+        
+        with FetchEngine(self, max_workers=max_workers or self.max_workers) as engine:
+            for url, soup in engine.fetch_all(urls, javascript_required=javascript_required):
+                yield url, soup
+    
+    def _fetch_with_javascript(self, url, wait_for=None):
+        """Render a JavaScript-heavy page in a browser leased from the shared pool"""
         try:
-            # This requires additional setup with selenium or playwright
-            # Here's an example using selenium:
-            from selenium import webdriver
-            from selenium.webdriver.chrome.options import Options
-            from selenium.webdriver.chrome.service import Service
-            from webdriver_manager.chrome import ChromeDriverManager
-            
-            options = Options()
-            options.add_argument("--headless")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument(f"user-agent={UserAgent().random}")
-            
-            with webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options) as driver:
-                driver.get(url)
-                time.sleep(5)  # Wait for JS to load
-                return driver.page_source
+            return get_browser_pool().fetch(url, wait_for=wait_for)
         except Exception as e:
             logger.error(f"Error fetching with JavaScript: {str(e)}")
             return ""
@@ -156,7 +254,7 @@ class BaseScraper:
     
     def download_image(self, image_url):
         """Download an image from URL and return the binary content"""
-        if not image_url:
+        if not image_url or self.offline:
             return None
             
         try:
@@ -223,6 +321,47 @@ class BaseScraper:
         entity_str = f" - {entity}" if entity else ""
         logger.info(f"[{timestamp}] {self.__class__.__name__}{entity_str}: {message}")
     
+    @abc.abstractmethod
+    def record_sources(self, **kwargs):
+        """{name: callable returning parsed records} that run(**kwargs) streams
+        
+        Each source is also the unit a scrape is fanned out by across Celery
+        workers, so listings with many pages are split into page batches.
+        Abstract, so a scraper without sources fails when it is created rather
+        than halfway through a pipeline or Celery run.
+        """
+    
+    def pipeline(self, **kwargs):
+        """ScrapePipeline that saves records the way run(**kwargs) does"""
+        return ScrapePipeline(self)
+    
+    def normalize(self, record):
+        """Tidy a parsed record before it is saved, None drops it
+        
+        Records missing a field of the natural key could not be stored.
+        """
+        spec = self.ingest_spec
+        if spec and not all(record.get(field) for field in spec.slug_fields):
+            self.log_progress(f"Dropping record without {', '.join(spec.slug_fields)}: {record}")
+            return None
+        return record
+    
+    def geocode_new(self, spec, records):
+        """{slug: (latitude, longitude)} for records whose row is not stored yet
+        
+        Stored rows keep their coordinates, the missing ones are filled by the
+        geocode_catalog command. The addresses go to the geocoder as one batch,
+        offline runs only consult the gazetteer.
+        """
+        by_slug = {spec.slug_for(data): data for data in records}
+        stored = set(spec.model.objects.filter(slug__in=by_slug).values_list('slug', flat=True))
+        addresses = {
+            slug: full_address(data.get('address'), self.city_name)
+            for slug, data in by_slug.items() if slug not in stored
+        }
+        coordinates = get_geocoder().geocode_many(addresses.values(), offline=self.offline)
+        return {slug: coordinates.get(address, (None, None)) for slug, address in addresses.items()}
+    
     def get_city(self, city_name):
         """Get or create a city with proper handling of duplicates"""
         # First try to find existing cities
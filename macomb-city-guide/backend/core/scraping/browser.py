@@ -0,0 +1,253 @@
+# core/scraping/browser.py
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from django.conf import settings
+from fake_useragent import UserAgent
+
+logger = logging.getLogger('scraper')
+
+BROWSER_POOL_SIZE = getattr(settings, 'SCRAPER_BROWSER_POOL_SIZE', 2)
+BROWSER_MAX_USES = getattr(settings, 'SCRAPER_BROWSER_MAX_USES', 25)
+BROWSER_READY_TIMEOUT = getattr(settings, 'SCRAPER_BROWSER_READY_TIMEOUT', 20)
+NETWORK_IDLE = 0.5  # Seconds without a new resource request before a page counts as loaded
+
+# Polled until the document is complete and the awaited selector matches; the
+# resource count settles once the page's own requests have finished
+READY_SCRIPT = """
+const selector = arguments[0];
+return {
+    ready: document.readyState === 'complete' && (!selector || document.querySelector(selector) !== null),
+    resources: performance.getEntriesByType('resource').length,
+};
+"""
+
+_driver_path = None
+_driver_lock = threading.Lock()
+
+
+def chrome_driver():
+    """Start a headless Chrome, chromedriver is resolved once per process"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    global _driver_path
+    with _driver_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(f"user-agent={UserAgent().random}")
+
+    driver = webdriver.Chrome(service=Service(_driver_path), options=options)
+    driver.set_page_load_timeout(BROWSER_READY_TIMEOUT)
+    return driver
+
+
+def wait_until_ready(driver, selector=None, timeout=BROWSER_READY_TIMEOUT, idle=NETWORK_IDLE, poll=0.1):
+    """Wait for the loaded document, selector and network idle, returns False on timeout"""
+    deadline = time.monotonic() + timeout
+    resources = quiet_since = None
+    while True:
+        state = driver.execute_script(READY_SCRIPT, selector)
+        now = time.monotonic()
+        if not state['ready']:
+            resources = None
+        elif state['resources'] != resources:
+            resources, quiet_since = state['resources'], now
+        elif now - quiet_since >= idle:
+            return True
+        if now >= deadline:
+            return False
+        time.sleep(poll)
+
+
+class PooledBrowser:
+    """A warm driver and the number of fetches it has served"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+
+    def healthy(self):
+        try:
+            return self.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing browser: {str(e)}")
+
+
+class BrowserPool:
+    """Up to size warm headless browsers, each leased to one fetch at a time
+
+    Browsers start on first demand and are reused until they have served
+    max_uses fetches or fail, then quit and replaced on the next lease. An idle
+    browser that fails its health check is replaced before it is leased.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES, factory=chrome_driver,
+                 ready_timeout=BROWSER_READY_TIMEOUT):
+        self.size = size
+        self.max_uses = max_uses
+        self.factory = factory
+        self.ready_timeout = ready_timeout
+        self.idle = []
+        self.live = 0  # Started browsers, idle or leased
+        self.closed = False
+        self.condition = threading.Condition()
+        self.stats = Counter()
+
+    def _record(self, **values):
+        with self.condition:
+            self.stats.update(values)
+
+    def _launch(self):
+        browser = PooledBrowser(self.factory())
+        self._record(launched=1)
+        return browser
+
+    def _acquire(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self.idle:
+                    browser = self.idle.pop()
+                    break
+                if self.live < self.size:
+                    self.live += 1
+                    browser = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No browser free within {timeout}s")
+                self.condition.wait(remaining)
+
+        try:
+            if browser is not None and not browser.healthy():
+                self._record(unhealthy=1)
+                browser.quit()
+                browser = None
+            return browser or self._launch()
+        except Exception:
+            self._discard()
+            raise
+
+    def _discard(self):
+        with self.condition:
+            self.live -= 1
+            self.condition.notify()
+
+    def _release(self, browser, failed):
+        browser.uses += 1
+        with self.condition:
+            if not (failed or self.closed or browser.uses >= self.max_uses):
+                self.idle.append(browser)
+                self.condition.notify()
+                return
+        self._record(recycled=1)
+        browser.quit()
+        self._discard()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Borrow a browser, a fetch that raises gets its browser replaced"""
+        browser = self._acquire(timeout)
+        failed = False
+        try:
+            yield browser
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(browser, failed)
+
+    def fetch(self, url, wait_for=None, timeout=None):
+        """Page source of url once it is ready, see wait_until_ready"""
+        start = time.perf_counter()
+        with self.lease() as browser:
+            leased = time.perf_counter()
+            browser.driver.get(url)
+            loaded = time.perf_counter()
+            ready = wait_until_ready(browser.driver, wait_for, timeout or self.ready_timeout)
+            html = browser.driver.page_source
+        finished = time.perf_counter()
+
+        self._record(
+            fetches=1, lease_wait=leased - start, load=loaded - leased,
+            ready_wait=finished - loaded, not_ready=int(not ready)
+        )
+        if not ready:
+            logger.warning(f"{url} not ready after {timeout or self.ready_timeout}s, using the page as loaded")
+        return html
+
+    def health(self):
+        """Check the idle browsers, dropping dead ones so the next lease starts a fresh one"""
+        with self.condition:
+            idle, self.idle = self.idle, []
+        healthy = []
+        for browser in idle:
+            if browser.healthy():
+                healthy.append(browser)
+            else:
+                self._record(unhealthy=1)
+                browser.quit()
+                self._discard()
+        with self.condition:
+            self.idle.extend(healthy)
+            self.condition.notify(len(healthy))
+            return {
+                'size': self.size,
+                'live': self.live,
+                'idle': len(self.idle),
+                'leased': self.live - len(self.idle),
+                'dropped': len(idle) - len(healthy),
+            }
+
+    def snapshot(self):
+        """Counters plus average per-fetch timings in seconds"""
+        with self.condition:
+            stats = dict(self.stats)
+        fetches = stats.get('fetches', 0)
+        for name in ('lease_wait', 'load', 'ready_wait'):
+            stats[f'avg_{name}'] = stats.get(name, 0.0) / fetches if fetches else 0.0
+        return stats
+
+    def close(self):
+        """Quit idle browsers now, leased ones quit when returned"""
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.live -= len(idle)
+            self.condition.notify_all()
+        for browser in idle:
+            browser.quit()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process wide browser pool shared by all scrapers"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool()
+                atexit.register(_pool.close)
+    return _pool
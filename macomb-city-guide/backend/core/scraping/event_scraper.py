@@ -1,15 +1,28 @@
-from django.core.files.base import ContentFile
 from .base import BaseScraper
 from core.models import Event, EventType, City
-import requests
+from .ingest import IngestSpec, bulk_ingest
+from .images import ImagePipeline
 import re
 from urllib.parse import urlparse
 import json
+from functools import partial
 from datetime import datetime, timedelta
 import random
+import time
+
+EVENT_SPEC = IngestSpec(
+    Event,
+    slug_fields=('name', 'date'),
+    fields=['name', 'date', 'description', 'venue', 'address', 'event_type', 'time', 'website', 'city'],
+    lookups={'event_type': EventType},
+    # Featured status is set manually, so updates never overwrite it; coordinates
+    # are geocoded once when the event is first stored
+    create_only={'featured': False, 'latitude': None, 'longitude': None},
+)
 
 class EventScraper(BaseScraper):
     """Scraper for event data"""
+    ingest_spec = EVENT_SPEC
     
     def __init__(self, city_name="Macomb"):
         super().__init__(city_name)
@@ -27,6 +40,7 @@ class EventScraper(BaseScraper):
         if not soup:
             return events
             
+        parse_start = time.perf_counter()
         try:
             # Find event listings
             event_listings = soup.select('.event-listing, .event-card')
@@ -145,6 +159,7 @@ class EventScraper(BaseScraper):
         except Exception as e:
             self.log_progress(f"Error scraping Macomb Center events: {str(e)}")
         
+        self.metrics.record_parse(url, time.perf_counter() - parse_start, len(events))
         return events
 
     def scrape_eventbrite(self, url):
@@ -154,6 +169,7 @@ class EventScraper(BaseScraper):
         if not soup:
             return events
             
+        parse_start = time.perf_counter()
         try:
             # Find event cards
             event_cards = soup.select('.search-event-card, .eds-event-card')
@@ -302,6 +318,7 @@ class EventScraper(BaseScraper):
         except Exception as e:
             self.log_progress(f"Error scraping Eventbrite events: {str(e)}")
         
+        self.metrics.record_parse(url, time.perf_counter() - parse_start, len(events))
         return events
 
     def save_to_database(self, events_data):
@@ -315,97 +332,58 @@ class EventScraper(BaseScraper):
             }
         )
         
-        for data in events_data:
-            try:
-                # Get or create event type
-                event_type_name = data.get('event_type', 'Community Event')
-                event_type, _ = EventType.objects.get_or_create(name=event_type_name)
-                
-                # Check if event already exists (by name and date)
-                event, created = Event.objects.get_or_create(
-                    name=data['name'],
-                    date=data['date'],
-                    defaults={
-                        'description': data['description'],
-                        'venue': data['venue'],
-                        'address': data['address'],
-                        'event_type': event_type,
-                        'time': data['time'],
-                        'website': data.get('website', ''),
-                        'featured': False,  # Set featured status manually or based on criteria
-                        'city': city
-                    }
-                )
-                
-                # If the event already exists, update its fields
-                if not created:
-                    event.description = data['description']
-                    event.venue = data['venue']
-                    event.address = data['address']
-                    event.event_type = event_type
-                    event.time = data['time']
-                    event.website = data.get('website', '')
-                    event.save()
-                
-                # Download and save the image if URL is provided
-                if data.get('image_url') and (created or not event.image):
-                    self.download_and_save_image(event, data['image_url'])
-                    
-                self.log_progress(f"{'Created' if created else 'Updated'} event: {event.name}")
-            
-            except Exception as e:
-                self.log_progress(f"Error saving event {data.get('name', 'unknown')}: {str(e)}")
-                
-        return len(events_data)
-
-    def download_and_save_image(self, event, image_url):
-        """Download and save event image"""
-        if not image_url:
-            return
+        # Geocoding is slow and rate limited, so only look up events not stored yet
+        coordinates = self.geocode_new(EVENT_SPEC, events_data)
         
-        try:
-            response = requests.get(image_url, stream=True, timeout=10)
-            if response.status_code == 200:
-                # Extract filename from URL
-                parsed_url = urlparse(image_url)
-                filename = parsed_url.path.split('/')[-1]
-                
-                # Ensure filename has extension
-                if not filename or '.' not in filename:
-                    filename = f"event_{event.id}.jpg"
-                
-                # Save image to event model
-                event.image.save(
-                    filename,
-                    ContentFile(response.content),
-                    save=True
-                )
-                self.log_progress(f"Downloaded image for event: {event.name}")
-            else:
-                self.log_progress(f"Failed to download image for event {event.name}: Status code {response.status_code}")
+        rows = [
+            {
+                'name': data['name'],
+                'date': data['date'],
+                'description': data['description'],
+                'venue': data['venue'],
+                'address': data['address'],
+                'event_type': data.get('event_type', 'Community Event'),
+                'time': data['time'],
+                'website': data.get('website', ''),
+            }
+            for data in events_data
+        ]
+        for row, data in zip(rows, events_data):
+            row['latitude'], row['longitude'] = coordinates.get(EVENT_SPEC.slug_for(data), (None, None))
         
+        try:
+            # Name and date identify an event, as the old get_or_create lookup did
+            with self.metrics.db_write(len(rows)):
+                result = bulk_ingest(EVENT_SPEC, rows, extra={'city': city})
         except Exception as e:
-            self.log_progress(f"Error downloading event image: {str(e)}")
+            self.log_progress(f"Error saving events: {str(e)}")
+            return 0
+        
+        # Queue images only for new events or ones still missing an image
+        images = ImagePipeline(self)
+        for data in events_data:
+            event = result.objects.get(EVENT_SPEC.slug_for(data))
+            if event and data.get('image_url') and (result.was_created(event) or not event.image):
+                images.add(event, data['image_url'])
+        images.run()
+        
+        self.log_progress(f"Saved events: {result}")
+        return result.total
+
+    def record_sources(self):
+        """Macomb Center and Eventbrite, one page each"""
+        return {
+            'macomb_center': partial(self.scrape_macomb_center, self.sources['macomb_center']),
+            'eventbrite': partial(self.scrape_eventbrite, self.sources['eventbrite']),
+        }
 
     def run(self):
         """Run the event scraper"""
         self.log_progress("Starting event scraper")
         
-        all_events_data = []
-        
-        # Scrape from Macomb Center
-        macomb_events = self.scrape_macomb_center(self.sources['macomb_center'])
-        all_events_data.extend(macomb_events)
-        self.log_progress(f"Scraped {len(macomb_events)} events from Macomb Center")
-        
-        # Scrape from Eventbrite
-        eventbrite_events = self.scrape_eventbrite(self.sources['eventbrite'])
-        all_events_data.extend(eventbrite_events)
-        self.log_progress(f"Scraped {len(eventbrite_events)} events from Eventbrite")
-        
-        # Save to database
-        saved_count = self.save_to_database(all_events_data)
+        # Each source is a single page, saved in batches as the pipeline reads it
+        saved_count = self.pipeline().run(*self.record_sources().values())
         
         self.log_progress(f"Completed event scraper, saved {saved_count} events")
         
-        return saved_count
\ No newline at end of file
+        return saved_count
@@ -1,4 +1,5 @@
 # core/scraping/events_scraper.py
+from functools import partial
 from django.core.files.base import ContentFile
 from .base import BaseScraper
 from core.models import Event, EventType, City
@@ -176,7 +177,7 @@ class EventScraper(BaseScraper):
     
     def download_and_save_image(self, event, image_url):
         """Download and save event image"""
-        if not image_url:
+        if not image_url or self.offline:
             return
             
         try:
@@ -192,6 +193,10 @@ class EventScraper(BaseScraper):
         except Exception as e:
             self.log_progress(f"Error downloading image: {str(e)}")
     
+    def record_sources(self):
+        """Eventbrite listing, add more sources here if needed"""
+        return {'eventbrite': partial(self.scrape_eventbrite, self.sources[0])}
+    
     def run(self):
         """Run the event scraper"""
         self.log_progress("Starting event scraper")
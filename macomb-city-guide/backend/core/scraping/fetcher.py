@@ -0,0 +1,102 @@
+# core/scraping/fetcher.py
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from urllib.parse import urlparse
+from django.conf import settings
+from django.db import close_old_connections
+
+# Default politeness delay per host in seconds, overridable per host with
+# SCRAPER_HOST_DELAYS = {'www.zillow.com': 10}
+DEFAULT_HOST_DELAY = 5
+DEFAULT_MAX_WORKERS = getattr(settings, 'SCRAPER_MAX_WORKERS', 8)
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host while letting different hosts run in parallel"""
+
+    def __init__(self, delay=DEFAULT_HOST_DELAY, host_delays=None, jitter=1.0):
+        self.delay = delay
+        self.host_delays = dict(getattr(settings, 'SCRAPER_HOST_DELAYS', {}))
+        self.host_delays.update(host_delays or {})
+        self.jitter = jitter
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def host_for(self, url):
+        return urlparse(url).netloc.lower()
+
+    def delay_for(self, host, default=None):
+        return self.host_delays.get(host, self.delay if default is None else default)
+
+    def wait(self, url, delay=None):
+        """Block until the host of url may be requested again, returns seconds slept"""
+        host = self.host_for(url)
+
+        # Reserve the next free slot for this host under the lock, sleep outside it
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, 0))
+            self.next_slot[host] = slot + self.delay_for(host, delay) + random.random() * self.jitter
+
+        sleep_time = slot - now
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+        return sleep_time
+
+
+# Shared by every scraper in the process so parallel scrapers stay polite per host
+host_limiter = HostRateLimiter()
+
+
+class FetchEngine:
+    """Thread pool that fetches pages through a scraper and yields results as they complete"""
+
+    def __init__(self, scraper, max_workers=DEFAULT_MAX_WORKERS):
+        self.scraper = scraper
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"{scraper.__class__.__name__}-fetch"
+        )
+
+    def _fetch(self, url, javascript_required):
+        try:
+            return self.scraper.fetch_page(url, javascript_required=javascript_required)
+        finally:
+            # Worker threads get their own DB connection if anything touched the ORM
+            close_old_connections()
+
+    def submit(self, url, javascript_required=False):
+        """Queue a single URL, returns a Future resolving to a BeautifulSoup object or None"""
+        return self.executor.submit(self._fetch, url, javascript_required)
+
+    def fetch_all(self, urls, javascript_required=False, window=None):
+        """Fetch a batch of URLs, yielding (url, soup) pairs in completion order
+
+        At most window URLs (twice the workers by default) are in flight or
+        waiting to be consumed, so a slow consumer holds fetching back instead
+        of piling up parsed pages.
+        """
+        urls = iter(urls)
+        window = window or self.max_workers * 2
+        futures = {}
+        while True:
+            for url in islice(urls, window - len(futures)):
+                futures[self.submit(url, javascript_required)] = url
+            if not futures:
+                return
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield futures.pop(future), future.result()
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=exc_type is None)
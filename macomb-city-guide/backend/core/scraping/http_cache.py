@@ -0,0 +1,171 @@
+# core/scraping/http_cache.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+
+logger = logging.getLogger('scraper')
+
+# Pages younger than this are served straight from the cache without a request
+DEFAULT_TTL = getattr(settings, 'SCRAPER_CACHE_TTL', 6 * 60 * 60)
+# Entries not fetched or revalidated for this long are evicted
+DEFAULT_MAX_AGE = getattr(settings, 'SCRAPER_CACHE_MAX_AGE', 14 * 24 * 60 * 60)
+# Total size of the cache directory before least recently used entries are evicted
+DEFAULT_MAX_BYTES = getattr(settings, 'SCRAPER_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+
+
+class CacheEntry:
+    """A cached response body with the validators needed to revalidate it"""
+
+    def __init__(self, url, body, etag=None, last_modified=None, fetched_at=None):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at or time.time()
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def conditional_headers(self):
+        """Headers that turn the next request into a revalidation"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'body': self.body,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'fetched_at': self.fetched_at,
+        }
+
+
+class HTTPCache:
+    """On-disk page cache keyed by URL with TTL freshness and size bounded LRU eviction
+
+    Each entry is one JSON file named after the URL hash. File modification times
+    track the last access, so eviction survives restarts without a separate index.
+    """
+
+    def __init__(self, directory=None, ttl=DEFAULT_TTL, max_age=DEFAULT_MAX_AGE, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory or getattr(
+            settings, 'SCRAPER_CACHE_DIR', Path(settings.BASE_DIR) / 'scraper_cache'
+        ))
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()  # Guards eviction and the counters, fetches update them from a pool
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def path_for(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, url):
+        """Return the CacheEntry for url or None, marking it as recently used"""
+        path = self.path_for(url)
+        try:
+            with open(path, encoding='utf-8') as cache_file:
+                data = json.load(cache_file)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(**data)
+
+    def is_fresh(self, entry):
+        return entry.age() < self.ttl
+
+    def store(self, url, body, etag=None, last_modified=None):
+        entry = CacheEntry(url, body, etag=etag, last_modified=last_modified)
+        self._write(entry)
+        return entry
+
+    def touch(self, entry):
+        """Record a successful revalidation (304), restarting the entry's TTL"""
+        entry.fetched_at = time.time()
+        self._write(entry)
+        return entry
+
+    def _write(self, entry):
+        path = self.path_for(entry.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(entry.to_dict(), cache_file)
+        os.replace(tmp_path, path)
+
+    def delete(self, url):
+        try:
+            self.path_for(url).unlink()
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Drop entries older than max_age, then least recently used entries over max_bytes"""
+        if not self.directory.exists():
+            return 0
+
+        with self.lock:
+            now = time.time()
+            files = []
+            for path in self.directory.glob('*/*.json'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            removed = 0
+            total = 0
+            # Most recently used first, so everything past the size budget is the LRU tail
+            for accessed, size, path in sorted(files, reverse=True):
+                if now - accessed > self.max_age or total + size > self.max_bytes:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                else:
+                    total += size
+
+        if removed:
+            logger.info(f"HTTP cache evicted {removed} entries, {total} bytes kept")
+        return removed
+
+    def clear(self):
+        for path in self.directory.glob('*/*.json'):
+            path.unlink(missing_ok=True)
+
+    def count(self, counter):
+        """Add one to the hits, revalidated or misses counter"""
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Return the process wide HTTP cache shared by all scrapers"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HTTPCache()
+    return _cache
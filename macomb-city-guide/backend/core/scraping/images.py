@@ -0,0 +1,183 @@
+# core/scraping/images.py
+import hashlib
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from core.cache import bump_model_version
+from core.models import ScrapedImage
+
+logger = logging.getLogger('scraper')
+
+DEFAULT_IMAGE_WORKERS = getattr(settings, 'SCRAPER_IMAGE_WORKERS', 4)
+MAX_IMAGE_BYTES = getattr(settings, 'SCRAPER_MAX_IMAGE_BYTES', 20 * 1024 * 1024)
+CHUNK_SIZE = 64 * 1024
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif'}
+
+
+def url_hash(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def image_extension(url, content_type=None):
+    """Pick a file extension from the URL path, falling back to the response content type"""
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    if ext not in IMAGE_EXTENSIONS and content_type:
+        ext = mimetypes.guess_extension(content_type.split(';')[0].strip()) or ''
+    return ext if ext in IMAGE_EXTENSIONS else '.jpg'
+
+
+class ImagePipeline:
+    """Downloads scraped images on a bounded thread pool and attaches them in batches
+
+    Queue work with add(instance, url). Unsaved instances (e.g. PropertyImage rows)
+    are bulk created once their image is stored, saved ones are bulk updated.
+    Each URL is downloaded at most once: URLs already in the ScrapedImage index are
+    reused without a request, and identical content from different URLs shares one
+    file because stored names are derived from the content hash.
+    """
+
+    def __init__(self, scraper, max_workers=DEFAULT_IMAGE_WORKERS, batch_size=100):
+        self.scraper = scraper
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.jobs = {}  # url -> [(instance, field name)]
+        self.stored_names = set()
+        self.lock = threading.Lock()
+        self.downloaded = 0
+        self.reused = 0
+        self.failed = 0
+
+    def add(self, instance, url, field_name='image'):
+        if url:
+            self.jobs.setdefault(url, []).append((instance, field_name))
+
+    def run(self):
+        """Process all queued images and return a stats dict"""
+        if not self.jobs:
+            return self.stats()
+
+        hashes = {url_hash(url): url for url in self.jobs}
+        known = {
+            hashes[entry.url_hash]: entry.file
+            for entry in ScrapedImage.objects.filter(url_hash__in=hashes)
+        }
+
+        pending = []
+        for url, name in known.items():
+            self.reused += 1
+            pending.append((url, name, None))
+        self._persist(pending)
+
+        # Offline runs can reuse indexed images but never download new ones
+        to_download = [url for url in self.jobs if url not in known]
+        if to_download and not self.scraper.offline:
+            self._download_all(to_download)
+
+        logger.info(f"Image pipeline: {self.downloaded} downloaded, {self.reused} reused, {self.failed} failed")
+        return self.stats()
+
+    def stats(self):
+        return {'downloaded': self.downloaded, 'reused': self.reused, 'failed': self.failed}
+
+    def _download_all(self, urls):
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='image-fetch') as executor:
+            futures = {executor.submit(self._download, url): url for url in urls}
+            # Database writes stay on this thread, workers only touch the network and storage
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    name, content_hash, size = future.result()
+                except Exception as e:
+                    self.failed += 1
+                    logger.error(f"Error downloading image {url}: {str(e)}")
+                    continue
+
+                self.downloaded += 1
+                pending.append((url, name, (content_hash, size)))
+                if len(pending) >= self.batch_size:
+                    self._persist(pending)
+                    pending = []
+
+        self._persist(pending)
+
+    def _download(self, url):
+        """Stream url to storage, returns (storage name, content hash, size)"""
+        try:
+            # The images live on the target model's upload_to directory
+            instance, field_name = self.jobs[url][0]
+            upload_to = instance._meta.get_field(field_name).upload_to
+
+            response = self.scraper.session.get(url, stream=True, timeout=20)
+            response.raise_for_status()
+
+            digest = hashlib.sha256()
+            size = 0
+            # Small images stay in memory, larger ones spill to a temporary file
+            with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as buffer:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_IMAGE_BYTES:
+                        raise ValueError(f"image larger than {MAX_IMAGE_BYTES} bytes")
+                    digest.update(chunk)
+                    buffer.write(chunk)
+
+                content_hash = digest.hexdigest()
+                name = os.path.join(upload_to, f"{content_hash}{image_extension(url, response.headers.get('Content-Type'))}")
+
+                with self.lock:
+                    exists = name in self.stored_names
+                    self.stored_names.add(name)
+                if not exists and not default_storage.exists(name):
+                    buffer.seek(0)
+                    name = default_storage.save(name, File(buffer, name=name))
+
+            return name, content_hash, size
+        finally:
+            close_old_connections()
+
+    def _persist(self, results):
+        """Attach stored images to their instances and record new downloads in the index"""
+        if not results:
+            return
+
+        to_update = {}  # model -> ({instance id: instance}, field names)
+        to_create = {}  # model -> [instances]
+        index_entries = []
+
+        for url, name, downloaded in results:
+            for instance, field_name in self.jobs[url]:
+                if getattr(instance, field_name).name == name:
+                    continue
+                setattr(instance, field_name, name)
+                if instance.pk is None:
+                    to_create.setdefault(type(instance), []).append(instance)
+                else:
+                    objects, fields = to_update.setdefault(type(instance), ({}, set()))
+                    objects[id(instance)] = instance
+                    fields.add(field_name)
+
+            if downloaded is not None:
+                content_hash, size = downloaded
+                index_entries.append(ScrapedImage(
+                    url_hash=url_hash(url), url=url, content_hash=content_hash, file=name, size=size
+                ))
+
+        for model, instances in to_create.items():
+            model.objects.bulk_create(instances, batch_size=self.batch_size)
+        for model, (objects, fields) in to_update.items():
+            model.objects.bulk_update(list(objects.values()), list(fields), batch_size=self.batch_size)
+        if index_entries:
+            ScrapedImage.objects.bulk_create(index_entries, batch_size=self.batch_size, ignore_conflicts=True)
+
+        # Bulk writes skip post_save, so expire cached responses showing these images
+        if to_create or to_update:
+            bump_model_version(*to_create, *to_update)
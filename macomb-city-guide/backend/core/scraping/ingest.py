@@ -0,0 +1,247 @@
+# core/scraping/ingest.py
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Model
+from django.utils import timezone
+from django.utils.text import slugify
+from core import search
+from core.cache import bump_model_version
+from core.geo import invalidate_spatial_index
+
+logger = logging.getLogger('scraper')
+
+
+class IngestSpec:
+    """Describes how scraped dicts map onto one catalog model"""
+
+    def __init__(self, model, slug_fields, fields, lookups=None, create_only=None):
+        self.model = model
+        # Fields combined into the slug, which is the natural key for upserts
+        self.slug_fields = slug_fields
+        # Model fields written on create and refreshed on update
+        self.fields = fields
+        # {field name: lookup model} for foreign keys scraped as names
+        self.lookups = lookups or {}
+        # {field name: default} only written when a row is first created
+        self.create_only = create_only or {}
+
+    def slug_for(self, row):
+        return slugify(' '.join(str(row[field]) for field in self.slug_fields))[:250]
+
+
+class IngestResult:
+    """Counts and saved objects from a bulk ingest"""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0  # Rows dropped because a required lookup was missing
+        self.created_slugs = set()
+        self.objects = {}  # slug -> saved instance
+
+    @property
+    def total(self):
+        return self.created + self.updated + self.unchanged
+
+    def was_created(self, obj):
+        return obj.slug in self.created_slugs
+
+    def __str__(self):
+        summary = f"{self.created} created, {self.updated} updated, {self.unchanged} unchanged"
+        if self.skipped:
+            summary += f", {self.skipped} skipped"
+        return summary
+
+
+def resolve_lookups(lookup_model, names):
+    """Return {name: instance} for names, creating missing ones in a single insert"""
+    names = {name for name in names if name}
+    resolved = {}
+
+    # Oldest row wins if a name was duplicated by earlier get_or_create races
+    for obj in lookup_model.objects.filter(name__in=names).order_by('-id'):
+        resolved[obj.name] = obj
+
+    missing = [lookup_model(name=name) for name in sorted(names - resolved.keys())]
+    if missing:
+        lookup_model.objects.bulk_create(missing)
+        bump_model_version(lookup_model)
+        for obj in lookup_model.objects.filter(name__in=[obj.name for obj in missing]).order_by('-id'):
+            resolved[obj.name] = obj
+
+    return resolved
+
+
+def fingerprint(spec, row):
+    """Stable hash of the normalized scraped payload for the spec's fields"""
+    payload = {name: _normalize(row.get(name)) for name in spec.fields}
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def bulk_ingest(spec, rows, extra=None, batch_size=500):
+    """Upsert scraped rows for spec.model in one transaction and return an IngestResult
+
+    rows are dicts keyed by model field name. Lookup fields hold names and are
+    resolved with one query per lookup model. extra holds values shared by every
+    row, such as the city. Rows whose fingerprint matches the stored one are not
+    written at all; changed rows only write the fields that differ.
+    """
+    model = spec.model
+    result = IngestResult()
+    extra = extra or {}
+
+    # Later rows win when the same entity was scraped twice
+    by_slug = {}
+    for row in rows:
+        row = {**extra, **row}
+        slug = spec.slug_for(row)
+        if slug:
+            by_slug[slug] = row
+    if not by_slug:
+        return result
+
+    fingerprints = {slug: fingerprint(spec, row) for slug, row in by_slug.items()}
+
+    with transaction.atomic():
+        # One narrow query decides which rows are new, changed or untouched
+        existing = {
+            slug: (pk, stored)
+            for slug, pk, stored in model.objects.filter(slug__in=by_slug).values_list(
+                'slug', 'pk', 'content_fingerprint'
+            )
+        }
+        new_slugs = [slug for slug in by_slug if slug not in existing]
+        changed_slugs = [
+            slug for slug in by_slug
+            if slug in existing and existing[slug][1] != fingerprints[slug]
+        ]
+        result.unchanged = len(by_slug) - len(new_slugs) - len(changed_slugs)
+
+        pending = {slug: by_slug[slug] for slug in new_slugs + changed_slugs}
+        resolved = {
+            field: resolve_lookups(lookup_model, [row.get(field) for row in pending.values()])
+            for field, lookup_model in spec.lookups.items()
+        } if pending else {}
+
+        # A row without a required foreign key would fail the whole batch insert,
+        # so it is dropped and logged on its own
+        required = [field for field in resolved if not model._meta.get_field(field).null]
+        invalid = set()
+        for slug, row in pending.items():
+            missing = [field for field in required if resolved[field].get(row.get(field)) is None]
+            if missing:
+                logger.warning(f"Skipping {model.__name__} {slug}: missing {', '.join(missing)}")
+                invalid.add(slug)
+                del by_slug[slug]
+        if invalid:
+            new_slugs = [slug for slug in new_slugs if slug not in invalid]
+            changed_slugs = [slug for slug in changed_slugs if slug not in invalid]
+            result.skipped = len(invalid)
+
+        def values_for(row):
+            values = {}
+            for name in spec.fields:
+                value = row.get(name)
+                if name in resolved:
+                    value = resolved[name].get(value)
+                values[name] = value
+            return values
+
+        to_create = []
+        for slug in new_slugs:
+            row = by_slug[slug]
+            values = values_for(row)
+            for name, default in spec.create_only.items():
+                values.setdefault(name, row.get(name, default))
+            to_create.append(model(slug=slug, content_fingerprint=fingerprints[slug], **values))
+            result.created_slugs.add(slug)
+        result.created = len(to_create)
+
+        # Compare changed rows column by column so only differing fields are written
+        compare_fields = [model._meta.get_field(name) for name in spec.fields]
+        current_values = {
+            values['slug']: values
+            for values in model.objects.filter(slug__in=changed_slugs).values(
+                'slug', *[field.attname for field in compare_fields]
+            )
+        } if changed_slugs else {}
+
+        now = timezone.now()
+        updates = defaultdict(list)  # tuple of update_fields -> instances
+        updated = []
+        for slug in changed_slugs:
+            values = values_for(by_slug[slug])
+            current = current_values[slug]
+            changed_fields = [
+                field.name for field in compare_fields
+                if not _same(field, values[field.name], current[field.attname])
+            ]
+            obj = model(
+                pk=existing[slug][0],
+                slug=slug,
+                content_fingerprint=fingerprints[slug],
+                **{name: values[name] for name in changed_fields}
+            )
+            if changed_fields:
+                obj.updated_at = now
+                updates[tuple(changed_fields) + ('content_fingerprint', 'updated_at')].append(obj)
+                updated.append(slug)
+            else:
+                # Rows stored before fingerprints existed only need the hash backfilled
+                updates[('content_fingerprint',)].append(obj)
+        result.updated = len(updated)
+        result.unchanged += len(changed_slugs) - len(updated)
+
+        if to_create:
+            # Another ingest may insert the same slug after the existing query,
+            # such as parallel page batches, so a conflict updates that row
+            model.objects.bulk_create(
+                to_create,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['slug'],
+                update_fields=list(spec.fields) + ['content_fingerprint', 'updated_at'],
+            )
+        for update_fields, objs in updates.items():
+            model.objects.bulk_update(objs, list(update_fields), batch_size=batch_size)
+
+        result.objects = model.objects.in_bulk(list(by_slug), field_name='slug')
+
+        # Bulk writes skip post_save, so refresh the derived indexes here
+        written = [result.objects[slug] for slug in new_slugs + updated if slug in result.objects]
+        if written:
+            search.index_objects(model, written)
+            invalidate_spatial_index(model)
+            bump_model_version(model)
+
+    logger.info(f"Bulk ingest {model.__name__}: {result}")
+    return result
+
+
+def _normalize(value):
+    """Reduce a scraped value to a JSON friendly form that ignores cosmetic differences"""
+    if isinstance(value, Model):
+        return value.pk
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, Decimal):
+        return str(value.normalize())
+    return value
+
+
+def _same(field, new_value, current_value):
+    """Compare a scraped value with the stored column value"""
+    if field.is_relation:
+        new_value = new_value.pk if new_value is not None else None
+    else:
+        try:
+            new_value = field.to_python(new_value)
+        except Exception:
+            return False
+    return new_value == current_value
@@ -0,0 +1,161 @@
+# core/scraping/jobs.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from core.models import ScrapeJob, ScrapeRun
+from .targets import SCRAPE_TARGETS, SCRAPER_TYPES
+from .telemetry import record_run
+
+logger = logging.getLogger('scraper')
+
+# 'thread' runs jobs on a pool inside the web process, 'celery' hands them to
+# a worker on the scrape_jobs queue
+JOB_BACKEND = getattr(settings, 'SCRAPE_JOB_BACKEND', 'thread')
+JOB_WORKERS = getattr(settings, 'SCRAPE_JOB_WORKERS', 1)
+# A running job without a progress update for this long lost its worker
+JOB_STALE_AFTER = timedelta(seconds=getattr(settings, 'SCRAPE_JOB_STALE_AFTER', 30 * 60))
+
+
+class ScrapeCancelled(Exception):
+    """Raised inside a running job once its cancellation was requested"""
+
+
+class JobProgress:
+    """Pipeline progress callback that writes a job's counters and checks for cancellation"""
+
+    def __init__(self, job):
+        self.job = job
+        self.done = {'pages_fetched': 0, 'records_saved': 0, 'errors': 0}  # Finished targets
+
+    def add_run(self, run):
+        self.done['pages_fetched'] += run.pages_fetched
+        self.done['records_saved'] += run.items_saved
+        self.done['errors'] += run.errors
+
+    def update(self, **fields):
+        """Store fields and a heartbeat, raises ScrapeCancelled if the job is to stop"""
+        ScrapeJob.objects.filter(pk=self.job.pk).update(heartbeat_at=timezone.now(), **fields)
+        if ScrapeJob.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            raise ScrapeCancelled('Cancelled')
+
+    def __call__(self, pipeline):
+        totals = pipeline.scraper.metrics.totals()
+        self.update(
+            pages_fetched=self.done['pages_fetched'] + totals['fetches'],
+            records_saved=self.done['records_saved'] + pipeline.saved,
+            errors=self.done['errors'] + totals['errors'],
+        )
+
+
+def run_target(name, job, progress):
+    """Run one scrape target for job as a ScrapeRun, returns the finished run
+
+    A failing scraper only fails its run. Cancellation propagates, and so does
+    an error before the run exists, which fails the whole job.
+    """
+    target = SCRAPE_TARGETS[name]
+    scraper = target.make_scraper()
+    run = None
+    try:
+        with record_run(scraper, name, job=job) as run:
+            pipeline = scraper.pipeline(**target.kwargs)
+            pipeline.progress = progress
+            try:
+                pipeline.run(*scraper.record_sources(**target.kwargs).values())
+            finally:
+                run.items_saved = pipeline.saved
+    except ScrapeCancelled:
+        raise
+    except Exception:
+        if run is None:
+            raise
+        logger.exception(f"Scraper {name} failed in scrape job {job.pk}")
+    return run
+
+
+def run_job(job_id):
+    """Run a queued ScrapeJob to the end on the calling thread"""
+    # Claiming the row makes a job that was cancelled or picked up already a no-op
+    claimed = ScrapeJob.objects.filter(pk=job_id, status=ScrapeJob.QUEUED).update(
+        status=ScrapeJob.RUNNING, started_at=timezone.now(), heartbeat_at=timezone.now()
+    )
+    if not claimed:
+        return
+    job = ScrapeJob.objects.get(pk=job_id)
+    progress = JobProgress(job)
+
+    fields = {}
+    failures = []
+    try:
+        for name in SCRAPER_TYPES[job.scraper_type]:
+            progress.update(current_scraper=name)
+            run = run_target(name, job, progress)
+            progress.add_run(run)
+            if run.status == ScrapeRun.FAILED:
+                failures.append(f'{name}: {run.error}')
+        fields = dict(progress.done, status=ScrapeJob.FAILED if failures else ScrapeJob.SUCCEEDED)
+    except ScrapeCancelled:
+        fields = {'status': ScrapeJob.CANCELLED}
+    except Exception as e:
+        logger.exception(f"Scrape job {job_id} failed")
+        fields = {'status': ScrapeJob.FAILED}
+        failures.append(str(e))
+    finally:
+        ScrapeJob.objects.filter(pk=job_id).update(
+            finished_at=timezone.now(), current_scraper='', error='; '.join(failures), **fields
+        )
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        # Each worker thread opens its own database connection
+        connection.close()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_job_executor():
+    """Return the process wide pool that runs scrape jobs with the thread backend"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='scrape-job')
+    return _executor
+
+
+def enqueue_job(job):
+    """Hand job to the background worker once the transaction creating it commits"""
+    if JOB_BACKEND == 'celery':
+        from core.tasks import run_scrape_job
+
+        transaction.on_commit(lambda: run_scrape_job.delay(job.pk))
+    else:
+        transaction.on_commit(lambda: get_job_executor().submit(_run_in_thread, job.pk))
+
+
+def cancel_job(job):
+    """Cancel job, returns it refreshed
+
+    A queued job is cancelled at once and a running one stops at its next
+    progress update. A running job whose worker went quiet for JOB_STALE_AFTER,
+    such as after a restart, is marked cancelled directly.
+    """
+    now = timezone.now()
+    ScrapeJob.objects.filter(pk=job.pk, status=ScrapeJob.QUEUED).update(
+        status=ScrapeJob.CANCELLED, cancel_requested=True, finished_at=now
+    )
+    ScrapeJob.objects.filter(pk=job.pk, status=ScrapeJob.RUNNING, heartbeat_at__lt=now - JOB_STALE_AFTER).update(
+        status=ScrapeJob.CANCELLED, cancel_requested=True, finished_at=now, current_scraper=''
+    )
+    ScrapeJob.objects.filter(pk=job.pk, status=ScrapeJob.RUNNING).update(cancel_requested=True)
+    job.refresh_from_db()
+    return job
@@ -0,0 +1,149 @@
+# core/scraping/pipeline.py
+import queue
+import threading
+import time
+from itertools import islice
+from django.conf import settings
+from django.db import close_old_connections
+
+# Records parsed ahead of the persist stage, the parse side blocks when it is full
+PIPELINE_BUFFER = getattr(settings, 'SCRAPER_PIPELINE_BUFFER', 200)
+# Records written per save_to_database call
+PERSIST_BATCH_SIZE = getattr(settings, 'SCRAPER_PERSIST_BATCH_SIZE', 100)
+# Listing pages per record source, see BaseScraper.record_sources
+PAGE_BATCH_SIZE = getattr(settings, 'SCRAPER_PAGE_BATCH_SIZE', 2)
+# Seconds between calls of a pipeline's progress callback
+PROGRESS_INTERVAL = 2.0
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def batched(iterable, size):
+    """Lists of up to size items, the last one shorter"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def buffered(iterable, maxsize=PIPELINE_BUFFER, on_wait=None, wait_interval=1.0):
+    """Iterate iterable on a worker thread, handing items over through a bounded queue
+
+    The worker runs ahead of the consumer by at most maxsize items. An
+    exception in the worker is raised in the consumer, and a consumer that
+    stops early stops the worker at its next item. on_wait is called every
+    wait_interval seconds the consumer spends waiting for an item.
+    """
+    items = queue.Queue(maxsize)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+        finally:
+            close_old_connections()
+
+    worker = threading.Thread(target=produce, name='scrape-pipeline', daemon=True)
+    worker.start()
+    try:
+        while True:
+            try:
+                item = items.get(timeout=wait_interval)
+            except queue.Empty:
+                if on_wait is not None:
+                    on_wait()
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        worker.join()
+
+
+class ScrapePipeline:
+    """fetch -> parse -> normalize -> persist for one scraper run
+
+    Sources are callables returning iterables of parsed records, multi-page
+    sources are generators that fetch and parse a page at a time. Fetching
+    and parsing run on a worker thread ahead of the caller by at most
+    buffer_size records; the caller normalizes records with scraper.normalize
+    and persists them batch_size at a time, so memory holds a buffer and a
+    batch however many pages a source has, and rows reach the database while
+    later pages are still being fetched.
+
+    progress, when set, is called with the pipeline after every batch and
+    every PROGRESS_INTERVAL seconds in between, on the calling thread; an
+    exception it raises stops the run.
+    """
+
+    def __init__(self, scraper, persist=None, batch_size=PERSIST_BATCH_SIZE, buffer_size=PIPELINE_BUFFER,
+                 progress=None):
+        self.scraper = scraper
+        self.persist = persist or scraper.save_to_database
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.progress = progress
+        self.parsed = {}  # source name -> records parsed
+        self.dropped = 0
+        self.saved = 0
+        self.last_progress = time.monotonic()
+
+    def checkpoint(self, force=False):
+        """Call progress, at most every PROGRESS_INTERVAL seconds unless forced"""
+        if self.progress is None:
+            return
+        now = time.monotonic()
+        if force or now - self.last_progress >= PROGRESS_INTERVAL:
+            self.last_progress = now
+            self.progress(self)
+
+    def records(self, sources):
+        for source in sources:
+            name = getattr(source, 'func', source).__name__
+            count = 0
+            for record in source():
+                count += 1
+                yield record
+            self.parsed[name] = self.parsed.get(name, 0) + count
+            self.scraper.log_progress(f"Parsed {count} records from {name}")
+
+    def normalized(self, records):
+        for record in records:
+            self.checkpoint()
+            record = self.scraper.normalize(record)
+            if record is None:
+                self.dropped += 1
+            else:
+                yield record
+
+    def run(self, *sources):
+        """Run every source through to the database, returns the number of rows saved"""
+        stream = self.normalized(buffered(self.records(sources), self.buffer_size, on_wait=self.checkpoint))
+        for batch in batched(stream, self.batch_size):
+            self.saved += self.persist(batch) or 0
+            self.checkpoint(force=True)
+        return self.saved
@@ -2,16 +2,31 @@
 import json
 import re
 import time
+from functools import partial
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
-from django.core.files.base import ContentFile
-from geopy.geocoders import Nominatim
 
 from .base import BaseScraper
+from .ingest import IngestSpec, bulk_ingest
+from .images import ImagePipeline
+from .pipeline import ScrapePipeline
 from core.models import Property, PropertyType, City, PropertyImage
 
+PROPERTY_SPEC = IngestSpec(
+    Property,
+    slug_fields=('title',),
+    fields=[
+        'title', 'address', 'description', 'property_type', 'price',
+        'bedrooms', 'bathrooms', 'size', 'for_sale', 'city'
+    ],
+    lookups={'property_type': PropertyType},
+    # Coordinates are geocoded once when the listing is first stored
+    create_only={'latitude': None, 'longitude': None},
+)
+
 class PropertyScraper(BaseScraper):
     """Scraper for real estate property data"""
+    ingest_spec = PROPERTY_SPEC
     
     def __init__(self, city_name="Macomb"):
         super().__init__(city_name)
@@ -20,17 +35,18 @@ class PropertyScraper(BaseScraper):
             "https://www.realtor.com/realestateandhomes-search/Macomb_MI",
             # Add more sources
         ]
-        self.geolocator = Nominatim(user_agent="macomb_city_guide")
         
     def scrape_zillow(self, url, for_sale=True):
         """Scrape property data from Zillow"""
         properties = []
         
         search_url = f"{url}{'for_sale/' if for_sale else 'for_rent/'}"
-        soup = self.fetch_page(search_url, javascript_required=True)
+        # The result grid is rendered client side, wait for it rather than a fixed delay
+        soup = self.fetch_page(search_url, javascript_required=True, wait_for='#grid-search-results')
         if not soup:
             return properties
         
+        parse_start = time.perf_counter()
         try:
             # Modern Zillow loads data via JS into script tags
             scripts = soup.select('script[type="application/json"]')
@@ -91,16 +107,19 @@ class PropertyScraper(BaseScraper):
                             'detail_url': detail_url
                         }
                         
-                        # If we have a detail URL, get more info
-                        if detail_url:
-                            detail_data = self.scrape_property_detail(detail_url)
-                            if detail_data:
-                                property_data.update(detail_data)
-                        
                         properties.append(property_data)
                         self.log_progress(f"Scraped property", property_data['title'])
                     except Exception as e:
                         self.log_progress(f"Error processing property: {str(e)}")
+            
+            self.metrics.record_parse(search_url, time.perf_counter() - parse_start, len(properties))
+            
+            # Get more info from the detail pages, fetched as one concurrent batch
+            details_by_url = {prop['detail_url']: prop for prop in properties if prop.get('detail_url')}
+            for detail_url, detail_soup in self.fetch_pages(details_by_url):
+                detail_data = self.parse_page(detail_url, self.parse_property_detail, detail_soup)
+                if detail_data:
+                    details_by_url[detail_url].update(detail_data)
         
             # Return the collected properties
             return properties
@@ -111,7 +130,10 @@ class PropertyScraper(BaseScraper):
     
     def scrape_property_detail(self, url):
         """Scrape detailed property info from its page"""
-        soup = self.fetch_page(url)
+        return self.parse_property_detail(self.fetch_page(url))
+    
+    def parse_property_detail(self, soup):
+        """Parse detailed property info from a fetched detail page"""
         if not soup:
             return None
         
@@ -137,116 +159,75 @@ class PropertyScraper(BaseScraper):
             self.log_progress(f"Error scraping property detail: {str(e)}")
             return None
     
-    def get_coordinates(self, address):
-        """Get latitude and longitude from address"""
-        if not address:
-            return None, None
-            
-        try:
-            location = self.geolocator.geocode(address)
-            if location:
-                return location.latitude, location.longitude
-        except Exception as e:
-            self.log_progress(f"Error getting coordinates for {address}: {str(e)}")
-        
-        return None, None
-    
     def save_to_database(self, property_data, for_sale=True):
         """Save scraped property data to database"""
         # Use the base class method instead of direct get_or_create
         city = self.get_city(self.city_name)
         
-        # Rest remains the same
+        # Geocoding is slow and rate limited, so only look up properties not stored yet
+        coordinates = self.geocode_new(PROPERTY_SPEC, property_data)
+        
+        rows = []
         for data in property_data:
-            try:
-                # Get or create property type
-                property_type, _ = PropertyType.objects.get_or_create(name=data['property_type'])
-                
-                # Get coordinates
-                latitude, longitude = self.get_coordinates(data['address'])
-                
-                # Check if property already exists
-                prop, created = Property.objects.get_or_create(
-                    title=data['title'], 
-                    address=data['address'],
-                    defaults={
-                        'description': data['description'],
-                        'property_type': property_type,
-                        'price': data['price'],
-                        'bedrooms': data['bedrooms'],
-                        'bathrooms': data['bathrooms'],
-                        'size': data['size'],
-                        'for_sale': for_sale,
-                        'latitude': latitude,
-                        'longitude': longitude,
-                        'city': city
-                    }
-                )
-                
-                # Update existing property if it already exists
-                if not created:
-                    prop.description = data['description']
-                    prop.property_type = property_type
-                    prop.price = data['price']
-                    prop.bedrooms = data['bedrooms']
-                    prop.bathrooms = data['bathrooms']
-                    prop.size = data['size']
-                    prop.for_sale = for_sale
-                    prop.latitude = latitude
-                    prop.longitude = longitude
-                    prop.city = city
-                    prop.save()
-                
-                # Save property images
-                if data.get('image_url'):
-                    image_content = self.fetch_image(data['image_url'])
-                    if image_content:
-                        prop.image.save(f"{prop.id}.jpg", ContentFile(image_content), save=True)
-                
-                if data.get('additional_images'):
-                    for idx, img_url in enumerate(data['additional_images']):
-                        image_content = self.fetch_image(img_url)
-                        if image_content:
-                            prop.additional_images.create(image=ContentFile(image_content, name=f"{prop.id}_{idx}.jpg"))
-                
-                self.log_progress(f"Saved property to database", prop.title)
-            except Exception as e:
-                self.log_progress(f"Error saving property to database: {str(e)}")
-    
-    def fetch_image(self, url):
-        """Download image from URL"""
-        if not url:
-            return None
-            
+            row = {
+                'title': data['title'],
+                'address': data['address'],
+                'description': data['description'],
+                'property_type': data['property_type'],
+                'price': data['price'],
+                'bedrooms': data['bedrooms'],
+                'bathrooms': data['bathrooms'],
+                'size': data['size'],
+                'for_sale': for_sale,
+            }
+            row['latitude'], row['longitude'] = coordinates.get(PROPERTY_SPEC.slug_for(data), (None, None))
+            rows.append(row)
+        
         try:
-            response = self.session.get(url, stream=True, timeout=30)
-            if response.status_code == 200:
-                return response.content
+            with self.metrics.db_write(len(rows)):
+                result = bulk_ingest(PROPERTY_SPEC, rows, extra={'city': city})
         except Exception as e:
-            self.log_progress(f"Error downloading image: {str(e)}")
+            self.log_progress(f"Error saving properties to database: {str(e)}")
+            return 0
         
-        return None
-
+        # Queue property images for new listings or ones still missing a photo
+        images = ImagePipeline(self)
+        for data in property_data:
+            prop = result.objects.get(PROPERTY_SPEC.slug_for(data))
+            if not prop or not (result.was_created(prop) or not prop.image):
+                continue
+            
+            images.add(prop, data.get('image_url'))
+            
+            # Gallery rows are created in bulk once their images are stored
+            if result.was_created(prop):
+                for img_url in data.get('additional_images') or []:
+                    images.add(PropertyImage(property=prop), img_url)
+        images.run()
+        
+        self.log_progress(f"Saved properties: {result}")
+        return result.total
+    
+    def record_sources(self, for_sale=True):
+        """Zillow search results, add more sources here as needed"""
+        return {
+            'zillow': partial(self.scrape_zillow, self.sources[0], for_sale=for_sale),
+        }
+    
+    def pipeline(self, for_sale=True):
+        return ScrapePipeline(self, persist=partial(self.save_to_database, for_sale=for_sale))
+    
     def run(self, for_sale=True):
         """Run the property scraper"""
         property_type = "for sale" if for_sale else "for rent"
         self.log_progress(f"Starting property scraper for properties {property_type}")
         
-        all_property_data = []
-        
-        # Scrape from Zillow
-        zillow_data = self.scrape_zillow(self.sources[0], for_sale=for_sale)
-        all_property_data.extend(zillow_data)
-        self.log_progress(f"Scraped {len(zillow_data)} properties from Zillow")
-        
-        # Add more sources as needed:
-        # realtor_data = self.scrape_realtor(self.sources[1], for_sale=for_sale)
-        # all_property_data.extend(realtor_data)
-        # self.log_progress(f"Scraped {len(realtor_data)} properties from Realtor.com")
-        
-        # Save to database
-        self.save_to_database(all_property_data, for_sale)
+        # Listings are saved in batches as the pipeline reads them
+        pipeline = self.pipeline(for_sale=for_sale)
+        saved_count = pipeline.run(*self.record_sources(for_sale=for_sale).values())
         
-        self.log_progress(f"Completed property scraper, processed {len(all_property_data)} properties {property_type}")
+        self.log_progress(
+            f"Completed property scraper, processed {sum(pipeline.parsed.values())} properties {property_type}"
+        )
         
-        return len(all_property_data)
\ No newline at end of file
+        return saved_count
@@ -1,14 +1,29 @@
-from django.core.files.base import ContentFile
 from .base import BaseScraper
 from core.models import Restaurant, Cuisine, City, Category
-import requests
+from .ingest import IngestSpec, bulk_ingest
+from .images import ImagePipeline
+from .pipeline import PAGE_BATCH_SIZE, batched
 import re
 from urllib.parse import urlparse
 import json
+from functools import partial
 from decimal import Decimal
 
+RESTAURANT_SPEC = IngestSpec(
+    Restaurant,
+    slug_fields=('name',),
+    fields=[
+        'name', 'address', 'description', 'cuisine', 'opening_hours',
+        'website', 'price_level', 'featured', 'city'
+    ],
+    lookups={'cuisine': Cuisine},
+    # Coordinates are geocoded once when the restaurant is first stored
+    create_only={'latitude': None, 'longitude': None},
+)
+
 class RestaurantScraper(BaseScraper):
     """Scraper for restaurant data"""
+    ingest_spec = RESTAURANT_SPEC
     
     def __init__(self, city_name="Macomb"):
         super().__init__(city_name)
@@ -18,147 +33,153 @@ class RestaurantScraper(BaseScraper):
             "https://www.opentable.com/r/macomb-michigan", 
         ]
         
-    def scrape_yelp(self, url, max_pages=5):
-        """Scrape restaurant data from Yelp"""
-        restaurants = []
-        current_page = 1
+    def yelp_page_urls(self, url, max_pages=5):
+        """URLs of the first max_pages Yelp result pages"""
+        return [url] + [f"{url}&start={(page - 1) * 10}" for page in range(2, max_pages + 1)]
+    
+    def scrape_yelp(self, page_urls):
+        """Yield restaurants from Yelp result pages, a page at a time as each one is parsed"""
+        index = 0
         
-        while current_page <= max_pages:
-            page_url = url
-            if current_page > 1:
-                page_url = f"{url}&start={(current_page - 1) * 10}"
-            
-            soup = self.fetch_page(page_url)
+        # Result pages are fetched concurrently and parsed as each one arrives
+        for page_url, soup in self.fetch_pages(page_urls):
             if not soup:
-                break
-                
+                continue
+            
+            try:
+                restaurants = self.parse_page(page_url, self.parse_yelp_page, soup)
+            except Exception as e:
+                self.log_progress(f"Error scraping Yelp page {page_url}: {str(e)}")
+                continue
+            
+            # Not fetching details for every restaurant to avoid too many requests,
+            # only every 5th one, and those of a page are fetched as a single batch
+            detail_targets = {}
+            for restaurant_data in restaurants:
+                detail_url = restaurant_data.pop('detail_url', None)
+                if detail_url and index and index % 5 == 0:
+                    detail_targets[detail_url] = restaurant_data
+                index += 1
+            
+            for detail_url, detail_soup in self.fetch_pages(detail_targets):
+                details = self.parse_page(detail_url, self.parse_restaurant_detail, detail_soup)
+                if details:
+                    detail_targets[detail_url].update(details)
+            
+            yield from restaurants
+    
+    def parse_yelp_page(self, soup):
+        """Parse the restaurant listings on a single Yelp results page"""
+        restaurants = []
+        
+        # Find restaurant listings
+        restaurant_elements = soup.select('li.border-color--default__09f24__NPAKY')
+        
+        if not restaurant_elements:
+            # Try alternative selectors as Yelp changes their HTML structure frequently
+            restaurant_elements = soup.select('div[data-testid="serp-ia-card"]')
+        
+        if not restaurant_elements:
+            # One more attempt with different selectors
+            restaurant_elements = soup.select('.businessName__09f24__EYSZE')
+            if restaurant_elements:
+                # If we found business names, get their parent containers
+                restaurant_elements = [elem.parent.parent.parent for elem in restaurant_elements]
+        
+        if not restaurant_elements:
+            self.log_progress("No restaurant elements found on page")
+            return restaurants
+        
+        for restaurant_elem in restaurant_elements:
             try:
-                # Find restaurant listings
-                restaurant_elements = soup.select('li.border-color--default__09f24__NPAKY')
+                # Extract restaurant name
+                name_elem = restaurant_elem.select_one('a.businessName__09f24__EYSZE span, .css-1m051bw, h3 a span')
+                if not name_elem:
+                    continue
+                    
+                name = self.clean_text(name_elem.text)
                 
-                if not restaurant_elements:
-                    # Try alternative selectors as Yelp changes their HTML structure frequently
-                    restaurant_elements = soup.select('div[data-testid="serp-ia-card"]')
+                # Extract restaurant URL for details
+                link_elem = restaurant_elem.select_one('a.businessName__09f24__EYSZE, h3 a')
+                restaurant_url = None
+                if link_elem and 'href' in link_elem.attrs:
+                    href = link_elem['href']
+                    if href.startswith('/'):
+                        restaurant_url = f"https://www.yelp.com{href}"
+                    else:
+                        restaurant_url = href
                 
-                if not restaurant_elements:
-                    # One more attempt with different selectors
-                    restaurant_elements = soup.select('.businessName__09f24__EYSZE')
-                    if restaurant_elements:
-                        # If we found business names, get their parent containers
-                        restaurant_elements = [elem.parent.parent.parent for elem in restaurant_elements]
+                # If we have the URL, we can get more detailed information
+                restaurant_data = {
+                    'name': name,
+                    'image_url': '',
+                    'description': '',
+                    'address': '',
+                    'cuisine': 'American',  # Default
+                    'opening_hours': '',
+                    'website': '',
+                }
                 
-                if not restaurant_elements:
-                    self.log_progress(f"No restaurant elements found on page {current_page}")
-                    break
-                    
-                for restaurant_elem in restaurant_elements:
-                    try:
-                        # Extract restaurant name
-                        name_elem = restaurant_elem.select_one('a.businessName__09f24__EYSZE span, .css-1m051bw, h3 a span')
-                        if not name_elem:
-                            continue
-                            
-                        name = self.clean_text(name_elem.text)
-                        
-                        # Extract restaurant URL for details
-                        link_elem = restaurant_elem.select_one('a.businessName__09f24__EYSZE, h3 a')
-                        restaurant_url = None
-                        if link_elem and 'href' in link_elem.attrs:
-                            href = link_elem['href']
-                            if href.startswith('/'):
-                                restaurant_url = f"https://www.yelp.com{href}"
-                            else:
-                                restaurant_url = href
-                        
-                        # If we have the URL, we can get more detailed information
-                        restaurant_data = {
-                            'name': name,
-                            'image_url': '',
-                            'description': '',
-                            'address': '',
-                            'cuisine': 'American',  # Default
-                            'opening_hours': '',
-                            'website': '',
-                        }
-                        
-                        # Try to extract basic info from the listing
-                        
-                        # Cuisine/categories
-                        category_elem = restaurant_elem.select_one('.css-16lklrv, .css-dzq7l1, .category-str-list')
-                        if category_elem:
-                            cuisine = self.clean_text(category_elem.text).split(',')[0]
-                            if cuisine:
-                                restaurant_data['cuisine'] = cuisine
-                        
-                        # Address
-                        address_elem = restaurant_elem.select_one('.css-1e4fdj9, .address-row')
-                        if address_elem:
-                            address = self.clean_text(address_elem.text)
-                            # Make sure address includes Macomb or is in nearby area
-                            if 'macomb' in address.lower() or any(area in address.lower() for area in ['clinton township', 'shelby township', 'sterling heights', 'utica', 'chesterfield']):
-                                restaurant_data['address'] = address
-                            else:
-                                restaurant_data['address'] = f"{address}, Macomb, MI"
-                        
-                        # Rating
-                        rating_elem = restaurant_elem.select_one('.css-1fdy0l5, .i-stars')
-                        rating = 0
-                        if rating_elem:
-                            # Try to extract rating from aria-label attribute
-                            if 'aria-label' in rating_elem.attrs:
-                                rating_text = rating_elem['aria-label']
-                                rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
-                                if rating_match:
-                                    rating = float(rating_match.group(1))
-                        
-                        restaurant_data['rating'] = rating
-                        
-                        # Image
-                        img_elem = restaurant_elem.select_one('img.css-xlzvdl, .photo-box img')
-                        if img_elem and 'src' in img_elem.attrs:
-                            restaurant_data['image_url'] = img_elem['src']
-                        
-                        # If we have the URL, fetch detailed information
-                        if restaurant_url:
-                            # Not fetching details for every restaurant to avoid too many requests
-                            # You could fetch details for a subset or implement a delay
-                            if restaurants and len(restaurants) % 5 == 0:  # Every 5th restaurant
-                                details = self.scrape_restaurant_detail(restaurant_url)
-                                if details:
-                                    restaurant_data.update(details)
-                        
-                        # Price level in $ symbols
-                        price_elem = restaurant_elem.select_one('.css-1s7bx9e, .price-range')
-                        if price_elem:
-                            price_text = self.clean_text(price_elem.text)
-                            restaurant_data['price'] = price_text
-                        
-                        restaurants.append(restaurant_data)
-                        self.log_progress(f"Scraped restaurant: {name}")
-                        
-                    except Exception as e:
-                        self.log_progress(f"Error processing restaurant listing: {str(e)}")
+                # Try to extract basic info from the listing
                 
-                # Check if there's a next page
-                next_button = soup.select_one('a.next-link, .next_page, [aria-label="Next page"]')
-                if not next_button:
-                    break
-                    
-                current_page += 1
+                # Cuisine/categories
+                category_elem = restaurant_elem.select_one('.css-16lklrv, .css-dzq7l1, .category-str-list')
+                if category_elem:
+                    cuisine = self.clean_text(category_elem.text).split(',')[0]
+                    if cuisine:
+                        restaurant_data['cuisine'] = cuisine
+                
+                # Address
+                address_elem = restaurant_elem.select_one('.css-1e4fdj9, .address-row')
+                if address_elem:
+                    address = self.clean_text(address_elem.text)
+                    # Make sure address includes Macomb or is in nearby area
+                    if 'macomb' in address.lower() or any(area in address.lower() for area in ['clinton township', 'shelby township', 'sterling heights', 'utica', 'chesterfield']):
+                        restaurant_data['address'] = address
+                    else:
+                        restaurant_data['address'] = f"{address}, Macomb, MI"
+                
+                # Rating
+                rating_elem = restaurant_elem.select_one('.css-1fdy0l5, .i-stars')
+                rating = 0
+                if rating_elem:
+                    # Try to extract rating from aria-label attribute
+                    if 'aria-label' in rating_elem.attrs:
+                        rating_text = rating_elem['aria-label']
+                        rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
+                        if rating_match:
+                            rating = float(rating_match.group(1))
+                
+                restaurant_data['rating'] = rating
                 
-                # Respect rate limits
-                self.log_progress(f"Moving to page {current_page}")
-                time.sleep(random.uniform(3, 6))
+                # Image
+                img_elem = restaurant_elem.select_one('img.css-xlzvdl, .photo-box img')
+                if img_elem and 'src' in img_elem.attrs:
+                    restaurant_data['image_url'] = img_elem['src']
+                
+                # Remember the detail page, details are fetched later as a batch
+                restaurant_data['detail_url'] = restaurant_url
+                
+                # Price level in $ symbols
+                price_elem = restaurant_elem.select_one('.css-1s7bx9e, .price-range')
+                if price_elem:
+                    price_text = self.clean_text(price_elem.text)
+                    restaurant_data['price'] = price_text
+                
+                restaurants.append(restaurant_data)
+                self.log_progress(f"Scraped restaurant: {name}")
                 
             except Exception as e:
-                self.log_progress(f"Error scraping Yelp page {current_page}: {str(e)}")
-                break
+                self.log_progress(f"Error processing restaurant listing: {str(e)}")
         
         return restaurants
 
     def scrape_restaurant_detail(self, url):
         """Scrape detailed restaurant info from its page"""
-        soup = self.fetch_page(url)
+        return self.parse_restaurant_detail(self.fetch_page(url))
+    
+    def parse_restaurant_detail(self, soup):
+        """Parse detailed restaurant info from a fetched detail page"""
         if not soup:
             return None
             
@@ -229,76 +250,63 @@ class RestaurantScraper(BaseScraper):
         # Use the base class method instead of direct get_or_create
         city = self.get_city(self.city_name)
         
-        # Rest remains the same
+        # Geocoding is slow and rate limited, so only look up restaurants not stored yet
+        coordinates = self.geocode_new(RESTAURANT_SPEC, restaurant_data)
+        
+        rows = []
         for data in restaurant_data:
-            try:
-                # Get or create cuisine
-                cuisine, _ = Cuisine.objects.get_or_create(name=data['cuisine'])
-                
-                # Clean the price field - convert to price level
-                price = data.get('price', '$$')
-                price_level = len(price) if isinstance(price, str) else 2
-                
-                # Check if restaurant already exists
-                restaurant, created = Restaurant.objects.get_or_create(
-                    name=data['name'], 
-                    address=data['address'],
-                    defaults={
-                        'description': data['description'],
-                        'cuisine': cuisine,
-                        'opening_hours': data.get('opening_hours', 'Call for hours'),
-                        'website': data.get('website', ''),
-                        'featured': data.get('featured', False),
-                        'city': city
-                    }
-                )
-                
-                # Update existing restaurant if needed
-                if not created:
-                    restaurant.description = data['description']
-                    restaurant.cuisine = cuisine
-                    restaurant.opening_hours = data.get('opening_hours', 'Call for hours')
-                    restaurant.website = data.get('website', '')
-                    restaurant.featured = data.get('featured', False)
-                    restaurant.save()
-                
-                # Download and save image if it's a new restaurant or doesn't have an image
-                if (created or not restaurant.image) and data.get('image_url'):
-                    self.download_and_save_image(restaurant, data['image_url'])
-                
-                self.log_progress(f"{'Created' if created else 'Updated'} restaurant", restaurant.name)
-            except Exception as e:
-                self.log_progress(f"Error saving restaurant {data.get('name', 'unknown')}: {str(e)}")
-    
-    def download_and_save_image(self, restaurant, image_url):
-        """Download and save restaurant image"""
+            # Clean the price field - convert to price level
+            price = data.get('price', '$$')
+            price_level = len(price) if isinstance(price, str) else 2
+            
+            latitude, longitude = coordinates.get(RESTAURANT_SPEC.slug_for(data), (None, None))
+            rows.append({
+                'name': data['name'],
+                'address': data['address'],
+                'description': data['description'],
+                'cuisine': data['cuisine'],
+                'opening_hours': data.get('opening_hours', 'Call for hours'),
+                'website': data.get('website', ''),
+                'price_level': price_level,
+                'featured': data.get('featured', False),
+                'latitude': latitude,
+                'longitude': longitude,
+            })
+        
         try:
-            image_content = self.download_image(image_url)
-            if not image_content:
-                return False
-                
-            file_name = f"restaurant_{restaurant.id}_{urlparse(image_url).path.split('/')[-1]}"
-            restaurant.image.save(file_name, ContentFile(image_content), save=True)
-            return True
+            with self.metrics.db_write(len(rows)):
+                result = bulk_ingest(RESTAURANT_SPEC, rows, extra={'city': city})
         except Exception as e:
-            self.log_progress(f"Error saving image for {restaurant.name}: {str(e)}")
-            return False
-            
+            self.log_progress(f"Error saving restaurants: {str(e)}")
+            return 0
+        
+        # Queue images for new restaurants or ones that don't have an image
+        images = ImagePipeline(self)
+        for data in restaurant_data:
+            restaurant = result.objects.get(RESTAURANT_SPEC.slug_for(data))
+            if restaurant and data.get('image_url') and (result.was_created(restaurant) or not restaurant.image):
+                images.add(restaurant, data['image_url'])
+        images.run()
+        
+        self.log_progress(f"Saved restaurants: {result}")
+        return result.total
+    
+    def record_sources(self):
+        """Yelp result pages in batches, add more sources here if needed"""
+        page_urls = self.yelp_page_urls(self.sources[0])
+        return {
+            f'yelp_{number}': partial(self.scrape_yelp, batch)
+            for number, batch in enumerate(batched(page_urls, PAGE_BATCH_SIZE), 1)
+        }
+    
     def run(self):
         """Run the restaurant scraper"""
         self.log_progress("Starting restaurant scraper")
         
-        all_restaurant_data = []
-        
-        # Scrape from Yelp
-        yelp_data = self.scrape_yelp(self.sources[0])
-        all_restaurant_data.extend(yelp_data)
-        
-        # Add more sources if needed
-        # tripadvisor_data = self.scrape_tripadvisor(self.sources[1])
-        # all_restaurant_data.extend(tripadvisor_data)
+        # Restaurants are saved in batches while later pages are still being scraped
+        pipeline = self.pipeline()
+        saved_count = pipeline.run(*self.record_sources().values())
         
-        # Save to database
-        self.save_to_database(all_restaurant_data)
+        self.log_progress(f"Completed restaurant scraper, scraped {sum(pipeline.parsed.values())} restaurants")
         
-        self.log_progress(f"Completed restaurant scraper, scraped {len(all_restaurant_data)} restaurants")
\ No newline at end of file
+        return saved_count
@@ -0,0 +1,47 @@
+# core/scraping/targets.py
+from .attractions_scraper import AttractionScraper
+from .event_scraper import EventScraper
+from .property_scraper import PropertyScraper
+from .restaurant_scraper import RestaurantScraper
+from .transport_scraper import TransportScraper
+
+
+class ScrapeTarget:
+    """A scraper run by name, with the Celery queue its sources are routed to"""
+
+    def __init__(self, scraper_class, queue, **kwargs):
+        self.scraper_class = scraper_class
+        self.queue = queue
+        self.kwargs = kwargs  # Passed to run(), record_sources() and pipeline()
+
+    def make_scraper(self, offline=False, use_cache=True):
+        scraper = self.scraper_class()
+        scraper.offline = offline
+        scraper.use_cache = scraper.use_cache and use_cache
+        return scraper
+
+
+# Named like the ScrapeRun rows of run_scrapers. Queues follow the hosts
+# scraped and each is consumed by a single worker process, so the process wide
+# host_limiter spaces every request to that host
+SCRAPE_TARGETS = {
+    'attractions': ScrapeTarget(AttractionScraper, 'scrape_tripadvisor'),
+    'restaurants': ScrapeTarget(RestaurantScraper, 'scrape_yelp'),
+    'events': ScrapeTarget(EventScraper, 'scrape_events'),
+    'properties_for_sale': ScrapeTarget(PropertyScraper, 'scrape_zillow', for_sale=True),
+    'properties_for_rent': ScrapeTarget(PropertyScraper, 'scrape_zillow', for_sale=False),
+    'transportation': ScrapeTarget(TransportScraper, 'scrape_transit'),
+}
+
+# Scraper types of the scrape API and run_scrapers --type, by the targets they run
+SCRAPER_TYPES = {
+    'attractions': ['attractions'],
+    'restaurants': ['restaurants'],
+    'events': ['events'],
+    'properties': ['properties_for_sale', 'properties_for_rent'],
+    'transportation': ['transportation'],
+    'all': list(SCRAPE_TARGETS),
+}
+
+# Dispatch and the chord body that closes a fanned out run
+FINISH_QUEUE = 'scrape_finish'
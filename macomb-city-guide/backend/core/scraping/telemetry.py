@@ -0,0 +1,222 @@
+# core/scraping/telemetry.py
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from core.models import ScrapeRun
+
+# Upper bounds in seconds of the fetch latency histogram buckets, +Inf is implied
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# A run this much slower than the previous run of the same scraper is reported
+REGRESSION_RATIO = getattr(settings, 'SCRAPER_REGRESSION_RATIO', 1.25)
+
+HOST_COUNTERS = (
+    'fetches', 'errors', 'retries', 'bytes', 'latency_sum', 'rate_limit_wait',
+    'cache_hits', 'revalidated', 'stale', 'parse_seconds', 'pages_parsed', 'items', 'empty_pages',
+)
+
+
+def host_for(url):
+    return urlparse(url).netloc.lower() or 'local'
+
+
+class ScrapeMetrics:
+    """Per-host fetch, parse and write measurements for one scraper run
+
+    Fetches run on FetchEngine threads, so every update takes the lock.
+    snapshot() returns plain JSON, stored on ScrapeRun.metrics and rendered
+    by prometheus_text().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.hosts = defaultdict(lambda: dict.fromkeys(HOST_COUNTERS, 0))
+        self.latency_buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self.db_write_seconds = 0.0
+        self.rows_written = 0
+
+    def add(self, url, **counts):
+        with self.lock:
+            host = self.hosts[host_for(url)]
+            for name, value in counts.items():
+                host[name] += value
+
+    def observe_fetch(self, url, seconds, size=0, error=False):
+        """One request attempt, failed attempts count towards latency too"""
+        with self.lock:
+            host = host_for(url)
+            self.latency_buckets[host][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            counters = self.hosts[host]
+            counters['fetches'] += 1
+            counters['latency_sum'] += seconds
+            counters['bytes'] += size
+            counters['errors'] += int(error)
+
+    def record_parse(self, url, seconds, items=None):
+        """Time spent turning a page into records, items=None for markup parsing only"""
+        if items is None:
+            self.add(url, parse_seconds=seconds)
+        else:
+            self.add(url, parse_seconds=seconds, pages_parsed=1, items=items, empty_pages=int(not items))
+
+    @contextmanager
+    def db_write(self, rows):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.db_write_seconds += time.perf_counter() - start
+                self.rows_written += rows
+
+    def totals(self):
+        with self.lock:
+            return {
+                name: sum(host[name] for host in self.hosts.values())
+                for name in ('fetches', 'errors', 'retries', 'bytes', 'items')
+            }
+
+    def merge(self, snapshot):
+        """Add the counters of a snapshot() taken elsewhere, such as in a Celery task"""
+        with self.lock:
+            for host, counters in snapshot.get('hosts', {}).items():
+                for name in HOST_COUNTERS:
+                    self.hosts[host][name] += counters.get(name, 0)
+                for index, count in enumerate(counters.get('latency_buckets', [])):
+                    self.latency_buckets[host][index] += count
+            self.db_write_seconds += snapshot.get('db_write_seconds', 0.0)
+            self.rows_written += snapshot.get('rows_written', 0)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'buckets': list(LATENCY_BUCKETS),
+                'hosts': {
+                    host: dict(counters, latency_buckets=list(self.latency_buckets[host]))
+                    for host, counters in self.hosts.items()
+                },
+                'db_write_seconds': self.db_write_seconds,
+                'rows_written': self.rows_written,
+            }
+
+
+def complete_run(run, metrics, duration, error=''):
+    """Fill run from metrics and save it, marked failed when error is set"""
+    totals = metrics.totals()
+    run.status = ScrapeRun.FAILED if error else ScrapeRun.SUCCEEDED
+    run.error = error
+    run.finished_at = timezone.now()
+    run.duration = duration
+    run.pages_fetched = totals['fetches']
+    run.bytes_downloaded = totals['bytes']
+    run.retries = totals['retries']
+    run.errors = totals['errors']
+    run.items_parsed = totals['items']
+    run.metrics = metrics.snapshot()
+    run.save()
+
+
+@contextmanager
+def record_run(scraper, name, job=None):
+    """Persist a ScrapeRun for the block, with scraper.metrics reset for it
+
+    The block sets run.items_saved; a failing block marks the run failed and
+    the exception propagates. job is the ScrapeJob the run belongs to, if any.
+    """
+    scraper.metrics = ScrapeMetrics()
+    run = ScrapeRun.objects.create(scraper=name, status=ScrapeRun.RUNNING, job=job)
+    error = ''
+    try:
+        yield run
+    except BaseException as e:
+        error = str(e) or e.__class__.__name__
+        raise
+    finally:
+        complete_run(run, scraper.metrics, time.perf_counter() - scraper.metrics.started, error)
+
+
+def latest_runs():
+    """The most recent finished ScrapeRun of every scraper"""
+    latest = ScrapeRun.objects.filter(
+        scraper=OuterRef('scraper'), finished_at__isnull=False
+    ).order_by('-started_at').values('pk')[:1]
+    return list(ScrapeRun.objects.filter(pk=Subquery(latest)).order_by('scraper'))
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def prometheus_text(runs):
+    """Prometheus text exposition of the given ScrapeRuns, one per scraper label"""
+    host_gauges = [
+        ('scraper_fetch_bytes', 'bytes', 'Bytes downloaded in the last run'),
+        ('scraper_fetch_errors', 'errors', 'Failed request attempts in the last run'),
+        ('scraper_fetch_retries', 'retries', 'Retried requests in the last run'),
+        ('scraper_rate_limit_wait_seconds', 'rate_limit_wait', 'Seconds spent waiting on the host rate limiter'),
+        ('scraper_cache_hits', 'cache_hits', 'Pages served from the HTTP cache without a request'),
+        ('scraper_cache_revalidated', 'revalidated', 'Cached pages revalidated with a 304'),
+        ('scraper_parse_seconds', 'parse_seconds', 'Seconds spent parsing pages'),
+        ('scraper_pages_parsed', 'pages_parsed', 'Pages turned into records'),
+        ('scraper_items_parsed', 'items', 'Records yielded by parsed pages'),
+        ('scraper_empty_pages', 'empty_pages', 'Parsed pages that yielded no records'),
+    ]
+    run_gauges = [
+        ('scraper_run_duration_seconds', lambda run: run.duration or 0.0, 'Wall clock time of the last run'),
+        ('scraper_run_success', lambda run: int(run.status == run.SUCCEEDED), '1 if the last run succeeded'),
+        ('scraper_run_timestamp_seconds', lambda run: run.started_at.timestamp(), 'Start of the last run'),
+        ('scraper_run_items_saved', lambda run: run.items_saved, 'Records saved by the last run'),
+        ('scraper_db_write_seconds', lambda run: run.metrics.get('db_write_seconds', 0.0), 'Seconds spent writing to the database'),
+        ('scraper_db_rows_written', lambda run: run.metrics.get('rows_written', 0), 'Rows handed to the database'),
+    ]
+
+    lines = []
+    for metric, value, help_text in run_gauges:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+        lines += [f'{metric}{_labels(scraper=run.scraper)} {_format(value(run))}' for run in runs]
+
+    metric = 'scraper_fetch_duration_seconds'
+    lines += [f'# HELP {metric} Request latency per host in the last run', f'# TYPE {metric} histogram']
+    for run in runs:
+        bounds = [str(bound) for bound in run.metrics.get('buckets', LATENCY_BUCKETS)] + ['+Inf']
+        for host, counters in sorted(run.metrics.get('hosts', {}).items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counters['latency_buckets']):
+                cumulative += count
+                lines.append(f'{metric}_bucket{_labels(scraper=run.scraper, host=host, le=bound)} {cumulative}')
+            lines.append(f"{metric}_sum{_labels(scraper=run.scraper, host=host)} {_format(counters['latency_sum'])}")
+            lines.append(f"{metric}_count{_labels(scraper=run.scraper, host=host)} {counters['fetches']}")
+
+    for metric, key, help_text in host_gauges:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+        for run in runs:
+            for host, counters in sorted(run.metrics.get('hosts', {}).items()):
+                lines.append(f'{metric}{_labels(scraper=run.scraper, host=host)} {_format(counters.get(key, 0))}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path=None):
+    """Write the latest run of every scraper for a node_exporter textfile collector"""
+    path = path or getattr(settings, 'SCRAPER_METRICS_FILE', None)
+    if not path:
+        return None
+    text = prometheus_text(latest_runs())
+    # Write then rename, so the collector never reads a half written file
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        handle.write(text)
+    os.replace(tmp_path, path)
+    return path
@@ -1,13 +1,23 @@
-from django.core.files.base import ContentFile
 from .base import BaseScraper
 from core.models import TransportType, TransportOption, City
-import requests
+from .ingest import IngestSpec, bulk_ingest
+from .images import ImagePipeline
 import re
 from urllib.parse import urlparse
 import json
+import time
+from functools import partial
+
+TRANSPORT_SPEC = IngestSpec(
+    TransportOption,
+    slug_fields=('name',),
+    fields=['name', 'description', 'transport_type', 'routes', 'schedule', 'website', 'city'],
+    lookups={'transport_type': TransportType},
+)
 
 class TransportScraper(BaseScraper):
     """Scraper for transportation data"""
+    ingest_spec = TRANSPORT_SPEC
     
     def __init__(self, city_name="Macomb"):
         super().__init__(city_name)
@@ -18,26 +28,28 @@ class TransportScraper(BaseScraper):
         }
         
     def scrape_bus_schedules(self, url):
-        """Scrape bus route information"""
-        transport_data = []
+        """Yield bus routes as each route page is fetched and parsed"""
         soup = self.fetch_page(url)
         if not soup:
-            return transport_data
+            return
             
         try:
             # Find the route links and info
+            routes = {}
             route_elements = soup.select('.route-name')
             for route_elem in route_elements:
-                try:
-                    route_name = self.clean_text(route_elem.text)
-                    route_link = route_elem.select_one('a')
-                    if not route_link or 'href' not in route_link.attrs:
-                        continue
-                        
-                    route_url = self.normalize_url(route_link['href'], url)
+                route_name = self.clean_text(route_elem.text)
+                route_link = route_elem.select_one('a')
+                if not route_link or 'href' not in route_link.attrs:
+                    continue
                     
-                    # Get route details
-                    route_details = self.scrape_route_detail(route_url)
+                routes[self.normalize_url(route_link['href'], url)] = route_name
+            
+            # Get route details, all route pages are fetched as one batch
+            for route_url, route_soup in self.fetch_pages(routes):
+                try:
+                    route_name = routes[route_url]
+                    route_details = self.parse_page(route_url, self.parse_route_detail, route_soup, route_url)
                     if route_details:
                         route_data = {
                             'name': f"SMART Bus Route {route_name}",
@@ -48,20 +60,21 @@ class TransportScraper(BaseScraper):
                             'schedule': route_details.get('schedule', ''),
                             'website': route_url
                         }
-                        transport_data.append(route_data)
                         self.log_progress(f"Scraped bus route", route_name)
+                        yield route_data
                         
                 except Exception as e:
                     self.log_progress(f"Error processing bus route: {str(e)}")
             
         except Exception as e:
             self.log_progress(f"Error scraping bus schedules: {str(e)}")
-            
-        return transport_data
     
     def scrape_route_detail(self, url):
         """Scrape detailed bus route information"""
-        soup = self.fetch_page(url)
+        return self.parse_route_detail(self.fetch_page(url), url)
+    
+    def parse_route_detail(self, soup, url):
+        """Parse detailed bus route information from a fetched route page"""
         if not soup:
             return None
             
@@ -106,6 +119,7 @@ class TransportScraper(BaseScraper):
         if not soup:
             return transport_data
             
+        parse_start = time.perf_counter()
         try:
             # Find parking information sections
             parking_sections = soup.select('.parking-info, .parking-facilities')
@@ -156,6 +170,7 @@ class TransportScraper(BaseScraper):
         except Exception as e:
             self.log_progress(f"Error scraping parking facilities: {str(e)}")
             
+        self.metrics.record_parse(url, time.perf_counter() - parse_start, len(transport_data))
         return transport_data
     
     def scrape_taxi_services(self, url):
@@ -165,6 +180,7 @@ class TransportScraper(BaseScraper):
         if not soup:
             return transport_data
             
+        parse_start = time.perf_counter()
         try:
             # Find taxi listings
             listings = soup.select('.listing, .result')
@@ -230,6 +246,7 @@ class TransportScraper(BaseScraper):
         except Exception as e:
             self.log_progress(f"Error scraping taxi services: {str(e)}")
             
+        self.metrics.record_parse(url, time.perf_counter() - parse_start, len(transport_data))
         return transport_data
     
     def save_to_database(self, transport_data):
@@ -237,77 +254,52 @@ class TransportScraper(BaseScraper):
         # Use the base class method instead of direct get_or_create
         city = self.get_city(self.city_name)
         
-        # Rest remains the same
-        for data in transport_data:
-            try:
-                # Get or create transport type
-                transport_type, _ = TransportType.objects.get_or_create(
-                    name=data['transport_type']
-                )
-                
-                # Check if transport option already exists
-                option, created = TransportOption.objects.get_or_create(
-                    name=data['name'],
-                    defaults={
-                        'description': data['description'],
-                        'transport_type': transport_type,
-                        'routes': data.get('routes', ''),
-                        'schedule': data.get('schedule', ''),
-                        'website': data.get('website', ''),
-                        'city': city
-                    }
-                )
-                
-                # Update existing option if needed
-                if not created:
-                    option.description = data['description']
-                    option.transport_type = transport_type
-                    option.routes = data.get('routes', '')
-                    option.schedule = data.get('schedule', '')
-                    option.website = data.get('website', '')
-                    option.save()
-                
-                # Download and save image if available and needed
-                if (created or not option.image) and data.get('image_url'):
-                    self.download_and_save_image(option, data['image_url'])
-                
-                self.log_progress(f"{'Created' if created else 'Updated'} transport option", option.name)
-            except Exception as e:
-                self.log_progress(f"Error saving transport option {data.get('name', 'unknown')}: {str(e)}")
-    
-    def download_and_save_image(self, transport_option, image_url):
-        """Download and save transport option image"""
+        rows = [
+            {
+                'name': data['name'],
+                'description': data['description'],
+                'transport_type': data['transport_type'],
+                'routes': data.get('routes', ''),
+                'schedule': data.get('schedule', ''),
+                'website': data.get('website', ''),
+            }
+            for data in transport_data
+        ]
+        
         try:
-            image_content = self.download_image(image_url)
-            if not image_content:
-                return False
-                
-            file_name = f"transport_{transport_option.id}_{urlparse(image_url).path.split('/')[-1]}"
-            transport_option.image.save(file_name, ContentFile(image_content), save=True)
-            return True
+            with self.metrics.db_write(len(rows)):
+                result = bulk_ingest(TRANSPORT_SPEC, rows, extra={'city': city})
         except Exception as e:
-            self.log_progress(f"Error saving image for {transport_option.name}: {str(e)}")
-            return False
+            self.log_progress(f"Error saving transport options: {str(e)}")
+            return 0
+        
+        # Queue images if available and needed
+        images = ImagePipeline(self)
+        for data in transport_data:
+            option = result.objects.get(TRANSPORT_SPEC.slug_for(data))
+            if option and data.get('image_url') and (result.was_created(option) or not option.image):
+                images.add(option, data['image_url'])
+        images.run()
+        
+        self.log_progress(f"Saved transport options: {result}")
+        return result.total
+    
+    def record_sources(self):
+        """Bus routes, parking facilities and taxi services"""
+        return {
+            'bus': partial(self.scrape_bus_schedules, self.sources['bus']),
+            'parking': partial(self.scrape_parking_facilities, self.sources['parking']),
+            'taxi': partial(self.scrape_taxi_services, self.sources['taxi']),
+        }
     
     def run(self):
         """Run the transportation scraper"""
         self.log_progress("Starting transportation scraper")
         
-        all_transport_data = []
-        
-        # Scrape bus schedules
-        bus_data = self.scrape_bus_schedules(self.sources['bus'])
-        all_transport_data.extend(bus_data)
-        
-        # Scrape parking facilities
-        parking_data = self.scrape_parking_facilities(self.sources['parking'])
-        all_transport_data.extend(parking_data)
-        
-        # Scrape taxi services
-        taxi_data = self.scrape_taxi_services(self.sources['taxi'])
-        all_transport_data.extend(taxi_data)
+        # Saved in batches as they are scraped
+        pipeline = self.pipeline()
+        saved_count = pipeline.run(*self.record_sources().values())
         
-        # Save to database
-        self.save_to_database(all_transport_data)
+        self.log_progress(f"Completed transportation scraper, scraped {sum(pipeline.parsed.values())} transport options")
         
-        self.log_progress(f"Completed transportation scraper, scraped {len(all_transport_data)} transport options")
\ No newline at end of file
+        return saved_count
@@ -0,0 +1,205 @@
+# core/search.py
+import re
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Q
+from core.models import (
+    Attraction, Restaurant, Event, Property, TransportOption, SearchDocument
+)
+
+# Searchable models: (title field, body fields)
+SEARCH_FIELDS = {
+    Attraction: ('name', ['description', 'address']),
+    Restaurant: ('name', ['description', 'address']),
+    Event: ('name', ['description', 'venue', 'address']),
+    Property: ('title', ['description', 'address']),
+    TransportOption: ('name', ['description', 'routes', 'address']),
+}
+
+FTS_TABLE = 'core_searchdocument_fts'
+
+# Matching is per word, not per substring: every query word must start a word
+# in the document (prefix match, AND across words). So "burg" finds "Burger
+# Bar" but "burger" no longer finds "cheeseburger", which the old icontains
+# search did. Stemming (porter on SQLite, english on PostgreSQL) also lets
+# "parks" match "park".
+
+# Title matches weigh more than body matches when ranking
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+def tokenize(query):
+    """Split a user query into lowercase word tokens"""
+    return re.findall(r'\w+', (query or '').lower())
+
+
+def build_document(instance):
+    """Return (title, body) text for a searchable model instance"""
+    title_field, body_fields = SEARCH_FIELDS[type(instance)]
+    title = getattr(instance, title_field) or ''
+    body = ' '.join(str(getattr(instance, field) or '') for field in body_fields)
+    return title[:255], body
+
+
+def index_object(instance):
+    """Add or refresh the search document for a single instance"""
+    title, body = build_document(instance)
+    SearchDocument.objects.update_or_create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        defaults={'title': title, 'body': body},
+    )
+
+
+def remove_object(instance):
+    """Drop the search document for a deleted instance"""
+    SearchDocument.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+    ).delete()
+
+
+def index_objects(model, instances, batch_size=1000):
+    """Replace the search documents for many instances of one model at once"""
+    content_type = ContentType.objects.get_for_model(model)
+    instances = list(instances)
+
+    with transaction.atomic():
+        SearchDocument.objects.filter(
+            content_type=content_type,
+            object_id__in=[obj.pk for obj in instances],
+        ).delete()
+
+        documents = []
+        for obj in instances:
+            title, body = build_document(obj)
+            documents.append(SearchDocument(
+                content_type=content_type, object_id=obj.pk, title=title, body=body
+            ))
+        SearchDocument.objects.bulk_create(documents, batch_size=batch_size)
+
+    return len(documents)
+
+
+def rebuild_index(models=None, batch_size=1000):
+    """Rebuild the search index from scratch, returns a count per model"""
+    counts = {}
+
+    for model in (models or SEARCH_FIELDS):
+        content_type = ContentType.objects.get_for_model(model)
+        SearchDocument.objects.filter(content_type=content_type).delete()
+
+        total = 0
+        batch = []
+        for obj in model.objects.all().iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                total += index_objects(model, batch, batch_size)
+                batch = []
+        if batch:
+            total += index_objects(model, batch, batch_size)
+
+        counts[model.__name__] = total
+
+    return counts
+
+
+def _sqlite_query(tokens, limit):
+    # Prefix match every token, all tokens must match
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    sql = f"""
+        SELECT content_type_id, object_id FROM (
+            SELECT content_type_id, object_id,
+                   ROW_NUMBER() OVER (PARTITION BY content_type_id ORDER BY score) AS position
+            FROM (
+                SELECT d.content_type_id, d.object_id,
+                       bm25({FTS_TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score
+                FROM {FTS_TABLE}
+                JOIN core_searchdocument d ON d.id = {FTS_TABLE}.rowid
+                WHERE {FTS_TABLE} MATCH %s
+            )
+        )
+        WHERE position <= %s
+        ORDER BY content_type_id, position
+    """
+    return sql, [match, limit]
+
+
+def _postgresql_query(tokens, limit):
+    # Same expression as the GIN index created in migration 0011
+    tsquery = ' & '.join(f'{token}:*' for token in tokens)
+    sql = """
+        SELECT content_type_id, object_id FROM (
+            SELECT content_type_id, object_id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY content_type_id
+                       ORDER BY ts_rank(
+                           setweight(to_tsvector('english', title), 'A') ||
+                           setweight(to_tsvector('english', body), 'D'),
+                           query
+                       ) DESC
+                   ) AS position
+            FROM core_searchdocument, to_tsquery('english', %s) query
+            WHERE to_tsvector('english', title || ' ' || body) @@ query
+        ) ranked
+        WHERE position <= %s
+        ORDER BY content_type_id, position
+    """
+    return sql, [tsquery, limit]
+
+
+def search_ids(query, limit=10):
+    """Return {model: [object ids in rank order]} using a single index query"""
+    tokens = tokenize(query)
+    results = {model: [] for model in SEARCH_FIELDS}
+    if not tokens:
+        return results
+
+    models_by_type = {
+        ContentType.objects.get_for_model(model).id: model for model in SEARCH_FIELDS
+    }
+
+    if connection.vendor == 'sqlite':
+        sql, params = _sqlite_query(tokens, limit)
+    elif connection.vendor == 'postgresql':
+        sql, params = _postgresql_query(tokens, limit)
+    else:
+        sql = None
+
+    if sql:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+    else:
+        # No full-text support on this backend, fall back to substring matching
+        condition = Q()
+        for token in tokens:
+            condition &= Q(title__icontains=token) | Q(body__icontains=token)
+        rows = []
+        for content_type_id in models_by_type:
+            rows.extend(
+                SearchDocument.objects.filter(condition, content_type_id=content_type_id)
+                .values_list('content_type_id', 'object_id')[:limit]
+            )
+
+    for content_type_id, object_id in rows:
+        model = models_by_type.get(content_type_id)
+        if model is not None:
+            results[model].append(object_id)
+
+    return results
+
+
+def search(query, limit=10):
+    """Return {model: [instances in rank order]} for a search query"""
+    results = {}
+
+    for model, ids in search_ids(query, limit).items():
+        if not ids:
+            results[model] = []
+            continue
+        objects = model.objects.in_bulk(ids)
+        results[model] = [objects[pk] for pk in ids if pk in objects]
+
+    return results
@@ -26,7 +26,7 @@ class AttractionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Attraction
-        fields = '__all__'
+        exclude = ['content_fingerprint']
 
 class AttractionDetailSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -34,7 +34,7 @@ class AttractionDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Attraction
-        fields = '__all__'
+        exclude = ['content_fingerprint']
 
 class EventTypeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -46,7 +46,7 @@ class EventSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ['content_fingerprint']
 
 class EventDetailSerializer(serializers.ModelSerializer):
     event_type_name = serializers.CharField(source='event_type.name', read_only=True)
@@ -54,7 +54,7 @@ class EventDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ['content_fingerprint']
 
 class CuisineSerializer(serializers.ModelSerializer):
     class Meta:
@@ -72,7 +72,7 @@ class RestaurantSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Restaurant
-        fields = '__all__'
+        exclude = ['content_fingerprint']
     
     def get_price(self, obj):
         return '$' * obj.price_level
@@ -85,7 +85,7 @@ class RestaurantDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Restaurant
-        fields = '__all__'
+        exclude = ['content_fingerprint']
     
     def get_price(self, obj):
         return '$' * obj.price_level
@@ -106,7 +106,7 @@ class PropertySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Property
-        fields = '__all__'
+        exclude = ['content_fingerprint']
     
     def get_status(self, obj):
         return "For Sale" if obj.for_sale else "For Rent"
@@ -119,7 +119,7 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Property
-        fields = '__all__'
+        exclude = ['content_fingerprint']
     
     def get_status(self, obj):
         return "For Sale" if obj.for_sale else "For Rent"
@@ -134,7 +134,7 @@ class TransportOptionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = TransportOption
-        fields = '__all__'
+        exclude = ['content_fingerprint']
 
 class ReviewSerializer(serializers.ModelSerializer):
     user_name = serializers.ReadOnlyField(source='user.username')
@@ -0,0 +1,97 @@
+# core/signals.py
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_init, post_save, post_delete
+from core import ratings, search
+from core.cache import CATALOG_MODELS, bump_model_version
+from core.geo import invalidate_spatial_index
+from core.models import Attraction, Restaurant, Property, RatingAggregate, Review
+
+# Models with latitude/longitude served by a spatial index
+SPATIAL_MODELS = [Attraction, Restaurant, Property]
+
+
+def update_search_document(sender, instance, raw=False, **kwargs):
+    """Keep the search index in sync when a catalog object is saved"""
+    if raw:
+        return
+    search.index_object(instance)
+
+
+def delete_search_document(sender, instance, **kwargs):
+    """Remove a deleted catalog object from the search index"""
+    search.remove_object(instance)
+
+
+for model in search.SEARCH_FIELDS:
+    post_save.connect(update_search_document, sender=model, dispatch_uid=f"search_save_{model.__name__}")
+    post_delete.connect(delete_search_document, sender=model, dispatch_uid=f"search_delete_{model.__name__}")
+
+
+def reset_spatial_index(sender, **kwargs):
+    """Force the spatial index for a model to rebuild on its next query"""
+    invalidate_spatial_index(sender)
+
+
+for model in SPATIAL_MODELS:
+    post_save.connect(reset_spatial_index, sender=model, dispatch_uid=f"spatial_save_{model.__name__}")
+    post_delete.connect(reset_spatial_index, sender=model, dispatch_uid=f"spatial_delete_{model.__name__}")
+
+
+def invalidate_cached_responses(sender, raw=False, **kwargs):
+    """Expire cached API responses that include the changed model"""
+    if raw:
+        return
+    bump_model_version(sender)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"cache_save_{model.__name__}")
+    post_delete.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"cache_delete_{model.__name__}")
+
+
+def remember_review_target(sender, instance, **kwargs):
+    """Snapshot what a review counted towards, so edits can move it between aggregates"""
+    instance._counted_as = (instance.content_type_id, instance.object_id, instance.rating) if instance.pk else None
+
+
+def count_review(sender, instance, created, raw=False, **kwargs):
+    """Apply a created or edited review to the rating aggregates"""
+    if raw:
+        return
+    current = (instance.content_type_id, instance.object_id, instance.rating)
+    previous = getattr(instance, '_counted_as', None) if not created else None
+    if previous == current:
+        return
+
+    if previous is not None:
+        ratings.apply_review(*previous, sign=-1)
+    ratings.apply_review(*current)
+    instance._counted_as = current
+
+
+def uncount_review(sender, instance, **kwargs):
+    counted = getattr(instance, '_counted_as', None) or (instance.content_type_id, instance.object_id, instance.rating)
+    ratings.apply_review(*counted, sign=-1)
+
+
+post_init.connect(remember_review_target, sender=Review, dispatch_uid="rating_init_review")
+post_save.connect(count_review, sender=Review, dispatch_uid="rating_save_review")
+post_delete.connect(uncount_review, sender=Review, dispatch_uid="rating_delete_review")
+
+
+def sync_combined_rating(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Blend a changed scraped rating with the user review aggregate"""
+    if raw or (update_fields and not {'rating', 'review_count'} & set(update_fields)):
+        return
+    ratings.refresh_combined_rating(ContentType.objects.get_for_model(sender).id, instance.pk)
+
+
+def drop_rating_aggregate(sender, instance, **kwargs):
+    RatingAggregate.objects.filter(
+        content_type=ContentType.objects.get_for_model(sender), object_id=instance.pk
+    ).delete()
+
+
+for model in ratings.RATED_MODELS:
+    post_save.connect(sync_combined_rating, sender=model, dispatch_uid=f"rating_save_{model.__name__}")
+    post_delete.connect(drop_rating_aggregate, sender=model, dispatch_uid=f"rating_delete_{model.__name__}")
@@ -0,0 +1,63 @@
+# core/stats.py
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from core.models import City, Attraction, Restaurant, Event, Property, TransportOption
+
+
+def catalog_querysets(today=None):
+    """Rows counted by the stats endpoints, keyed by the name used in responses"""
+    today = today or timezone.localdate()
+    return {
+        'attractions': Attraction.objects.all(),
+        'restaurants': Restaurant.objects.all(),
+        'events': Event.objects.all(),
+        'upcoming_events': Event.objects.filter(date__gte=today),
+        'properties': Property.objects.all(),
+        'transportation': TransportOption.objects.all(),
+    }
+
+
+def total_counts(today=None):
+    """Catalog and user totals, computed in a single query
+
+    Each count is a scalar subquery of one SELECT, so the database answers all of
+    them in one round trip.
+    """
+    querysets = catalog_querysets(today)
+    querysets['users'] = User.objects.all()
+
+    columns, params = [], []
+    for queryset in querysets.values():
+        sql, query_params = queryset.order_by().values('pk').query.sql_with_params()
+        columns.append(f'(SELECT COUNT(*) FROM ({sql}) counted)')
+        params.extend(query_params)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(columns)}", params)
+        row = cursor.fetchone()
+    return dict(zip(querysets, row))
+
+
+def city_count_annotations(today=None):
+    """Per-city count annotations for City querysets, one correlated subquery per model
+
+    Annotations are named <name>_count, since City already has reverse relations
+    called attractions, restaurants and events.
+    """
+    annotations = {}
+    for name, queryset in catalog_querysets(today).items():
+        counted = queryset.filter(city=OuterRef('pk')).order_by().values('city').annotate(
+            total=Count('pk')
+        ).values('total')
+        annotations[f'{name}_count'] = Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+    return annotations
+
+
+def city_counts(cities=None, today=None):
+    """[(city, {name: count})] for every city, or the cities queryset, in one query"""
+    names = list(catalog_querysets(today))
+    cities = (City.objects.all() if cities is None else cities).annotate(**city_count_annotations(today))
+    return [(city, {name: getattr(city, f'{name}_count') for name in names}) for city in cities]
@@ -0,0 +1,185 @@
+# core/synthetic.py
+import random
+from datetime import date, time, timedelta
+
+# Macomb County communities with approximate centre coordinates and ZIP codes
+CITIES = [
+    ('Macomb', 42.6670, -82.9182, ['48042', '48044']),
+    ('Sterling Heights', 42.5803, -83.0302, ['48310', '48312', '48313']),
+    ('Clinton Township', 42.5868, -82.9199, ['48035', '48036', '48038']),
+    ('Shelby Township', 42.6709, -83.0330, ['48315', '48316', '48317']),
+    ('Warren', 42.5145, -83.0147, ['48088', '48089', '48091']),
+    ('Mount Clemens', 42.5973, -82.8780, ['48043']),
+    ('Chesterfield', 42.6631, -82.8427, ['48047', '48051']),
+    ('Utica', 42.6261, -83.0335, ['48317']),
+    ('Romeo', 42.8028, -83.0127, ['48065']),
+    ('New Baltimore', 42.6811, -82.7366, ['48047']),
+]
+
+STREETS = [
+    'Hall Rd', 'Romeo Plank Rd', '23 Mile Rd', '21 Mile Rd', 'Garfield Rd', 'Gratiot Ave',
+    'Van Dyke Ave', 'Schoenherr Rd', 'Hayes Rd', 'Card Rd', 'North Ave', 'Main St',
+    'Cass Ave', 'Groesbeck Hwy', 'Jefferson Ave', 'Utica Rd', 'Dequindre Rd', 'Mound Rd',
+]
+
+PLACES = ['Clinton River', 'Stony Creek', 'Lake St. Clair', 'Partridge Creek', 'Freedom Hill', 'Heritage',
+          'Lakeside', 'Riverside', 'Cherry Hill', 'Oakwood', 'Maple Lane', 'Beacon', 'Sunset', 'Harbor']
+
+ATTRACTIONS = {
+    'Outdoors': ['Park', 'Nature Preserve', 'Trail', 'Metropark', 'Beach'],
+    'Recreation': ['Recreation Center', 'Golf Club', 'Ice Arena', 'Bowling Center'],
+    'Arts': ['Art Gallery', 'Theatre', 'Performing Arts Center'],
+    'Museum': ['Historical Museum', 'Heritage Village', 'Science Center'],
+    'Shopping': ['Mall', 'Farmers Market', 'Marketplace'],
+    'Entertainment': ['Cinema', 'Amphitheater', 'Family Fun Center'],
+}
+
+RESTAURANTS = {
+    'American': ['Grill', 'Diner', 'Tavern', 'Kitchen'],
+    'Italian': ['Trattoria', 'Pizzeria', 'Ristorante'],
+    'Mexican': ['Cantina', 'Taqueria'],
+    'Coney Island': ['Coney Island'],
+    'Middle Eastern': ['Grill', 'Mediterranean Kitchen'],
+    'Asian': ['Noodle House', 'Sushi Bar', 'Bistro'],
+    'Cafe': ['Coffee House', 'Bakery Cafe'],
+}
+
+EVENTS = {
+    'Music': ['Summer Concert', 'Jazz Night', 'Symphony in the Park'],
+    'Festival': ['Food Festival', 'Art Fair', 'Fall Harvest Festival'],
+    'Community': ['Farmers Market Day', 'Town Hall', 'Library Book Sale'],
+    'Sports': ['5K Run', 'Youth Soccer Tournament', 'Fishing Derby'],
+    'Family': ['Movie Night', 'Holiday Parade', 'Easter Egg Hunt'],
+}
+
+PROPERTY_TYPES = {
+    'House': (180000, 650000),
+    'Condo': (120000, 320000),
+    'Townhouse': (160000, 380000),
+    'Apartment': (900, 2200),  # Monthly rent
+}
+
+TRANSPORT = {
+    'Bus': ['SMART Route', 'Connector Route'],
+    'Parking': ['Public Parking Lot', 'Parking Garage'],
+    'Taxi': ['Cab Company'],
+    'Rideshare': ['Rideshare Pickup Zone'],
+}
+
+# Share of generated rows per catalog model
+MIX = [('attraction', 0.2), ('restaurant', 0.3), ('event', 0.25), ('property', 0.2), ('transport', 0.05)]
+
+
+class CatalogGenerator:
+    """Deterministic, realistic-looking Macomb County catalog rows for load testing"""
+
+    def __init__(self, seed=0, start=None):
+        self.random = random.Random(seed)
+        self.start = start or date.today()
+
+    def records(self, count):
+        """Yield count loader records, each name carries a serial so slugs never collide"""
+        models, weights = zip(*MIX)
+        for serial in range(1, count + 1):
+            kind = self.random.choices(models, weights)[0]
+            yield getattr(self, kind)(serial)
+
+    def place(self):
+        city, latitude, longitude, zip_codes = self.random.choice(CITIES)
+        address = f"{self.random.randint(100, 59999)} {self.random.choice(STREETS)}, {city}, MI {self.random.choice(zip_codes)}"
+        return city, address, round(latitude + self.random.gauss(0, 0.02), 6), round(longitude + self.random.gauss(0, 0.02), 6)
+
+    def rating(self):
+        return round(min(5.0, max(1.0, self.random.gauss(4.1, 0.5))), 1)
+
+    def attraction(self, serial):
+        category, kinds = self.random.choice(list(ATTRACTIONS.items()))
+        city, address, latitude, longitude = self.place()
+        name = f"{self.random.choice(PLACES)} {self.random.choice(kinds)} {serial}"
+        return {
+            'model': 'attraction',
+            'name': name,
+            'description': f"{name} is a local favourite in {city} for {category.lower()}.",
+            'address': address,
+            'category': category,
+            'city': city,
+            'opening_hours': self.random.choice(['Daily: 8am-8pm', 'Mon-Sat: 10am-6pm', 'Dawn to dusk']),
+            'latitude': latitude,
+            'longitude': longitude,
+            'rating': self.rating(),
+            'review_count': self.random.randint(0, 2500),
+            'featured': self.random.random() < 0.02,
+        }
+
+    def restaurant(self, serial):
+        cuisine, kinds = self.random.choice(list(RESTAURANTS.items()))
+        city, address, latitude, longitude = self.place()
+        name = f"{self.random.choice(PLACES)} {self.random.choice(kinds)} {serial}"
+        return {
+            'model': 'restaurant',
+            'name': name,
+            'description': f"{cuisine} food in {city}.",
+            'address': address,
+            'cuisine': cuisine,
+            'city': city,
+            'opening_hours': self.random.choice(['11am-10pm', '7am-3pm', '4pm-midnight']),
+            'price_level': self.random.choices([1, 2, 3], [0.35, 0.5, 0.15])[0],
+            'latitude': latitude,
+            'longitude': longitude,
+            'rating': self.rating(),
+            'review_count': self.random.randint(0, 1800),
+            'featured': self.random.random() < 0.02,
+        }
+
+    def event(self, serial):
+        event_type, kinds = self.random.choice(list(EVENTS.items()))
+        city, address, _, _ = self.place()
+        return {
+            'model': 'event',
+            'name': f"{city} {self.random.choice(kinds)} {serial}",
+            'description': f"A {event_type.lower()} event in {city}.",
+            'event_type': event_type,
+            'venue': f"{self.random.choice(PLACES)} Park",
+            'address': address,
+            'city': city,
+            'date': (self.start + timedelta(days=self.random.randint(-60, 365))).isoformat(),
+            'time': time(self.random.choice([9, 10, 12, 17, 18, 19, 20]), self.random.choice([0, 30])).isoformat(),
+            'featured': self.random.random() < 0.02,
+        }
+
+    def property(self, serial):
+        property_type, (low, high) = self.random.choice(list(PROPERTY_TYPES.items()))
+        city, address, latitude, longitude = self.place()
+        bedrooms = self.random.randint(1, 5)
+        for_sale = property_type != 'Apartment'
+        return {
+            'model': 'property',
+            'title': f"{bedrooms} Bed {property_type} on {address.split(',')[0]} #{serial}",
+            'description': f"{bedrooms} bedroom {property_type.lower()} in {city}.",
+            'property_type': property_type,
+            'price': f"{round(self.random.uniform(low, high), -2 if for_sale else 0):.2f}",
+            'bedrooms': bedrooms,
+            'bathrooms': str(self.random.choice([1, 1.5, 2, 2.5, 3])),
+            'size': self.random.randint(600, 4200),
+            'address': address,
+            'city': city,
+            'latitude': latitude,
+            'longitude': longitude,
+            'year_built': self.random.randint(1950, 2025),
+            'for_sale': for_sale,
+            'for_rent': not for_sale,
+        }
+
+    def transport(self, serial):
+        transport_type, kinds = self.random.choice(list(TRANSPORT.items()))
+        city, address, _, _ = self.place()
+        return {
+            'model': 'transport',
+            'name': f"{city} {self.random.choice(kinds)} {serial}",
+            'description': f"{transport_type} service in {city}.",
+            'transport_type': transport_type,
+            'address': address,
+            'routes': f"Route {self.random.randint(1, 800)}" if transport_type == 'Bus' else '',
+            'schedule': self.random.choice(['Weekdays 6am-10pm', '24 hours', 'Daily 8am-8pm']),
+            'city': city,
+        }
@@ -0,0 +1,106 @@
+# core/tasks.py
+import logging
+import time
+from collections import defaultdict
+from celery import chord, shared_task
+from core.cache import catalog_cache_is_shared
+from core.homepage import build_snapshot
+from core.models import City, ScrapeRun
+from core.scraping.http_cache import get_http_cache
+from core.scraping.targets import FINISH_QUEUE, SCRAPE_TARGETS
+from core.scraping.telemetry import ScrapeMetrics, complete_run, write_prometheus
+
+logger = logging.getLogger('scraper')
+
+
+@shared_task(name='run_all_scrapers')
+def run_all_scrapers(targets=None, offline=False, use_cache=True):
+    """Fan a scrape out into one scrape_source task per source and page batch
+
+    Sources go to their target's queue and run side by side, so the whole scrape
+    takes as long as the slowest source. A chord joins them into
+    finish_scrape. Returns the chord's result id.
+    """
+    runs = {}
+    header = []
+    for name in targets or SCRAPE_TARGETS:
+        target = SCRAPE_TARGETS[name]
+        runs[name] = ScrapeRun.objects.create(scraper=name, status=ScrapeRun.RUNNING).pk
+        for source in target.make_scraper(offline, use_cache).record_sources(**target.kwargs):
+            header.append(
+                scrape_source.si(name, source, offline=offline, use_cache=use_cache).set(queue=target.queue)
+            )
+    logger.info(f"Dispatching {len(header)} scrape tasks for {', '.join(runs)}")
+    return chord(header)(finish_scrape.s(runs, offline=offline).set(queue=FINISH_QUEUE)).id
+
+
+@shared_task(name='scrape_source', acks_late=True)
+def scrape_source(name, source, offline=False, use_cache=True):
+    """Stream one record source of a scrape target into the database
+
+    Failures are returned rather than raised, a raising chord member would
+    keep finish_scrape from running for the sources that worked.
+    """
+    target = SCRAPE_TARGETS[name]
+    scraper = target.make_scraper(offline, use_cache)
+    pipeline = scraper.pipeline(**target.kwargs)
+    start = time.perf_counter()
+    error = ''
+    try:
+        pipeline.run(scraper.record_sources(**target.kwargs)[source])
+    except Exception as e:
+        logger.exception(f"Scrape source {name}/{source} failed")
+        error = str(e) or e.__class__.__name__
+    return {
+        'target': name,
+        'source': source,
+        'saved': pipeline.saved,
+        'error': error,
+        'duration': time.perf_counter() - start,
+        'metrics': scraper.metrics.snapshot(),
+    }
+
+
+@shared_task(name='finish_scrape')
+def finish_scrape(results, runs, offline=False):
+    """Chord body: close each target's ScrapeRun, rebuild homepage snapshots and export metrics
+
+    Returns {target: records saved}.
+    """
+    by_target = defaultdict(list)
+    for result in results:
+        by_target[result['target']].append(result)
+
+    saved = {}
+    for name, run_id in runs.items():
+        run = ScrapeRun.objects.get(pk=run_id)
+        target_results = by_target[name]
+        metrics = ScrapeMetrics()
+        for result in target_results:
+            metrics.merge(result['metrics'])
+        run.items_saved = saved[name] = sum(result['saved'] for result in target_results)
+        errors = [f"{result['source']}: {result['error']}" for result in target_results if result['error']]
+        # Sources ran in parallel, the run took as long as its slowest one
+        duration = max((result['duration'] for result in target_results), default=0.0)
+        complete_run(run, metrics, duration, '; '.join(errors))
+
+    # Scraped rows bumped the catalog versions, so the snapshots are rebuilt now
+    # instead of by the first visitor. With a per-process cache the web processes
+    # would never see them, they rebuild once their snapshot expires instead
+    if catalog_cache_is_shared():
+        for city_name in City.objects.values_list('name', flat=True):
+            build_snapshot(city_name)
+    else:
+        logger.info("Catalog cache is per process, homepage snapshots are left to the web processes")
+    write_prometheus()
+    if not offline:
+        get_http_cache().evict()
+    return saved
+
+
+@shared_task(name='run_scrape_job', acks_late=True)
+def run_scrape_job(job_id):
+    """Run a ScrapeJob enqueued through the API, see core.scraping.jobs"""
+    from core.scraping.jobs import run_job
+
+    run_job(job_id)
@@ -1,3 +1,1448 @@
-from django.test import TestCase
+import concurrent.futures
+import functools
+import importlib.util
+import io
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time as clock
+from datetime import date, time, timedelta
+from decimal import Decimal
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest import skipUnless, mock
 
-# Create your tests here.
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import requests
+from rest_framework.test import APIClient
+
+from core import homepage, search
+from core.cache import catalog_cache, model_versions
+from core.generic import load_generic_objects
+from core.geo import (
+    EARTH_RADIUS_KM, KDTree, SpatialIndex, get_spatial_index, invalidate_spatial_index, to_unit_vector
+)
+from core.geocoding import GazetteerResolver, Geocoder, backfill_coordinates, normalize_address
+from core.instrumentation import normalize_sql
+from core.loader import CatalogLoader
+from core.ratings import combined_rating, rebuild_aggregates
+from core.models import (
+    City, Category, Attraction, Cuisine, EventType, Restaurant, Event, Property, PropertyType, TransportOption,
+    Review, Favorite, SavedItem, ScrapeRun, GeocodedAddress, SearchDocument, RatingAggregate, ScrapedImage
+)
+from core.scraping.base import BaseScraper
+from core.scraping.browser import BrowserPool, chrome_driver, wait_until_ready
+from core.scraping.event_scraper import EVENT_SPEC
+from core.scraping.fetcher import FetchEngine, HostRateLimiter
+from core.scraping.http_cache import HTTPCache
+from core.scraping.images import ImagePipeline
+from core.scraping.ingest import bulk_ingest, resolve_lookups
+from core.scraping.pipeline import ScrapePipeline
+from core.scraping.restaurant_scraper import RestaurantScraper
+from core.scraping.telemetry import prometheus_text, record_run
+from core.scraping.transport_scraper import TransportScraper
+from core.synthetic import CatalogGenerator
+
+
+class SearchIndexTests(TestCase):
+    """Full-text search ranking, prefix matching and index sync"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Macomb')
+        cls.category = Category.objects.create(name='Parks')
+
+    def attraction(self, name, description='d'):
+        return Attraction.objects.create(
+            name=name, description=description, address='a', category=self.category, city=self.city
+        )
+
+    def test_title_matches_rank_first(self):
+        body_match = self.attraction('Art Museum', 'A short walk from the lakeside trail')
+        title_match = self.attraction('Lakeside Park')
+        self.attraction('Golf Course')
+
+        self.assertEqual(search.search('lakeside')[Attraction], [title_match, body_match])
+
+    def test_prefix_and_all_tokens_match(self):
+        amphitheatre = self.attraction('Freedom Hill Amphitheatre', 'Outdoor concerts all summer')
+        self.attraction('Freedom Hill County Park')
+
+        self.assertEqual(search.search('amphi')[Attraction], [amphitheatre])
+        self.assertEqual(search.search('freedom conc')[Attraction], [amphitheatre])
+        self.assertEqual(search.search('freedom bowling')[Attraction], [])
+        self.assertEqual(search.search('  ')[Attraction], [])
+
+    def test_words_match_by_prefix_not_substring(self):
+        burger_bar = self.attraction('Burger Bar')
+        self.attraction('Cheeseburger Shack')
+
+        self.assertEqual(search.search('burger')[Attraction], [burger_bar])
+
+    def test_saves_and_deletes_keep_the_index_in_sync(self):
+        attraction = self.attraction('Riverside Gardens')
+        self.assertEqual(search.search('riverside')[Attraction], [attraction])
+
+        attraction.name = 'Hillside Gardens'
+        attraction.save()
+        self.assertEqual(search.search('riverside')[Attraction], [])
+        self.assertEqual(search.search('hillside')[Attraction], [attraction])
+
+        attraction.delete()
+        self.assertEqual(search.search('hillside')[Attraction], [])
+        self.assertFalse(SearchDocument.objects.exists())
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 triggers are SQLite specific')
+    def test_triggers_mirror_documents_into_fts(self):
+        def fts_rowids(term):
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT rowid FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH %s', [term])
+                return [row[0] for row in cursor.fetchall()]
+
+        attraction = self.attraction('Riverside Gardens')
+        document = SearchDocument.objects.get()
+        self.assertEqual(fts_rowids('riverside'), [document.pk])
+
+        SearchDocument.objects.filter(pk=document.pk).update(title='Hillside Gardens')
+        self.assertEqual(fts_rowids('riverside'), [])
+        self.assertEqual(fts_rowids('hillside'), [document.pk])
+
+        attraction.delete()
+        self.assertEqual(fts_rowids('hillside'), [])
+
+    def test_rebuild_indexes_rows_written_without_signals(self):
+        Attraction.objects.bulk_create([
+            Attraction(name='Stony Creek', slug='stony-creek', description='d', address='a',
+                       category=self.category, city=self.city),
+        ])
+        self.assertEqual(search.search('stony')[Attraction], [])
+
+        counts = search.rebuild_index()
+        self.assertEqual(counts['Attraction'], 1)
+        self.assertEqual([a.name for a in search.search('stony')[Attraction]], ['Stony Creek'])
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = (math.radians(float(value)) for value in (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class SpatialIndexTests(TestCase):
+    """KD-tree nearest and radius lookups agree with brute-force haversine"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Macomb')
+        cls.category = Category.objects.create(name='Parks')
+        cls.property_type = PropertyType.objects.create(name='House')
+
+    def setUp(self):
+        invalidate_spatial_index(Attraction)
+        invalidate_spatial_index(Property)
+
+    def brute_force(self, points, latitude, longitude, k, radius_km=None, exclude=None):
+        distances = sorted(
+            (haversine_km(latitude, longitude, lat, lng), pk) for pk, lat, lng in points if pk != exclude
+        )
+        if radius_km is not None:
+            distances = [(distance, pk) for distance, pk in distances if distance <= radius_km]
+        return [(pk, distance) for distance, pk in distances[:k]]
+
+    def assertMatches(self, found, expected):
+        self.assertEqual([pk for pk, _ in found], [pk for pk, _ in expected])
+        for (_, distance), (_, expected_distance) in zip(found, expected):
+            self.assertAlmostEqual(distance, expected_distance, places=6)
+
+    def test_tree_matches_brute_force(self):
+        rng = random.Random(7)
+        points = [(pk, rng.uniform(42.4, 42.9), rng.uniform(-83.2, -82.7)) for pk in range(500)]
+        # Never expires, so the index serves these points instead of querying Attraction
+        index = SpatialIndex(Attraction, ttl=math.inf)
+        index.tree = KDTree([(to_unit_vector(lat, lng), pk) for pk, lat, lng in points])
+
+        for _ in range(25):
+            latitude, longitude = rng.uniform(42.4, 42.9), rng.uniform(-83.2, -82.7)
+            for k, radius_km in ((1, None), (10, None), (50, 5.0), (500, 2.5)):
+                self.assertMatches(
+                    index.nearest(latitude, longitude, k=k, radius_km=radius_km),
+                    self.brute_force(points, latitude, longitude, k, radius_km),
+                )
+
+        pk, latitude, longitude = points[42]
+        found = index.nearest(latitude, longitude, k=5, exclude=pk)
+        self.assertNotIn(pk, [match for match, _ in found])
+        self.assertMatches(found, self.brute_force(points, latitude, longitude, 5, exclude=pk))
+        self.assertEqual(index.nearest(latitude, longitude, k=0), [])
+
+    def test_decimal_coordinates(self):
+        rng = random.Random(11)
+        properties = [
+            Property.objects.create(
+                title=f'House {index}', slug=f'house-{index}', description='d', price=Decimal('250000'),
+                address='a', city=self.city, property_type=self.property_type,
+                latitude=Decimal(f'{rng.uniform(42.5, 42.8):.6f}'),
+                longitude=Decimal(f'{rng.uniform(-83.0, -82.8):.6f}'),
+            )
+            for index in range(40)
+        ]
+        points = [(p.pk, p.latitude, p.longitude) for p in properties]
+        origin = properties[0]
+
+        nearby = get_spatial_index(Property).nearest_objects(
+            origin.latitude, origin.longitude, k=5, radius_km=10, exclude=origin.pk
+        )
+        expected = self.brute_force(points, origin.latitude, origin.longitude, 5, 10, exclude=origin.pk)
+        self.assertEqual([p.pk for p in nearby], [pk for pk, _ in expected])
+        self.assertEqual([p.distance_km for p in nearby], [round(distance, 3) for _, distance in expected])
+
+    def test_saves_and_deletes_invalidate_the_index(self):
+        def attraction(name, latitude, longitude):
+            return Attraction.objects.create(
+                name=name, description='d', address='a', category=self.category, city=self.city,
+                latitude=latitude, longitude=longitude,
+            )
+
+        far = attraction('Far', 42.9, -82.9)
+        index = get_spatial_index(Attraction)
+        self.assertEqual([pk for pk, _ in index.nearest(42.6, -82.9, k=1)], [far.pk])
+
+        near = attraction('Near', 42.601, -82.9)
+        self.assertEqual([pk for pk, _ in index.nearest(42.6, -82.9, k=1)], [near.pk])
+
+        near.latitude = 43.5
+        near.save()
+        self.assertEqual([pk for pk, _ in index.nearest(42.6, -82.9, k=2)], [far.pk, near.pk])
+
+        far.delete()
+        self.assertEqual([pk for pk, _ in index.nearest(42.6, -82.9, k=2)], [near.pk])
+
+    def test_nearby_endpoint_rejects_bad_radius(self):
+        origin = Attraction.objects.create(
+            name='Origin', description='d', address='a', category=self.category, city=self.city,
+            latitude=42.6, longitude=-82.9,
+        )
+        for radius in ('-10', '0', 'nan', 'inf', 'far'):
+            response = APIClient().get(f'/api/attractions/{origin.pk}/nearby/', {'radius': radius})
+            self.assertEqual(response.status_code, 400, radius)
+
+    def test_nearby_results_join_their_foreign_keys(self):
+        attractions = [
+            Attraction.objects.create(
+                name=f'Park {i}', description='d', address='a', city=self.city,
+                category=Category.objects.create(name=f'Category {i}'),
+                latitude=42.6 + i / 1000, longitude=-82.9,
+            )
+            for i in range(6)
+        ]
+        get_spatial_index(Attraction).nearest(42.6, -82.9)  # Build the tree outside the counted block
+
+        # The origin, then the matches with their categories in one query
+        with self.assertNumQueries(2):
+            response = APIClient().get(f'/api/attractions/{attractions[0].pk}/nearby/')
+        self.assertEqual([item['category_name'] for item in response.data], [f'Category {i}' for i in range(1, 6)])
+
+
+class FetchEngineTests(TestCase):
+    """Per-host request spacing and concurrent page fetches"""
+
+    def test_requests_to_one_host_are_spaced(self):
+        limiter = HostRateLimiter(delay=2, host_delays={'slow.example.com': 10}, jitter=0)
+        with mock.patch('core.scraping.fetcher.time') as clock:
+            clock.monotonic.return_value = 100.0
+            waits = [limiter.wait('https://www.yelp.com/search?page=1') for _ in range(3)]
+            other = limiter.wait('https://www.tripadvisor.com/Attractions')
+            slow = [limiter.wait('https://slow.example.com/') for _ in range(2)]
+            overridden = [limiter.wait('https://www.zillow.com/', delay=7) for _ in range(2)]
+
+            # Reserving slots under the lock spaces out concurrent callers too
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+                parallel = list(executor.map(limiter.wait, ['https://events.example.com/'] * 8))
+
+        self.assertEqual(waits, [0, 2, 4])
+        self.assertEqual(other, 0)
+        self.assertEqual(slow, [0, 10])
+        self.assertEqual(overridden, [0, 7])
+        self.assertEqual(sorted(parallel), [0, 2, 4, 6, 8, 10, 12, 14])
+        self.assertEqual(clock.sleep.call_count, 2 + 1 + 1 + 7)
+
+    @override_settings(SCRAPER_MAX_WORKERS=3)
+    def test_workers_come_from_settings(self):
+        self.assertEqual(RestaurantScraper().max_workers, 3)
+
+    def test_pages_are_yielded_as_they_complete(self):
+        release = threading.Event()
+        fetched = []
+
+        def fetch_page(url, javascript_required=False):
+            fetched.append(url)
+            if url.endswith('slow'):
+                release.wait(5)
+            return url
+
+        scraper = RestaurantScraper()
+        urls = ['https://example.com/slow', 'https://example.com/fast', 'https://example.com/fast', '', None]
+        with mock.patch.object(scraper, 'fetch_page', side_effect=fetch_page):
+            pages = scraper.fetch_pages(urls, max_workers=2)
+            first = next(pages)
+            release.set()
+            rest = list(pages)
+
+        self.assertEqual(first, ('https://example.com/fast', 'https://example.com/fast'))
+        self.assertEqual(rest, [('https://example.com/slow', 'https://example.com/slow')])
+        self.assertEqual(sorted(fetched), ['https://example.com/fast', 'https://example.com/slow'])
+
+    def test_failed_pages_yield_none(self):
+        scraper = RestaurantScraper()
+        scraper.use_cache = False
+        scraper.rate_limiter = HostRateLimiter(delay=0, jitter=0)
+
+        def get(url, **kwargs):
+            if 'broken' in url:
+                raise requests.ConnectionError('reset')
+            return html_response(f'<p>{url}</p>')
+
+        urls = [f'https://www.yelp.com/search?page={page}' for page in range(4)] + ['https://www.yelp.com/broken']
+        with mock.patch('requests.Session.get', side_effect=get), mock.patch('core.scraping.base.time.sleep'):
+            with self.assertLogs('scraper', 'ERROR') as logs:
+                pages = dict(scraper.fetch_pages(urls))
+
+        self.assertEqual(set(pages), set(urls))
+        self.assertIsNone(pages['https://www.yelp.com/broken'])
+        self.assertEqual(pages[urls[2]].p.get_text(), urls[2])
+        self.assertEqual(scraper.metrics.snapshot()['hosts']['www.yelp.com']['errors'], 3)
+        self.assertEqual(len(logs.records), 3)
+
+
+class BulkIngestTests(TestCase):
+    """Slug keyed upserts of scraped rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Macomb')
+
+    def event(self, name, **values):
+        row = {
+            'name': name, 'date': date(2030, 7, 4), 'description': 'd', 'venue': 'Macomb Center',
+            'address': '44575 Garfield Rd', 'event_type': 'Music', 'time': time(19, 30), 'website': '',
+        }
+        row.update(values)
+        return row
+
+    def ingest(self, rows):
+        return bulk_ingest(EVENT_SPEC, rows, extra={'city': self.city})
+
+    def test_created_updated_and_unchanged_counts(self):
+        result = self.ingest([self.event('Summer Concert'), self.event('Jazz Night')])
+        self.assertEqual((result.created, result.updated, result.unchanged), (2, 0, 0))
+        concert = result.objects['summer-concert-2030-07-04']
+        self.assertTrue(result.was_created(concert))
+        self.assertEqual(concert.event_type.name, 'Music')
+
+        result = self.ingest([
+            self.event('Summer Concert', description='Moved indoors'),
+            self.event('Jazz Night'),
+            self.event('Jazz Night', date=date(2030, 7, 11)),
+        ])
+        self.assertEqual((result.created, result.updated, result.unchanged), (1, 1, 1))
+        self.assertEqual(str(result), '1 created, 1 updated, 1 unchanged')
+        self.assertEqual(Event.objects.get(pk=concert.pk).description, 'Moved indoors')
+        self.assertEqual(Event.objects.count(), 3)
+        self.assertEqual(EventType.objects.count(), 1)
+
+    def test_rows_missing_a_required_lookup_are_skipped(self):
+        with self.assertLogs('scraper', 'WARNING') as logs:
+            result = self.ingest([self.event('Summer Concert'), self.event('Jazz Night', event_type='')])
+
+        self.assertEqual((result.created, result.skipped), (1, 1))
+        self.assertEqual(str(result), '1 created, 0 updated, 0 unchanged, 1 skipped')
+        self.assertEqual(list(result.objects), ['summer-concert-2030-07-04'])
+        self.assertEqual(list(Event.objects.values_list('name', flat=True)), ['Summer Concert'])
+        self.assertIn('jazz-night-2030-07-04: missing event_type', logs.output[0])
+
+    def test_events_saved_by_hand_are_matched(self):
+        event = Event.objects.create(
+            name='Summer Concert', description='d', venue='Macomb Center', address='44575 Garfield Rd',
+            event_type=EventType.objects.create(name='Music'), date=date(2030, 7, 4), time=time(19, 30),
+            city=self.city, featured=True,
+        )
+        self.assertEqual(event.slug, 'summer-concert-2030-07-04')
+
+        result = self.ingest([self.event('Summer Concert', description='Moved indoors')])
+        self.assertEqual((result.created, result.updated), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual(event.description, 'Moved indoors')
+        self.assertTrue(event.featured)
+
+    def test_unchanged_fingerprints_skip_writes(self):
+        self.ingest([self.event('Summer Concert'), self.event('Jazz Night')])
+
+        with CaptureQueriesContext(connection) as context:
+            result = self.ingest([
+                self.event('Summer Concert', description='  d '),
+                self.event('Jazz Night'),
+            ])
+        self.assertEqual((result.created, result.updated, result.unchanged), (0, 0, 2))
+        writes = [query['sql'] for query in context.captured_queries if query['sql'].startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(writes, [])
+
+    def test_changed_rows_write_only_differing_fields(self):
+        event = self.ingest([self.event('Summer Concert')]).objects['summer-concert-2030-07-04']
+        Event.objects.filter(pk=event.pk).update(featured=True)
+
+        with CaptureQueriesContext(connection) as context:
+            result = self.ingest([self.event('Summer Concert', venue='Freedom Hill')])
+        self.assertEqual(result.updated, 1)
+        updates = [query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE "core_event"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"venue"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+
+        event.refresh_from_db()
+        self.assertEqual((event.venue, event.featured), ('Freedom Hill', True))
+
+    def test_rows_without_fingerprint_are_backfilled(self):
+        event = self.ingest([self.event('Summer Concert')]).objects['summer-concert-2030-07-04']
+        stored = event.content_fingerprint
+        Event.objects.filter(pk=event.pk).update(content_fingerprint='')
+
+        result = self.ingest([self.event('Summer Concert')])
+        self.assertEqual((result.updated, result.unchanged), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual(event.content_fingerprint, stored)
+
+    def test_slug_inserted_by_a_concurrent_ingest(self):
+        def insert_first(lookup_model, names):
+            # Another worker stores the same event after this ingest looked for it
+            Event.objects.create(
+                name='Summer Concert', description='Stale', venue='v', address='a',
+                event_type=EventType.objects.get_or_create(name='Music')[0],
+                date=date(2030, 7, 4), time=time(19, 30), city=self.city,
+            )
+            return resolve_lookups(lookup_model, names)
+
+        with mock.patch('core.scraping.ingest.resolve_lookups', side_effect=insert_first):
+            result = self.ingest([self.event('Summer Concert', description='Fresh')])
+
+        event = Event.objects.get()
+        self.assertEqual(result.objects['summer-concert-2030-07-04'], event)
+        self.assertEqual(event.description, 'Fresh')
+        self.assertNotEqual(event.content_fingerprint, '')
+
+    def test_fingerprints_stay_out_of_api_responses(self):
+        catalog_cache().clear()
+        self.ingest([self.event('Summer Concert')])
+        for url in ('/api/events/', '/api/homepage/?city=Macomb'):
+            self.assertNotIn('content_fingerprint', APIClient().get(url).content.decode(), url)
+
+
+class HTTPCacheTests(TestCase):
+    """Conditional revalidation, freshness, eviction and offline replay of cached pages"""
+
+    url = 'https://www.yelp.com/search?find_desc=restaurants'
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.cache = HTTPCache(directory, ttl=60, max_age=3600, max_bytes=10 ** 6)
+        self.scraper = RestaurantScraper()
+        self.scraper.http_cache = self.cache
+        self.scraper.use_cache = True
+        self.scraper.rate_limiter = HostRateLimiter(delay=0, jitter=0)
+
+    def fetch(self, *responses):
+        with mock.patch('requests.Session.get', side_effect=responses) as get:
+            soup = self.scraper.fetch_page(self.url)
+        return soup, get
+
+    def test_stale_pages_are_revalidated(self):
+        entry = self.cache.store(self.url, '<p>cached</p>', etag='"v1"', last_modified='Sat, 17 Oct 2026 08:00:00 GMT')
+        entry.fetched_at -= 120
+        self.cache._write(entry)
+
+        soup, get = self.fetch(html_response('', status=304))
+        headers = get.call_args.kwargs['headers']
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Sat, 17 Oct 2026 08:00:00 GMT')
+        self.assertEqual(soup.p.get_text(), 'cached')
+        self.assertTrue(self.cache.is_fresh(self.cache.get(self.url)))
+
+        # Fresh again, so the next fetch sends no request at all
+        soup, get = self.fetch()
+        self.assertEqual(soup.p.get_text(), 'cached')
+        self.assertFalse(get.called)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'revalidated': 1, 'misses': 0})
+
+    def test_changed_pages_replace_the_entry(self):
+        entry = self.cache.store(self.url, '<p>old</p>', etag='"v1"')
+        entry.fetched_at -= 120
+        self.cache._write(entry)
+
+        response = html_response('<p>new</p>')
+        response.headers['ETag'] = '"v2"'
+        soup, _ = self.fetch(response)
+        self.assertEqual(soup.p.get_text(), 'new')
+        self.assertEqual(self.cache.get(self.url).etag, '"v2"')
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_stale_copy_is_served_when_the_site_is_down(self):
+        entry = self.cache.store(self.url, '<p>cached</p>')
+        entry.fetched_at -= 120
+        self.cache._write(entry)
+
+        with mock.patch('core.scraping.base.time.sleep'), self.assertLogs('scraper', 'WARNING'):
+            soup, get = self.fetch(*[requests.ConnectionError('down')] * 3)
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(soup.p.get_text(), 'cached')
+
+    def test_offline_replays_cached_pages_only(self):
+        self.cache.store(self.url, '<p>cached</p>')
+        self.scraper.offline = True
+
+        soup, get = self.fetch()
+        self.assertEqual(soup.p.get_text(), 'cached')
+        with self.assertLogs('scraper', 'WARNING'):
+            self.assertIsNone(self.scraper.fetch_page('https://www.yelp.com/uncached'))
+        self.assertFalse(get.called)
+
+    def test_eviction_by_age_and_size(self):
+        now = clock.time()
+        for index, age in enumerate([10, 20, 30, 7200]):
+            self.cache.store(f'https://example.com/{index}', 'x' * 1000)
+            os.utime(self.cache.path_for(f'https://example.com/{index}'), (now - age, now - age))
+
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNone(self.cache.get('https://example.com/3'))
+
+        # Reading marks an entry as recently used, the least recently used go first
+        self.cache.get('https://example.com/2')
+        self.cache.max_bytes = 2500
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNotNone(self.cache.get('https://example.com/2'))
+        self.assertIsNotNone(self.cache.get('https://example.com/0'))
+        self.assertIsNone(self.cache.get('https://example.com/1'))
+
+    def test_counters_from_many_threads(self):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in range(8):
+                executor.submit(lambda: [self.cache.count('hits') for _ in range(2000)])
+        self.assertEqual(self.cache.stats()['hits'], 16000)
+
+
+def image_response(body, content_type='image/png'):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response._content_consumed = True
+    response.headers['Content-Type'] = content_type
+    return response
+
+
+class ImagePipelineTests(TestCase):
+    """Scraped image downloads deduplicated by URL and by content"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Macomb')
+        cls.cuisine = Cuisine.objects.create(name='American')
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        media_root = self.settings(MEDIA_ROOT=media)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.media = media
+        self.scraper = RestaurantScraper()
+        self.scraper.offline = False
+
+    def restaurant(self, name):
+        return Restaurant.objects.create(
+            name=name, description='d', address='a', cuisine=self.cuisine, city=self.city
+        )
+
+    def run_pipeline(self, jobs, bodies):
+        pipeline = ImagePipeline(self.scraper, max_workers=2)
+        for restaurant, url in jobs:
+            pipeline.add(restaurant, url)
+        with mock.patch('requests.Session.get', side_effect=lambda url, **kwargs: image_response(bodies[url])) as get:
+            stats = pipeline.run()
+        return stats, sorted(call.args[0] for call in get.call_args_list)
+
+    def stored_files(self):
+        return [name for _, _, names in os.walk(self.media) for name in names]
+
+    def test_each_url_is_downloaded_once(self):
+        first, second = self.restaurant('Diner'), self.restaurant('Grill')
+        url = 'https://example.com/diner.png'
+        stats, requested = self.run_pipeline([(first, url), (second, url)], {url: b'diner'})
+        self.assertEqual(stats, {'downloaded': 1, 'reused': 0, 'failed': 0})
+        self.assertEqual(requested, [url])
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(first.image.name.startswith('restaurants/'))
+        self.assertEqual(ScrapedImage.objects.get().size, len(b'diner'))
+
+        # A later run finds the URL in the index and makes no request
+        third = self.restaurant('Cafe')
+        stats, requested = self.run_pipeline([(third, url)], {})
+        self.assertEqual((stats['reused'], requested), (1, []))
+        third.refresh_from_db()
+        self.assertEqual(third.image.name, first.image.name)
+
+    def test_identical_content_shares_one_file(self):
+        first, second = self.restaurant('Diner'), self.restaurant('Grill')
+        urls = ['https://example.com/a.png', 'https://cdn.example.com/b.png']
+        stats, requested = self.run_pipeline(list(zip([first, second], urls)), dict.fromkeys(urls, b'same'))
+        self.assertEqual((stats['downloaded'], requested), (2, sorted(urls)))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertEqual(ScrapedImage.objects.count(), 2)
+
+    def test_oversized_images_are_skipped(self):
+        restaurant = self.restaurant('Diner')
+        url = 'https://example.com/huge.png'
+        with mock.patch('core.scraping.images.MAX_IMAGE_BYTES', 4), self.assertLogs('scraper', 'ERROR'):
+            stats, _ = self.run_pipeline([(restaurant, url)], {url: b'too large'})
+        self.assertEqual(stats, {'downloaded': 0, 'reused': 0, 'failed': 1})
+
+        restaurant.refresh_from_db()
+        self.assertFalse(restaurant.image)
+        self.assertFalse(ScrapedImage.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+
+class GenericLoaderTests(TestCase):
+    """load_generic_objects resolves generic targets with one query per content type"""
+
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name='Macomb')
+        category = Category.objects.create(name='Parks')
+        cls.attractions = [
+            Attraction.objects.create(name=f'Park {index}', description='d', address='a', category=category, city=city)
+            for index in range(3)
+        ]
+        cls.restaurants = [
+            Restaurant.objects.create(
+                name=f'Diner {index}', description='d', address='a', city=city,
+                cuisine=Cuisine.objects.create(name=f'Cuisine {index}'),
+            )
+            for index in range(2)
+        ]
+        cls.event = Event.objects.create(
+            name='Concert', description='d', venue='v', address='a', event_type=EventType.objects.create(name='Music'),
+            date=date(2030, 7, 4), time=time(19), city=city,
+        )
+        cls.user = User.objects.create_user('visitor')
+        for target in cls.attractions + cls.restaurants + [cls.event]:
+            Favorite.objects.create(user=cls.user, content_object=target)
+            SavedItem.objects.create(
+                user=cls.user, content_type=ContentType.objects.get_for_model(target), object_id=target.pk
+            )
+
+    def setUp(self):
+        # Content types come from the ContentType cache, warm it like a running server would
+        for model in (Attraction, Restaurant, Event):
+            ContentType.objects.get_for_model(model)
+
+    def test_one_query_per_content_type(self):
+        with self.assertNumQueries(1 + 3):
+            favorites = load_generic_objects(Favorite.objects.all())
+            targets = {favorite.content_object for favorite in favorites}
+            # GENERIC_SELECT_RELATED joins what the favorite summaries read
+            cuisines = {target.cuisine.name for target in targets if isinstance(target, Restaurant)}
+
+        self.assertEqual(targets, set(self.attractions + self.restaurants + [self.event]))
+        self.assertEqual(cuisines, {'Cuisine 0', 'Cuisine 1'})
+
+    def test_missing_targets_resolve_to_none(self):
+        deleted = self.attractions[0].pk
+        self.attractions[0].delete()
+
+        with self.assertNumQueries(1 + 3):
+            saved = load_generic_objects(SavedItem.objects.order_by('pk'))
+            targets = {(item.content_type.model, item.object_id): item.content_object for item in saved}
+        self.assertEqual(len(targets), 6)
+        self.assertIsNone(targets[('attraction', deleted)])
+        self.assertEqual(targets[('event', self.event.pk)], self.event)
+
+    def test_content_types_only(self):
+        with self.assertNumQueries(1):
+            favorites = load_generic_objects(Favorite.objects.all(), load_objects=False)
+            models = sorted({favorite.content_type.model for favorite in favorites})
+        self.assertEqual(models, ['attraction', 'event', 'restaurant'])
+
+
+class RatingAggregateTests(TestCase):
+    """Incremental rating aggregates stay equal to a fresh aggregate of the reviews"""
+
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name='Macomb')
+        category = Category.objects.create(name='Parks')
+        cls.park, cls.beach = [
+            Attraction.objects.create(
+                name=name, description='d', address='a', category=category, city=city, rating=4.0, review_count=3
+            )
+            for name in ('Stony Creek', 'Metro Beach')
+        ]
+        cls.diner = Restaurant.objects.create(
+            name='Diner', description='d', address='a', cuisine=Cuisine.objects.create(name='American'), city=city
+        )
+        cls.users = [User.objects.create_user(f'user{index}') for index in range(4)]
+
+    def review(self, user, obj, rating):
+        return Review.objects.create(user=user, content_object=obj, rating=rating, comment='c')
+
+    def assertAggregatesMatchReviews(self):
+        for obj in (self.park, self.beach, self.diner):
+            content_type = ContentType.objects.get_for_model(obj)
+            ratings = list(
+                Review.objects.filter(content_type=content_type, object_id=obj.pk).values_list('rating', flat=True)
+            )
+            aggregate = RatingAggregate.objects.filter(content_type=content_type, object_id=obj.pk).first()
+            stored = (aggregate.rating_count, aggregate.rating_sum, aggregate.histogram) if aggregate else (0, 0, None)
+            expected_histogram = {star: ratings.count(star) for star in range(1, 6)}
+            self.assertEqual(stored[:2], (len(ratings), sum(ratings)), obj)
+            if aggregate:
+                self.assertEqual(stored[2], expected_histogram, obj)
+                self.assertEqual(aggregate.average, sum(ratings) / len(ratings) if ratings else None, obj)
+
+            obj.refresh_from_db()
+            self.assertEqual(
+                obj.combined_rating, combined_rating(obj.rating, obj.review_count, sum(ratings), len(ratings)), obj
+            )
+
+    def test_create_edit_and_delete(self):
+        first = self.review(self.users[0], self.park, 5)
+        self.review(self.users[1], self.park, 2)
+        self.assertAggregatesMatchReviews()
+        self.assertEqual(Attraction.objects.get(pk=self.park.pk).combined_rating, round((4.0 * 3 + 7) / 5, 3))
+
+        first.rating = 3
+        first.save()
+        self.assertAggregatesMatchReviews()
+
+        # Saving without a change leaves the aggregate alone
+        first.comment = 'Edited'
+        first.save()
+        self.assertAggregatesMatchReviews()
+
+        first.delete()
+        self.assertAggregatesMatchReviews()
+
+    def test_reviews_moved_to_another_object(self):
+        review = self.review(self.users[0], self.park, 4)
+        self.review(self.users[1], self.beach, 1)
+
+        review.object_id = self.beach.pk
+        review.save()
+        self.assertAggregatesMatchReviews()
+
+        # A fresh instance of the row moves from where the database had it
+        review = Review.objects.get(pk=review.pk)
+        review.content_object = self.diner
+        review.rating = 5
+        review.save()
+        self.assertAggregatesMatchReviews()
+
+        review.delete()
+        self.assertAggregatesMatchReviews()
+
+    def test_rebuild_repairs_drifted_aggregates(self):
+        for user, rating in zip(self.users, (5, 4, 4, 1)):
+            self.review(user, self.park, rating)
+        self.review(self.users[0], self.diner, 3)
+        RatingAggregate.objects.update(rating_sum=99, rating_count=1, count_1=7)
+        Review.objects.filter(user=self.users[3]).delete()
+        Attraction.objects.update(combined_rating=0)
+
+        aggregates, refreshed = rebuild_aggregates()
+        self.assertEqual((aggregates, refreshed), (2, 2))
+        self.assertAggregatesMatchReviews()
+
+    def test_rated_object_saves_keep_other_cached_responses(self):
+        versions = model_versions([RatingAggregate, Restaurant])
+        self.park.rating = 4.5
+        self.park.save()
+        self.assertEqual(model_versions([RatingAggregate, Restaurant]), versions)
+
+        self.review(self.users[0], self.park, 5)
+        self.assertNotEqual(model_versions([RatingAggregate]), versions[:1])
+
+    def test_min_rating_filter(self):
+        catalog_cache().clear()
+        self.review(self.users[0], self.park, 5)
+        self.review(self.users[1], self.beach, 1)
+
+        response = APIClient().get('/api/attractions/', {'min_rating': '3.5'})
+        self.assertEqual([item['name'] for item in response.data['results']], ['Stony Creek'])
+
+        for value in ('abc', 'nan', 'inf'):
+            for path in ('/api/attractions/', '/api/restaurants/'):
+                response = APIClient().get(path, {'min_rating': value})
+                self.assertEqual(response.status_code, 400, (path, value))
+                self.assertIn('min_rating', response.data)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class CatalogIndexPlanTests(TestCase):
+    """The main query of each endpoint is answered from one of the Meta.indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Macomb')
+        cls.content_type = ContentType.objects.get_for_model(Attraction)
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertRegex(plan, rf'USING (COVERING )?INDEX {index_name}\b', plan)
+
+    def test_homepage_queries(self):
+        # core.views.homepage_data
+        self.assertUsesIndex(
+            Attraction.objects.filter(city=self.city, featured=True)[:5], 'attraction_city_featured_idx'
+        )
+        self.assertUsesIndex(
+            Restaurant.objects.filter(city=self.city, featured=True)[:5], 'restaurant_city_featured_idx'
+        )
+        self.assertUsesIndex(
+            Event.objects.filter(city=self.city, date__gte=date.today()).order_by('date', 'time')[:5],
+            'event_city_date_time_idx'
+        )
+
+    def test_attraction_list_queries(self):
+        # /api/attractions/?featured=true and ?ordering=-rating
+        self.assertUsesIndex(
+            Attraction.objects.filter(featured=True).order_by('id')[:9], 'attraction_featured_idx'
+        )
+        self.assertUsesIndex(Attraction.objects.order_by('-rating')[:9], 'attraction_rating_idx')
+
+    def test_restaurant_list_queries(self):
+        # /api/restaurants/?price_level=2 and ?ordering=-rating
+        self.assertUsesIndex(
+            Restaurant.objects.filter(price_level=2).order_by('id')[:9], 'restaurant_price_level_idx'
+        )
+        self.assertUsesIndex(
+            Restaurant.objects.filter(featured=True).order_by('id')[:9], 'restaurant_featured_idx'
+        )
+        self.assertUsesIndex(Restaurant.objects.order_by('-rating')[:9], 'restaurant_rating_idx')
+
+    def test_event_list_queries(self):
+        # /api/events/ default ordering, ?featured=true and the dashboard upcoming list
+        self.assertUsesIndex(Event.objects.order_by('date', 'time')[:9], 'event_date_time_idx')
+        self.assertUsesIndex(
+            Event.objects.filter(featured=True).order_by('date', 'time')[:9], 'event_featured_date_idx'
+        )
+        self.assertUsesIndex(
+            Event.objects.filter(date__gte=date.today()).order_by('date')[:5], 'event_date_time_idx'
+        )
+
+    def test_property_list_queries(self):
+        # /api/properties/?for_sale=true&min_price=... and ?bedrooms=3
+        self.assertUsesIndex(
+            Property.objects.filter(for_sale=True, price__gte=100000, price__lte=300000),
+            'property_price_sale_idx'
+        )
+        self.assertUsesIndex(
+            Property.objects.filter(for_sale=True, bedrooms=3), 'property_beds_sale_idx'
+        )
+
+    def test_generic_relation_queries(self):
+        # /api/reviews/?content_type=..&object_id=.. and per-object favorite/saved lookups
+        self.assertUsesIndex(
+            Review.objects.filter(content_type=self.content_type, object_id=1).order_by('-created_at'),
+            'review_target_idx'
+        )
+        self.assertUsesIndex(
+            Favorite.objects.filter(content_type=self.content_type, object_id=1), 'favorite_target_idx'
+        )
+        self.assertUsesIndex(
+            SavedItem.objects.filter(content_type=self.content_type, object_id=1), 'saveditem_target_idx'
+        )
+
+
+class HomepageSnapshotTests(TestCase):
+    """homepage_data serves stored bytes until the catalog or the date changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Macomb')
+        cls.category = Category.objects.create(name='Parks')
+        cls.event_type = EventType.objects.create(name='Music')
+
+    def setUp(self):
+        catalog_cache().clear()
+        self.client = APIClient()
+
+    def get(self, **headers):
+        return self.client.get('/api/homepage/', {'city': 'Macomb'}, **headers)
+
+    def test_snapshot_is_served_without_queries(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['city']['name'], 'Macomb')
+
+        with self.assertNumQueries(0):
+            second = self.get()
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_etag_revalidation(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_rebuilt_when_featured_items_change(self):
+        etag = self.get()['ETag']
+        Attraction.objects.create(
+            name='Park', description='d', address='a', category=self.category, city=self.city, featured=True
+        )
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['name'] for item in response.json()['featured_attractions']], ['Park'])
+
+    def test_upcoming_events_roll_over_at_midnight(self):
+        today = timezone.localdate()
+        Event.objects.create(
+            name='Concert', description='d', venue='v', address='a', event_type=self.event_type,
+            date=today, time=time(20, 0), city=self.city,
+        )
+        self.assertEqual(len(self.get().json()['upcoming_events']), 1)
+
+        with mock.patch('core.homepage.timezone.localdate', return_value=today + timedelta(days=1)):
+            self.assertEqual(self.get().json()['upcoming_events'], [])
+
+    def test_unknown_city(self):
+        self.assertEqual(self.client.get('/api/homepage/', {'city': 'Nowhere'}).status_code, 404)
+
+    def test_per_process_cache_bounds_snapshot_lifetime(self):
+        cache = catalog_cache()
+        with mock.patch('core.homepage.seconds_until_midnight', return_value=20000), \
+                mock.patch.object(cache, 'set', wraps=cache.set) as store:
+            homepage.build_snapshot('Macomb')
+            with mock.patch('core.homepage.catalog_cache_is_shared', return_value=True):
+                homepage.build_snapshot('Macomb')
+
+        timeouts = [
+            call.kwargs['timeout'] for call in store.call_args_list if call.args[0].startswith('homepage:snapshot:')
+        ]
+        self.assertEqual(timeouts, [homepage.CATALOG_CACHE_TIMEOUT, 20000])
+
+
+class CatalogLoaderTests(TestCase):
+    """load_catalog fixtures and synthetic rows"""
+
+    def write(self, name, content):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return path
+
+    def test_ndjson_and_csv_fixtures(self):
+        ndjson = self.write('catalog.ndjson', '\n'.join(json.dumps(record) for record in [
+            {'model': 'attraction', 'name': 'Freedom Hill', 'description': 'd', 'address': 'a',
+             'category': 'Outdoors', 'city': 'Sterling Heights', 'rating': 4.5, 'featured': True},
+            {'model': 'event', 'name': 'Concert', 'description': 'd', 'venue': 'v', 'address': 'a',
+             'event_type': 'Music', 'city': 'Macomb', 'date': '2030-07-04', 'time': '19:30:00'},
+        ]))
+        restaurants = self.write('restaurants.csv', (
+            'name,description,address,cuisine,city,price_level,rating,latitude\n'
+            'Coney One,d,a,Coney Island,Macomb,1,4.2,\n'
+            'Trattoria Two,d,a,Italian,Macomb,3,,42.6\n'
+        ))
+
+        call_command('load_catalog', ndjson, restaurants, model='restaurant', stdout=io.StringIO())
+
+        attraction = Attraction.objects.get(slug='freedom-hill')
+        self.assertEqual((attraction.category.name, attraction.city.name), ('Outdoors', 'Sterling Heights'))
+        self.assertTrue(attraction.featured)
+        self.assertEqual(attraction.combined_rating, 4.5)
+        self.assertEqual(Event.objects.get().time, time(19, 30))
+
+        coney, trattoria = Restaurant.objects.order_by('name')
+        self.assertEqual((coney.price_level, coney.rating, coney.latitude), (1, 4.2, None))
+        self.assertEqual((trattoria.rating, trattoria.latitude), (0.0, 42.6))
+        self.assertEqual(City.objects.filter(name='Macomb').count(), 1)
+
+        # Loading again matches on slugs and writes nothing
+        output = io.StringIO()
+        call_command('load_catalog', ndjson, restaurants, model='restaurant', stdout=output)
+        self.assertIn('Restaurant: 0 created, 0 updated, 2 unchanged', output.getvalue())
+
+    def test_lookups_are_resolved_once(self):
+        call_command('load_catalog', synthetic=50, batch_size=20, stdout=io.StringIO())
+        loader = CatalogLoader(batch_size=20)
+        records = list(CatalogGenerator(seed=1).records(200))
+        with CaptureQueriesContext(connection) as context:
+            loader.load(records)
+        lookup_queries = [
+            query for query in context.captured_queries
+            if 'FROM "core_city"' in query['sql'] and 'WHERE' not in query['sql']
+        ]
+        self.assertEqual(len(lookup_queries), 1)
+        self.assertEqual(
+            sum(Model.objects.count() for Model in (Attraction, Restaurant, Event, Property, TransportOption)), 250
+        )
+
+    def test_unknown_fields_are_rejected(self):
+        path = self.write('bad.ndjson', json.dumps({'model': 'restaurant', 'name': 'x', 'stars': 5}))
+        with self.assertRaises(CommandError):
+            call_command('load_catalog', path, stdout=io.StringIO())
+
+
+@override_settings(REQUEST_PROFILE_SAMPLE_RATE=1.0)
+class RequestProfileTests(TestCase):
+    """RequestProfileMiddleware timing headers, log lines and N+1 detection"""
+
+    @classmethod
+    def setUpTestData(cls):
+        city = City.objects.create(name='Macomb')
+        category = Category.objects.create(name='Parks')
+        cls.attractions = [
+            Attraction.objects.create(
+                name=f'Park {i}', description='d', address='a', city=city, category=category,
+                latitude=42.66 + i / 1000, longitude=-82.91,
+            )
+            for i in range(5)
+        ]
+        # No coordinates, so its nearby lookup falls back to the same-category query
+        cls.unplaced = Attraction.objects.create(
+            name='Unplaced Park', description='d', address='a', city=city, category=category
+        )
+
+    def setUp(self):
+        catalog_cache().clear()
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "name" = \'x\' LIMIT 21'),
+            'SELECT * FROM "t" WHERE "id" IN (...) AND "name" = ? LIMIT ?'
+        )
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs('request_profile', 'INFO') as logs:
+            response = APIClient().get('/api/attractions/')
+
+        metrics = {part.split(';')[0] for part in response['Server-Timing'].split(', ')}
+        self.assertTrue({'sql', 'serialize', 'total'} <= metrics)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], '/api/attractions/')
+        self.assertEqual(record['bytes'], len(response.content))
+        self.assertGreater(record['queries'], 0)
+        self.assertEqual(record['duplicates'], [])
+
+    def test_repeated_statements_are_flagged(self):
+        # The fallback similarity lookup reads each result's category separately
+        with self.assertLogs('request_profile', 'INFO') as logs:
+            response = APIClient().get(f'/api/attractions/{self.unplaced.pk}/nearby/')
+
+        self.assertIn('nplusone', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertTrue(any('core_category' in duplicate['sql'] for duplicate in record['duplicates']))
+        self.assertTrue(any('Possible N+1' in message for message in logs.output))
+
+    @override_settings(REQUEST_PROFILE_SAMPLE_RATE=0)
+    def test_unsampled_requests(self):
+        response = APIClient().get('/api/attractions/')
+        self.assertNotIn('Server-Timing', response)
+
+
+def html_response(body, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode()
+    response.url = 'https://www.yelp.com/search'
+    return response
+
+
+class ScrapeTelemetryTests(TestCase):
+    """Per-host scraper metrics, ScrapeRun records and the Prometheus export"""
+
+    def make_scraper(self):
+        scraper = RestaurantScraper()
+        scraper.use_cache = False
+        scraper.rate_limiter = HostRateLimiter(delay=0, jitter=0)
+        return scraper
+
+    def test_fetch_retries_bytes_and_parse_yield(self):
+        scraper = self.make_scraper()
+        page = '<li class="border-color--default__09f24__NPAKY"><h3><a href="/biz/a"><span>Diner</span></a></h3></li>'
+        responses = [requests.ConnectionError('reset'), html_response('busy', 503), html_response(page)]
+        url = 'https://www.yelp.com/search?find_desc=restaurants'
+
+        with mock.patch.object(scraper.session, 'get', side_effect=responses), mock.patch('core.scraping.base.time.sleep'):
+            soup = scraper.fetch_page(url)
+        restaurants = scraper.parse_page(url, scraper.parse_yelp_page, soup)
+
+        host = scraper.metrics.snapshot()['hosts']['www.yelp.com']
+        self.assertEqual([r['name'] for r in restaurants], ['Diner'])
+        self.assertEqual((host['fetches'], host['errors'], host['retries']), (3, 2, 2))
+        self.assertEqual(host['bytes'], len('busy') + len(page))
+        self.assertEqual(sum(host['latency_buckets']), 3)
+        self.assertEqual((host['pages_parsed'], host['items'], host['empty_pages']), (1, 1, 0))
+
+    def test_runs_are_persisted_and_exported(self):
+        scraper = self.make_scraper()
+        for saved in (3, 5):
+            with record_run(scraper, 'restaurants') as run:
+                scraper.metrics.observe_fetch('https://www.yelp.com/a', 0.3, size=2048)
+                with scraper.metrics.db_write(saved):
+                    run.items_saved = saved
+
+        latest = ScrapeRun.objects.first()
+        self.assertEqual((latest.status, latest.items_saved, latest.bytes_downloaded), ('succeeded', 5, 2048))
+        self.assertEqual(latest.previous().items_saved, 3)
+
+        text = prometheus_text([latest])
+        self.assertIn('scraper_run_items_saved{scraper="restaurants"} 5', text)
+        self.assertIn('scraper_fetch_duration_seconds_bucket{scraper="restaurants",host="www.yelp.com",le="0.25"} 0', text)
+        self.assertIn('scraper_fetch_duration_seconds_bucket{scraper="restaurants",host="www.yelp.com",le="0.5"} 1', text)
+        self.assertIn('scraper_db_rows_written{scraper="restaurants"} 5', text)
+
+    def test_failed_run(self):
+        scraper = self.make_scraper()
+        with self.assertRaises(RuntimeError), record_run(scraper, 'events'):
+            raise RuntimeError('site changed')
+        run = ScrapeRun.objects.get()
+        self.assertEqual((run.status, run.error), ('failed', 'site changed'))
+        self.assertIsNotNone(run.duration)
+
+
+class StaticPageDriver:
+    """WebDriver stand-in that loads pages over plain HTTP, enough to drive the pool"""
+
+    def __init__(self):
+        self.page_source = ''
+        self.alive = True
+
+    def get(self, url):
+        self.page_source = requests.get(url, timeout=5).text
+
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise ConnectionError('browser went away')
+        if script == 'return 1':
+            return 1
+        selector = args[0] if args else None
+        ready = not selector or BeautifulSoup(self.page_source, 'html.parser').select_one(selector) is not None
+        return {'ready': ready, 'resources': 0}
+
+    def quit(self):
+        self.alive = False
+
+
+class QuietRequestHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class BrowserPoolTests(TestCase):
+    """Browser leasing, recycling and readiness against a local static site"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.site = tempfile.mkdtemp()
+        with open(os.path.join(cls.site, 'listings.html'), 'w') as handle:
+            handle.write('<html><body><ul id="grid-search-results"><li>12 Main St</li></ul></body></html>')
+        with open(os.path.join(cls.site, 'empty.html'), 'w') as handle:
+            handle.write('<html><body>Loading...</body></html>')
+        handler = functools.partial(QuietRequestHandler, directory=cls.site)
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.site)
+        super().tearDownClass()
+
+    def make_pool(self, **kwargs):
+        self.drivers = []
+
+        def factory():
+            self.drivers.append(StaticPageDriver())
+            return self.drivers[-1]
+
+        return BrowserPool(factory=factory, ready_timeout=1, **kwargs)
+
+    def test_browsers_are_reused_and_recycled(self):
+        pool = self.make_pool(size=1, max_uses=2)
+        for _ in range(3):
+            html = pool.fetch(f'{self.base_url}/listings.html', wait_for='#grid-search-results')
+            self.assertIn('12 Main St', html)
+
+        stats = pool.snapshot()
+        self.assertEqual((stats['fetches'], stats['launched'], stats['recycled']), (3, 2, 1))
+        self.assertEqual(stats['not_ready'], 0)
+        self.assertFalse(self.drivers[0].alive)
+
+    def test_unhealthy_browser_is_replaced(self):
+        pool = self.make_pool(size=1)
+        pool.fetch(f'{self.base_url}/listings.html')
+        self.drivers[0].alive = False
+
+        self.assertEqual(pool.health(), {'size': 1, 'live': 0, 'idle': 0, 'leased': 0, 'dropped': 1})
+        pool.fetch(f'{self.base_url}/listings.html')
+        self.assertEqual(len(self.drivers), 2)
+
+    def test_lease_waits_for_a_free_browser(self):
+        pool = self.make_pool(size=1)
+        with pool.lease():
+            with self.assertRaises(TimeoutError):
+                with pool.lease(timeout=0.05):
+                    pass
+
+    def test_missing_selector_times_out(self):
+        driver = StaticPageDriver()
+        driver.get(f'{self.base_url}/empty.html')
+        self.assertFalse(wait_until_ready(driver, '#grid-search-results', timeout=0.2, idle=0))
+        self.assertTrue(wait_until_ready(driver, 'body', timeout=0.2, idle=0))
+
+    @skipUnless(importlib.util.find_spec('selenium') and shutil.which('google-chrome'), 'needs selenium and Chrome')
+    def test_headless_chrome(self):
+        pool = BrowserPool(size=1, factory=chrome_driver)
+        try:
+            html = pool.fetch(f'{self.base_url}/listings.html', wait_for='#grid-search-results')
+        finally:
+            pool.close()
+        self.assertIn('12 Main St', html)
+
+
+class CountingResolver:
+    """Network resolver stand-in that knows a fixed set of addresses"""
+    name = 'test'
+    network = True
+
+    def __init__(self, known):
+        self.known = known
+        self.calls = []
+
+    def lookup(self, address, normalized):
+        self.calls.append(address)
+        return self.known.get(address)
+
+
+class GeocodingTests(TestCase):
+    """Normalized address cache, negative caching, gazetteer and backfill"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Macomb')
+
+    def setUp(self):
+        handle, self.gazetteer = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as csv_file:
+            csv_file.write('address,latitude,longitude\n')
+            csv_file.write('"16600 Hall Road, Macomb, MI",42.6281,-82.9537\n')
+        self.addCleanup(os.remove, self.gazetteer)
+
+    def test_normalize_address(self):
+        self.assertEqual(
+            normalize_address('123 North Main Street, Mount Clemens, Michigan, USA'),
+            normalize_address('123 N. Main St Mt Clemens MI'),
+        )
+
+    def test_hits_and_misses_are_cached(self):
+        resolver = CountingResolver({'1 Main St, Macomb, MI': (42.1234567, -82.9)})
+        geocoder = Geocoder([resolver])
+        addresses = ['1 Main St, Macomb, MI', '1 main street macomb mi', 'Nowhere']
+
+        first = geocoder.geocode_many(addresses)
+        self.assertEqual(first['1 main street macomb mi'], (42.123457, -82.9))
+        self.assertEqual(first['Nowhere'], (None, None))
+        self.assertEqual(resolver.calls, ['1 Main St, Macomb, MI', 'Nowhere'])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(geocoder.geocode_many(addresses), first)
+        self.assertEqual(GeocodedAddress.objects.filter(latitude__isnull=True).count(), 1)
+
+        # Expired misses are asked again
+        GeocodedAddress.objects.update(checked_at=timezone.now() - timedelta(days=60))
+        geocoder.geocode('Nowhere')
+        self.assertEqual(resolver.calls[-1], 'Nowhere')
+
+    def test_offline_uses_gazetteer_and_caches_no_misses(self):
+        resolver = CountingResolver({})
+        geocoder = Geocoder([GazetteerResolver(self.gazetteer), resolver])
+
+        found = geocoder.geocode_many(['16600 Hall Rd., Macomb, Michigan', 'Unknown Rd'], offline=True)
+        self.assertEqual(found['16600 Hall Rd., Macomb, Michigan'], (42.6281, -82.9537))
+        self.assertEqual(found['Unknown Rd'], (None, None))
+        self.assertEqual(resolver.calls, [])
+        self.assertEqual(list(GeocodedAddress.objects.values_list('source', flat=True)), ['gazetteer'])
+
+    def test_backfill_restaurants_and_events(self):
+        cuisine = Cuisine.objects.create(name='American')
+        restaurant = Restaurant.objects.create(
+            name='Hall Road Grill', description='d', address='16600 Hall Road', cuisine=cuisine, city=self.city
+        )
+        event = Event.objects.create(
+            name='Concert', description='d', venue='Hall', address='16600 Hall Rd, Macomb, MI',
+            event_type=EventType.objects.create(name='Music'), date=date.today(), time=time(19), city=self.city
+        )
+        geocoder = Geocoder([GazetteerResolver(self.gazetteer)])
+
+        for model in (Restaurant, Event):
+            self.assertEqual(backfill_coordinates(model, geocoder=geocoder, offline=True), (1, 1))
+        restaurant.refresh_from_db()
+        event.refresh_from_db()
+        self.assertEqual((restaurant.latitude, event.longitude), (42.6281, -82.9537))
+        self.assertEqual(backfill_coordinates(Event, geocoder=geocoder), (0, 0))
+
+    def test_command_reports_a_missing_gazetteer(self):
+        for gazetteer, message in ((None, 'No gazetteer configured'), ('/nonexistent.csv', 'does not exist')):
+            output = io.StringIO()
+            with override_settings(GEOCODER_GAZETTEER=gazetteer):
+                call_command('geocode_catalog', '--offline', stdout=output)
+            self.assertIn(message, output.getvalue())
+
+
+class ScrapePipelineTests(TestCase):
+    """Streaming fetch, parse and persist with bounded buffers"""
+
+    def test_scrapers_must_define_record_sources(self):
+        class SourcelessScraper(BaseScraper):
+            def run(self):
+                return 0
+
+        with self.assertRaisesRegex(TypeError, 'record_sources'):
+            SourcelessScraper()
+
+    def routes(self, count, produced):
+        for index in range(count):
+            produced.append(index)
+            # Every tenth record has no name and is dropped by normalize
+            yield {'name': '' if index % 10 == 9 else f'Route {index}', 'description': 'd', 'transport_type': 'Bus'}
+
+    def test_micro_batches_with_bounded_lead(self):
+        produced, batches = [], []
+
+        def persist(batch):
+            # The parse side runs ahead by at most the buffer and the record it is handing over
+            consumed = sum(batches) + len(batch) + pipeline.dropped
+            self.assertLessEqual(len(produced) - consumed, 20 + 1)
+            batches.append(len(batch))
+            return len(batch)
+
+        pipeline = ScrapePipeline(TransportScraper(), persist=persist, batch_size=10, buffer_size=20)
+        saved = pipeline.run(functools.partial(self.routes, 250, produced))
+
+        self.assertEqual((saved, pipeline.dropped), (225, 25))
+        self.assertEqual(batches, [10] * 22 + [5])
+        self.assertEqual(pipeline.parsed, {'routes': 250})
+
+    def test_batches_reach_the_database(self):
+        pipeline = ScrapePipeline(TransportScraper(), batch_size=4)
+        self.assertEqual(pipeline.run(functools.partial(self.routes, 9, [])), 9)
+        self.assertEqual(TransportOption.objects.count(), 9)
+
+    def test_source_errors_stop_the_run(self):
+        def broken():
+            yield {'name': 'Route 1', 'description': 'd', 'transport_type': 'Bus'}
+            raise ValueError('layout changed')
+
+        persisted = []
+        pipeline = ScrapePipeline(TransportScraper(), persist=persisted.extend, batch_size=10)
+        with self.assertRaises(ValueError):
+            pipeline.run(broken)
+        self.assertEqual(persisted, [])
+
+    def test_listings_split_into_page_batches(self):
+        sources = RestaurantScraper().record_sources()
+        self.assertEqual(list(sources), ['yelp_1', 'yelp_2', 'yelp_3'])
+        self.assertEqual([len(source.args[0]) for source in sources.values()], [2, 2, 1])
+
+    def test_fetch_window_holds_back_submissions(self):
+        fetched = []
+
+        class Scraper:
+            def fetch_page(self, url, javascript_required=False):
+                fetched.append(url)
+                return url
+
+        with FetchEngine(Scraper(), max_workers=2) as engine:
+            pages = engine.fetch_all([f'https://example.com/{page}' for page in range(50)], window=4)
+            first = next(pages)
+            self.assertLessEqual(len(fetched), 4)
+            rest = list(pages)
+        self.assertEqual(len({url for url, _ in [first] + rest}), 50)
+
+
+@skipUnless(importlib.util.find_spec('celery'), 'needs celery')
+class ScrapeFanOutTests(TestCase):
+    """run_all_scrapers fan-out with eager tasks and the in-memory broker"""
+
+    def setUp(self):
+        from backend import celery_app
+
+        eager = {
+            'task_always_eager': True,
+            'task_eager_propagates': True,
+            'broker_url': 'memory://',
+            'result_backend': 'cache+memory://',
+        }
+        previous = {key: celery_app.conf.get(key) for key in eager}
+        celery_app.conf.update(eager)
+        self.addCleanup(celery_app.conf.update, previous)
+
+    @override_settings(SCRAPER_METRICS_FILE=None)
+    def test_sources_fan_out_and_join_into_runs(self):
+        from core.tasks import run_all_scrapers
+
+        def routes(prefix, count):
+            def source():
+                for index in range(count):
+                    yield {'name': f'{prefix} {index}', 'description': 'd', 'transport_type': 'Bus'}
+            return source
+
+        def broken():
+            raise ValueError('layout changed')
+
+        sources = {'bus': routes('Route', 3), 'parking': routes('Lot', 2), 'taxi': broken}
+        with mock.patch.object(TransportScraper, 'record_sources', lambda scraper: sources):
+            run_all_scrapers.delay(targets=['transportation'], offline=True)
+
+        run = ScrapeRun.objects.get(scraper='transportation')
+        self.assertEqual((run.status, run.items_saved, run.error), ('failed', 5, 'taxi: layout changed'))
+        self.assertEqual(run.metrics['rows_written'], 5)
+        self.assertEqual(TransportOption.objects.count(), 5)
+
+
+class ScrapeWorkerTests(TestCase):
+    """scrape_worker keeps every host queue on a single process"""
+
+    def test_host_queues_refuse_more_than_one_process(self):
+        with self.assertRaisesRegex(CommandError, 'concurrency 1'):
+            call_command('scrape_worker', 'scrape_yelp', '--concurrency', '2')
+
+    def test_configured_host_queues_run_one_process(self):
+        from core.scraping.targets import SCRAPE_TARGETS
+
+        queues = settings.CELERY_SCRAPER_QUEUES
+        self.assertEqual({queues[target.queue] for target in SCRAPE_TARGETS.values()}, {1})
@@ -31,6 +31,7 @@ urlpatterns = [
     path('featured-restaurants/', views.featured_restaurants, name='featured-restaurants'),
     path('restaurant-categories/', views.restaurant_categories, name='restaurant-categories'),
     path('nearby-restaurants/<int:restaurant_id>/', views.nearby_restaurants, name='nearby-restaurants'),
+    path('properties/<int:pk>/nearby/', views.nearby_properties, name='nearby-properties'),
     path('advanced-search/<str:category>/', views.advanced_search, name='advanced-search'),
     path('user/favorites/', views.user_favorites, name='user-favorites'),
     path('user/reviews/', views.user_reviews, name='user-reviews'),
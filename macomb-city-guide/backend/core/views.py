@@ -1,3 +1,4 @@
+import math
 from django.shortcuts import render
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import api_view, permission_classes, action
@@ -5,6 +6,11 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from datetime import date, datetime
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from .geo import get_spatial_index
+from .homepage import get_snapshot
+from .stats import city_count_annotations
 from .models import (
     City, Category, Attraction, EventType, Event, 
     Cuisine, Restaurant, PropertyType, Property,
@@ -161,42 +167,97 @@ def homepage_data(request):
     """Get featured data for the homepage"""
     city_name = request.query_params.get('city', 'Macomb')  # Default to Macomb
     
-    city = get_object_or_404(City, name=city_name)
-    featured_attractions = Attraction.objects.filter(city=city, featured=True)[:5]
-    upcoming_events = Event.objects.filter(
-        city=city, 
-        date__gte=date.today()
-    ).order_by('date', 'time')[:5]
-    featured_restaurants = Restaurant.objects.filter(city=city, featured=True)[:5]
+    # Precomputed JSON bytes, rebuilt when the catalog changes or the day rolls over
+    snapshot = get_snapshot(city_name)
+    if snapshot.etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(snapshot.body, content_type='application/json')
+    response['ETag'] = snapshot.etag
+    return response
+
+def _nearby_params(request):
+    """Read the k (result count) and radius (km) query params for nearby lookups"""
+    try:
+        k = min(max(int(request.query_params.get('k', 5)), 1), 50)
+        radius = float(request.query_params.get('radius', 10))
+    except ValueError:
+        return None, None
+    # The tree compares squared distances, so a negative radius would act like a positive one
+    if not math.isfinite(radius) or radius <= 0:
+        return None, None
+    return k, radius
+
+def _nearby_response(model, serializer_class, obj, request, fallback):
+    """Serialize the k nearest objects to obj within the requested radius"""
+    k, radius = _nearby_params(request)
+    if k is None:
+        return Response(
+            {"error": "k must be an integer and radius a positive number of kilometres"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    data = {
-        'city': CitySerializer(city).data,
-        'featured_attractions': AttractionSerializer(featured_attractions, many=True).data,
-        'upcoming_events': EventSerializer(upcoming_events, many=True).data,
-        'featured_restaurants': RestaurantSerializer(featured_restaurants, many=True).data,
-    }
+    if obj.latitude is None or obj.longitude is None:
+        # No coordinates to search around, use the old similarity lookup
+        serializer = serializer_class(fallback.exclude(pk=obj.pk)[:k], many=True)
+        return Response(serializer.data)
     
+    nearby = get_spatial_index(model).nearest_objects(
+        obj.latitude, obj.longitude, k=k, radius_km=radius, exclude=obj.pk
+    )
+    data = serializer_class(nearby, many=True).data
+    for item, nearby_obj in zip(data, nearby):
+        item['distance_km'] = nearby_obj.distance_km
     return Response(data)
 
 @api_view(['GET'])
 def nearby_attractions(request, pk):
-    """Get nearby attractions for a specific attraction"""
+    """Get the k nearest attractions within a radius of a specific attraction"""
     try:
         attraction = Attraction.objects.get(pk=pk)
-        # Simple implementation: get attractions in the same category and city
-        nearby = Attraction.objects.filter(
-            city=attraction.city,
-            category=attraction.category
-        ).exclude(pk=pk)[:5]
-        
-        serializer = AttractionSerializer(nearby, many=True)
-        return Response(serializer.data)
+        fallback = Attraction.objects.filter(
+            city_id=attraction.city_id,
+            category_id=attraction.category_id
+        )
+        return _nearby_response(Attraction, AttractionSerializer, attraction, request, fallback)
     except Attraction.DoesNotExist:
         return Response(
             {"error": "Attraction not found"}, 
             status=status.HTTP_404_NOT_FOUND
         )
 
+@api_view(['GET'])
+def nearby_restaurants(request, restaurant_id):
+    """Get the k nearest restaurants within a radius of a specific restaurant"""
+    try:
+        restaurant = Restaurant.objects.get(pk=restaurant_id)
+        fallback = Restaurant.objects.filter(
+            city_id=restaurant.city_id,
+            cuisine_id=restaurant.cuisine_id
+        )
+        return _nearby_response(Restaurant, RestaurantSerializer, restaurant, request, fallback)
+    except Restaurant.DoesNotExist:
+        return Response(
+            {"error": "Restaurant not found"}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+@api_view(['GET'])
+def nearby_properties(request, pk):
+    """Get the k nearest properties within a radius of a specific property"""
+    try:
+        prop = Property.objects.get(pk=pk)
+        fallback = Property.objects.filter(
+            city_id=prop.city_id,
+            property_type_id=prop.property_type_id
+        )
+        return _nearby_response(Property, PropertySerializer, prop, request, fallback)
+    except Property.DoesNotExist:
+        return Response(
+            {"error": "Property not found"}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+
 # Additional utility endpoints
 @api_view(['GET'])
 def search_all(request):
@@ -225,20 +286,16 @@ def search_all(request):
 @api_view(['GET'])
 def city_overview(request, city_name):
     """Get an overview of a city with summary statistics"""
-    city = get_object_or_404(City, name=city_name)
-    
-    attraction_count = Attraction.objects.filter(city=city).count()
-    restaurant_count = Restaurant.objects.filter(city=city).count()
-    event_count = Event.objects.filter(city=city, date__gte=date.today()).count()
-    property_count = Property.objects.filter(city=city).count()
+    # The city row and its counts come back from one query
+    city = get_object_or_404(City.objects.annotate(**city_count_annotations()), name=city_name)
     
     data = {
         'city': CitySerializer(city).data,
         'stats': {
-            'attractions': attraction_count,
-            'restaurants': restaurant_count,
-            'upcoming_events': event_count,
-            'properties': property_count,
+            'attractions': city.attractions_count,
+            'restaurants': city.restaurants_count,
+            'upcoming_events': city.upcoming_events_count,
+            'properties': city.properties_count,
         }
     }
     